@@ -8,9 +8,12 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
-# Load .env from project root if present so that API keys are available at import time.
-load_dotenv()
-load_dotenv(Path(__file__).resolve().parents[2] / ".env", override=False)
+# Load backend/.env, then the project-root .env, so API keys are available at import time.
+# Only files that exist are read; earlier files win, and real environment variables win
+# over both.
+for _env_file in (Path(__file__).resolve().parents[1] / ".env", Path(__file__).resolve().parents[2] / ".env"):
+    if _env_file.is_file():
+        load_dotenv(_env_file, override=False)
 
 __all__ = ["create_app"]
 
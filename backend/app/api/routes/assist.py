@@ -1,21 +1,54 @@
+import asyncio
 import base64
 import json
+import logging
 import os
-from typing import Dict, List, Literal, Optional
+import re
+import time
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Literal,
+    Optional,
+)
 
-import httpx
-from fastapi import APIRouter, File, HTTPException, UploadFile
-from fastapi.concurrency import run_in_threadpool
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, File, HTTPException, Request, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from starlette.background import BackgroundTask
+from starlette.requests import HTTPConnection
 
-try:
-    from openai import OpenAI
-except ImportError:  # pragma: no cover
-    OpenAI = None  # type: ignore[assignment]
+from ...services.audio_upload import prepare_audio_upload
+from ...services.field_extractor import FIELD_EXTRACTOR_ENABLED, LocalExtraction, extract_fields, record_outcome
+from ...services.metrics import count_fallback, count_upstream_error, record_stage, stage
+from ...services.model_router import Route, RouteTimer, TurnFeatures, model_router
+from ...services.resilience import UpstreamStatusError, call_upstream, get_circuit_breaker, request_deadline
+from ...services.multipart import multipart_content_type, new_boundary, stream_multipart
+from ...services.scheduler import BULK, SingleFlight, get_upstream_limiter
+from ...services.sessions import ConversationSession, estimate_tokens, session_store
+from ...services.speech_prefetch import PrefetchClip, speech_prefetcher
+from ...services.speech_segments import TTS_LONGFORM_MIN_CHARS, SegmentSynthesis, split_for_speech
+from ...services.structured_stream import StructuredReplyParser
+from ...services.tts_cache import get_tts_cache, tts_cache_key
+from ...services.upstream import get_upstream_clients, openai_available
+
+if TYPE_CHECKING:  # pragma: no cover - imported lazily by services.upstream
+    import httpx
+    from openai import AsyncOpenAI
 
 
 router = APIRouter(prefix="/assist", tags=["assist"])
 
+logger = logging.getLogger(__name__)
+
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "Rachel")
@@ -24,6 +57,25 @@ ELEVENLABS_TTS_BASE_URL = os.getenv("ELEVENLABS_TTS_BASE_URL", "https://api.elev
 ELEVENLABS_STT_MODEL_ID = os.getenv("ELEVENLABS_STT_MODEL_ID", "eleven_multilingual_v2")
 ELEVENLABS_STT_ENDPOINT = os.getenv("ELEVENLABS_STT_ENDPOINT", "https://api.elevenlabs.io/v1/speech-to-text")
 OPENAI_CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
+STREAM_TTS_MIN_CHARS = int(os.getenv("STREAM_TTS_MIN_CHARS", "24"))
+AUDIO_STREAM_CHUNK_BYTES = int(os.getenv("AUDIO_STREAM_CHUNK_BYTES", str(32 * 1024)))
+AUDIO_HANDLE_MAX_ENTRIES = int(os.getenv("AUDIO_HANDLE_MAX_ENTRIES", "1024"))
+SESSION_SUMMARY_MODEL = os.getenv("SESSION_SUMMARY_MODEL", OPENAI_CHAT_MODEL)
+VOICE_MAX_TURN_BYTES = int(os.getenv("VOICE_MAX_TURN_BYTES", str(10 * 1024 * 1024)))
+# End-to-end upstream budgets; retries and hedges must fit inside them.
+CHAT_DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "30"))
+TTS_DEADLINE_SECONDS = float(os.getenv("TTS_DEADLINE_SECONDS", "20"))
+TTS_LONGFORM_DEADLINE_SECONDS = float(os.getenv("TTS_LONGFORM_DEADLINE_SECONDS", "60"))
+STT_DEADLINE_SECONDS = float(os.getenv("STT_DEADLINE_SECONDS", "30"))
+
+# A sentence ends at terminal punctuation (optionally followed by closing quotes or
+# brackets) that is followed by whitespace, so "3.5" or "e-mail." at the very end of a
+# delta are not cut until more text arrives.
+_SENTENCE_BOUNDARY = re.compile(r"[.!?\u2026]+[\"')\]\u201d\u2019]*\s+")
+
+# Text registered for lazy synthesis through `/audio/{handle}`, most recent last.
+_pending_speech: "OrderedDict[str, tuple[str, Optional[str]]]" = OrderedDict()
+_speech_flight = SingleFlight("tts")
 
 SECTION_FIELD_CONFIG: Dict[int, Dict[str, List[str]]] = {
     0: {
@@ -129,6 +181,35 @@ SECTION_FIELD_CONFIG: Dict[int, Dict[str, List[str]]] = {
 }
 
 
+# What the assistant says on entering each section of the guided interview, word for
+# word as `getSectionGuidance` in frontend/components/AIChatPanel.tsx shows it, so the
+# clips prefetched from here are the ones the client asks to synthesize.
+SECTION_INTROS: Dict[int, str] = {
+    1: "For the Cover Page, I need: project title, organization name, contact information, and submission date. "
+    "You can speak or type these details.",
+    2: "The Executive Summary should be 150-250 words covering who you are, what you're proposing, why it's "
+    "needed, expected outcomes, and your funding request. Want to draft this together?",
+    3: "Let's establish your Community Context. Tell me about your community's background, population, "
+    "strengths, and cultural significance.",
+    4: "For the Problem Statement, describe the specific challenge or opportunity you're addressing. Include "
+    "any supporting data or community feedback you have.",
+    5: "Now for Project Description - let's define your SMART objectives and activities for each year. What "
+    "are your main goals?",
+    6: "The Implementation Plan needs a timeline with specific milestones and deliverables. When do you plan "
+    "to start, and what are the key phases?",
+    7: "For the Budget, I'll help you break down costs into categories: personnel, equipment, training, "
+    "marketing, and other expenses. What's your total project budget?",
+    8: "Expected Outcomes should include measurable results and long-term community impact. How will you "
+    "measure success?",
+    9: "Let's align your project with the funder's priorities. Do you have the funding guidelines? I can help "
+    "match your project to their goals.",
+    10: "For Risk Management, identify potential challenges and your mitigation strategies. What concerns do "
+    "you have about project implementation?",
+    11: "Finally, let's review what supporting documents you have: letters of support, community plans, "
+    "detailed budgets, etc. What can you attach?",
+}
+
+
 class ConversationMessage(BaseModel):
     role: Literal["system", "user", "assistant"]
     content: str
@@ -148,48 +229,119 @@ class ChatRequest(BaseModel):
         default=None,
         description="Current proposal section index to guide structured extraction."
     )
+    audio_mode: Literal["inline", "url"] = Field(
+        default="inline",
+        description=(
+            "`inline` returns base64 audio in the response; `url` returns an `audio_url` "
+            "that streams the MP3 on demand."
+        ),
+    )
+    session_id: Optional[str] = Field(
+        default=None,
+        description=(
+            "Server-side conversation to continue (from `POST /sessions`). When set, `history` "
+            "is ignored and the server supplies prior turns itself; an unknown or expired id "
+            "answers 404."
+        ),
+    )
+
+
+class SessionCreateRequest(BaseModel):
+    history: List[ConversationMessage] = Field(
+        default_factory=list, description="Earlier turns to seed the session with, e.g. after a 404."
+    )
+
+
+class SessionInfo(BaseModel):
+    session_id: str
+    turns: int
+    prompt_tokens: int
+    completion_tokens: int
+    compactions: int
+    history_messages: int
+    history_tokens: int
+    has_summary: bool
 
 
 class ChatResponse(BaseModel):
     message: str
     audio_base64: Optional[str] = None
+    audio_url: Optional[str] = None
     field_updates: Optional[Dict[str, str]] = None
+    session: Optional[SessionInfo] = None
 
 
 class SynthesisRequest(BaseModel):
     text: str
     voice_id: Optional[str] = None
+    long_form: Optional[bool] = Field(
+        None,
+        description="Split the text and synthesize segments concurrently; "
+        "by default only texts longer than TTS_LONGFORM_MIN_CHARS are split.",
+    )
 
 
 class SynthesisResponse(BaseModel):
     audio_base64: str
 
 
+class PrefetchRequest(BaseModel):
+    section: Optional[int] = Field(
+        default=None,
+        description="Section the user is answering; the intro of the section after it is prefetched.",
+    )
+    texts: List[str] = Field(
+        default_factory=list,
+        description="Other short prompts the client expects the assistant to speak soon.",
+    )
+    voice_id: Optional[str] = None
+    session_id: Optional[str] = Field(
+        default=None,
+        description="Replaces this session's previous prediction; its unfinished clips are cancelled.",
+    )
+
+
+class PrefetchResponse(BaseModel):
+    started: int
+
+
 class TranscriptionResponse(BaseModel):
     text: str
 
 
-def _get_openai_client() -> OpenAI:
+class VoiceTurnStart(BaseModel):
+    """First message of a `/voice` turn; binary audio frames follow until `stop`."""
+
+    type: Literal["start"] = "start"
+    history: Optional[List[ConversationMessage]] = Field(
+        default=None,
+        description="Replaces the history kept on the socket; omit to continue it.",
+    )
+    voice_id: Optional[str] = None
+    section: Optional[int] = None
+    audio_mode: Literal["inline", "url"] = "inline"
+    session_id: Optional[str] = None
+    mime_type: str = "audio/webm"
+    filename: str = "audio.webm"
+
+
+def _get_openai_client() -> "AsyncOpenAI":
     if not OPENAI_API_KEY:
         raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured.")
-    if OpenAI is None:
+    if not openai_available():
         raise HTTPException(status_code=500, detail="openai package not installed on server.")
-    return OpenAI(api_key=OPENAI_API_KEY)
+    return get_upstream_clients().openai
 
 
-def _build_format_instruction(section: Optional[int]) -> Optional[str]:
-    if section is None:
-        return None
-    config = SECTION_FIELD_CONFIG.get(section)
-    if not config:
-        return None
+def _format_instruction_for(config: Dict[str, Any]) -> str:
     allowed_fields = ", ".join(config["fields"])
     description = config.get("description", "the current section")
     return (
         f"You are extracting structured data for {description}. "
         "Respond strictly with a JSON object shaped as "
-        '{"chat_reply": "<natural language response for the user>", '
-        '"field_updates": { "<field>": "<value>" }}. '
+        '{"field_updates": { "<field>": "<value>" }, '
+        '"chat_reply": "<natural language response for the user>"}, '
+        "with field_updates first. "
         f"Only include keys in field_updates from this allowlist: {allowed_fields}. "
         "If you have no structured updates, return an empty object for field_updates. "
         "All field values must be plain strings without markdown or trailing commentary. "
@@ -197,15 +349,33 @@ def _build_format_instruction(section: Optional[int]) -> Optional[str]:
     )
 
 
-def _parse_structured_response(content: str) -> tuple[str, Optional[Dict[str, str]]]:
+# Built once at import: the section prompts and allowlists never change at runtime.
+_FORMAT_INSTRUCTIONS: Dict[int, str] = {
+    section: _format_instruction_for(config) for section, config in SECTION_FIELD_CONFIG.items() if config
+}
+_SECTION_ALLOWLISTS: Dict[int, frozenset] = {
+    section: frozenset(config.get("fields", [])) for section, config in SECTION_FIELD_CONFIG.items()
+}
+
+
+def _build_format_instruction(section: Optional[int]) -> Optional[str]:
+    if section is None:
+        return None
+    return _FORMAT_INSTRUCTIONS.get(section)
+
+
+def _strip_code_fence(content: str) -> str:
     stripped = content.strip()
     if stripped.startswith("```"):
         stripped = stripped.strip("`")
         if "\n" in stripped:
             stripped = stripped.split("\n", 1)[1]
+    return stripped
+
 
+def _parse_structured_response(content: str) -> tuple[str, Optional[Dict[str, str]]]:
     try:
-        payload = json.loads(stripped)
+        payload = json.loads(_strip_code_fence(content))
     except json.JSONDecodeError:
         return content, None
 
@@ -226,7 +396,8 @@ def _parse_structured_response(content: str) -> tuple[str, Optional[Dict[str, st
     return chat_reply, field_updates
 
 
-async def synthesize_speech(text: str, voice_id: Optional[str]) -> str:
+def _speech_request(text: str, voice_id: Optional[str]) -> tuple[str, Dict[str, str], Dict[str, str], str]:
+    """Return the upstream URL, headers, JSON payload and cache key for a TTS call."""
     if not ELEVENLABS_API_KEY:
         raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
 
@@ -241,38 +412,312 @@ async def synthesize_speech(text: str, voice_id: Optional[str]) -> str:
         "text": text,
         "model_id": ELEVENLABS_TTS_MODEL_ID,
     }
+    cache_key = tts_cache_key(effective_voice_id, ELEVENLABS_TTS_MODEL_ID, text)
+    return url, headers, payload, cache_key
+
+
+async def synthesize_audio(text: str, voice_id: Optional[str]) -> bytes:
+    """
+    Return MP3 audio for `text`, served from the TTS cache when possible.
+
+    Concurrent requests for the same voice and text share a single upstream call.
+    """
+    url, headers, payload, cache_key = _speech_request(text, voice_id)
+    cache = get_tts_cache()
+    cached = await speech_prefetcher.claim(cache_key) or await cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    attempt = _speech_attempt(url, headers, payload)
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(url, headers=headers, json=payload)
+    async def _fetch() -> bytes:
+        audio = await call_upstream("elevenlabs", attempt)
+        await cache.put(cache_key, audio)
+        return audio
 
-    if response.status_code != httpx.codes.OK:
-        raise HTTPException(status_code=502, detail=f"Text-to-speech failed: {response.text}")
+    return await _speech_flight.run(cache_key, _fetch)
+
+
+def _speech_attempt(url: str, headers: Dict[str, str], payload: Dict[str, str]) -> Callable[[float], Awaitable[bytes]]:
+    client = get_upstream_clients().elevenlabs
+
+    async def _attempt(timeout: float) -> bytes:
+        response = await client.post(url, headers=headers, json=payload, timeout=timeout)
+        if response.status_code != 200:
+            raise UpstreamStatusError(response.status_code, f"Text-to-speech failed: {response.text}")
+        return response.content
+
+    return _attempt
+
+
+async def _prefetch_audio(text: str, voice_id: Optional[str]) -> Optional[bytes]:
+    """Speculative synthesis into the TTS cache: bulk priority, one attempt, no hedge."""
+    url, headers, payload, cache_key = _speech_request(text, voice_id)
+    cache = get_tts_cache()
+    if await cache.contains(cache_key):
+        return None
+    with request_deadline(TTS_DEADLINE_SECONDS):
+        audio = await call_upstream(
+            "elevenlabs", _speech_attempt(url, headers, payload), priority=BULK, attempts=1, hedge=False
+        )
+    await cache.put(cache_key, audio)
+    return audio
 
-    return base64.b64encode(response.content).decode("utf-8")
+
+def _prefetch_speech(owner: Optional[Hashable], texts: List[str], voice_id: Optional[str]) -> int:
+    """Start speculative synthesis of `texts`; returns how many clips were started."""
+    if not ELEVENLABS_API_KEY or not get_circuit_breaker("elevenlabs").available:
+        return 0
+    clips = []
+    for text in texts:
+        _, _, _, cache_key = _speech_request(text, voice_id)
+        clips.append(PrefetchClip(cache_key, len(text), lambda text=text: _prefetch_audio(text, voice_id)))
+    return speech_prefetcher.predict(owner, clips)
+
+
+def _next_prompts(section: Optional[int]) -> List[str]:
+    """What the assistant will most likely say once the user is done with `section`."""
+    intro = SECTION_INTROS.get(section + 1) if section is not None else None
+    return [intro] if intro is not None else []
+
+
+class _AudioStream:
+    """
+    MP3 chunks for a `StreamingResponse`, with an idempotent `aclose()`.
+
+    A clip relayed from ElevenLabs holds an upstream slot and an open response. The
+    relay's `finally` releases them, but a generator that never started (the client
+    disconnected before the first chunk was pulled) never runs it, so `_audio_response`
+    also closes the stream from the response's background task.
+    """
+
+    def __init__(
+        self, chunks: AsyncGenerator[bytes, None], release: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> None:
+        self._chunks = chunks
+        self._release = release
+
+    def __aiter__(self) -> "_AudioStream":
+        return self
+
+    async def __anext__(self) -> bytes:
+        return await self._chunks.__anext__()
+
+    async def aclose(self) -> None:
+        try:
+            await self._chunks.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                await release()
+
+
+def _audio_response(chunks: _AudioStream) -> StreamingResponse:
+    return StreamingResponse(chunks, media_type="audio/mpeg", background=BackgroundTask(chunks.aclose))
+
+
+async def stream_speech(text: str, voice_id: Optional[str]) -> _AudioStream:
+    """
+    Return a stream of MP3 chunks for `text`.
+
+    Cached clips are replayed in chunks. Otherwise the ElevenLabs streaming endpoint is
+    opened before returning (so upstream failures still surface as a 502) and its chunks
+    are relayed as they arrive; clips small enough for the cache are kept on the way.
+    The upstream slot and response are held until the stream ends or is closed.
+    """
+    url, headers, payload, cache_key = _speech_request(text, voice_id)
+    cache = get_tts_cache()
+    cached = await speech_prefetcher.claim(cache_key) or await cache.get(cache_key)
+    if cached is not None:
+        return _AudioStream(_iter_audio_chunks(cached))
+
+    client = get_upstream_clients().elevenlabs
+
+    async def _open(timeout: float) -> "httpx.Response":
+        upstream_request = client.build_request(
+            "POST", f"{url}/stream", headers=headers, json=payload, timeout=timeout
+        )
+        response = await client.send(upstream_request, stream=True)
+        if response.status_code != 200:
+            try:
+                detail = (await response.aread()).decode("utf-8", errors="replace")
+            finally:
+                await response.aclose()
+            raise UpstreamStatusError(response.status_code, f"Text-to-speech failed: {detail}")
+        return response
+
+    limiter = get_upstream_limiter("elevenlabs")
+    # The slot is held until the relay finishes, since the upstream stream stays open.
+    await limiter.acquire()
+    try:
+        response = await call_upstream("elevenlabs", _open, hedge=False, limit=False)
+    except BaseException:
+        limiter.release()
+        raise
+
+    released = False
+
+    async def _release() -> None:
+        nonlocal released
+        if released:
+            return
+        released = True
+        limiter.release()
+        await response.aclose()
+
+    async def _relay() -> AsyncGenerator[bytes, None]:
+        retained: Optional[bytearray] = bytearray()
+        try:
+            async for chunk in response.aiter_bytes():
+                if retained is not None:
+                    if len(retained) + len(chunk) > cache.max_entry_bytes:
+                        retained = None
+                    else:
+                        retained.extend(chunk)
+                yield chunk
+        finally:
+            await _release()
+        if retained:
+            await cache.put(cache_key, bytes(retained))
+
+    return _AudioStream(_relay(), _release)
+
+
+async def _iter_audio_chunks(audio: bytes) -> AsyncGenerator[bytes, None]:
+    view = memoryview(audio)
+    for start in range(0, len(view), AUDIO_STREAM_CHUNK_BYTES):
+        yield bytes(view[start:start + AUDIO_STREAM_CHUNK_BYTES])
+
+
+def _register_speech_handle(text: str, voice_id: Optional[str]) -> str:
+    """Remember `text` so `/audio/{handle}` can synthesize it lazily; returns the handle."""
+    _, _, _, handle = _speech_request(text, voice_id)
+    _pending_speech[handle] = (text, voice_id)
+    _pending_speech.move_to_end(handle)
+    while len(_pending_speech) > AUDIO_HANDLE_MAX_ENTRIES:
+        _pending_speech.popitem(last=False)
+    return handle
+
+
+def _long_form_segments(request: SynthesisRequest) -> Optional[List[str]]:
+    """Segments for long-form synthesis, or None when one upstream call is the better fit."""
+    if request.long_form is False or (request.long_form is None and len(request.text) < TTS_LONGFORM_MIN_CHARS):
+        return None
+    segments = split_for_speech(request.text)
+    return segments if len(segments) > 1 else None
+
+
+async def stream_long_speech(segments: List[str], voice_id: Optional[str]) -> _AudioStream:
+    """
+    Return a stream of MP3 chunks for `segments`, read in order.
+
+    The first segment is relayed from the ElevenLabs streaming endpoint so playback can
+    start right away; the others are synthesized concurrently in the meantime (and
+    cached per segment) and follow as soon as each is ready.
+    """
+    rest = SegmentSynthesis(segments[1:], lambda segment: synthesize_audio(segment, voice_id), keep_first_header=False)
+    try:
+        first = await stream_speech(segments[0], voice_id)
+    except BaseException:
+        rest.cancel()
+        raise
+
+    async def _release() -> None:
+        rest.cancel()
+        await first.aclose()
+
+    async def _relay() -> AsyncGenerator[bytes, None]:
+        started = time.perf_counter()
+        try:
+            async for chunk in first:
+                yield chunk
+            record_stage("tts_first_segment", time.perf_counter() - started)
+            async for frames in rest:
+                async for chunk in _iter_audio_chunks(frames):
+                    yield chunk
+        except HTTPException as exc:
+            # Headers are already sent; end the clip early rather than abort the response.
+            count_fallback("tts_truncated")
+            logger.warning("Long-form text-to-speech stopped early: %s", exc.detail)
+        finally:
+            await _release()
+
+    return _AudioStream(_relay(), _release)
+
+
+async def synthesize_speech(text: str, voice_id: Optional[str]) -> str:
+    with stage("tts"):
+        audio = await synthesize_audio(text, voice_id)
+    with stage("base64"):
+        return base64.b64encode(audio).decode("utf-8")
 
 
 async def transcribe_audio(file: UploadFile) -> str:
+    """
+    Transcribe an uploaded recording, streaming it from the spooled upload into the
+    upstream request so memory use does not grow with the clip length.
+    """
     if not ELEVENLABS_API_KEY:
         raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
 
-    url = ELEVENLABS_STT_ENDPOINT
+    with stage("stt_read"):
+        audio = await prepare_audio_upload(file)
+
+    boundary = new_boundary()
     headers = {
         "xi-api-key": ELEVENLABS_API_KEY,
         "Accept": "application/json",
+        "Content-Type": multipart_content_type(boundary),
     }
-    data = {"model_id": ELEVENLABS_STT_MODEL_ID}
-    file_bytes = await file.read()
-
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(
-            url,
-            headers=headers,
-            data=data,
-            files={"file": (file.filename or "audio.webm", file_bytes, file.content_type or "audio/webm")},
+    client = get_upstream_clients().elevenlabs
+
+    async def _attempt(timeout: float) -> str:
+        # A fresh body per attempt: the spooled upload can be re-read, so retries are safe.
+        body = stream_multipart(
+            boundary, {"model_id": ELEVENLABS_STT_MODEL_ID}, "file", audio.filename, audio.content_type, audio.chunks()
         )
+        response = await client.post(ELEVENLABS_STT_ENDPOINT, headers=headers, content=body, timeout=timeout)
+        return _transcript_from_response(response)
+
+    # Not hedged: two attempts would read the same upload concurrently.
+    with stage("stt"):
+        return await call_upstream("elevenlabs", _attempt, hedge=False)
 
-    if response.status_code != httpx.codes.OK:
-        raise HTTPException(status_code=502, detail=f"Speech-to-text failed: {response.text}")
+
+async def transcribe_stream(chunks: AsyncIterator[bytes], filename: str, content_type: str) -> str:
+    """Transcribe audio that is still arriving by streaming it into the upstream request."""
+    if not ELEVENLABS_API_KEY:
+        raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
+
+    boundary = new_boundary()
+    headers = {
+        "xi-api-key": ELEVENLABS_API_KEY,
+        "Accept": "application/json",
+        "Content-Type": multipart_content_type(boundary),
+    }
+    body = stream_multipart(
+        boundary,
+        {"model_id": ELEVENLABS_STT_MODEL_ID},
+        "file",
+        filename,
+        content_type,
+        chunks,
+    )
+
+    client = get_upstream_clients().elevenlabs
+
+    async def _attempt(timeout: float) -> str:
+        response = await client.post(ELEVENLABS_STT_ENDPOINT, headers=headers, content=body, timeout=timeout)
+        return _transcript_from_response(response)
+
+    # The body is consumed as it is sent, so this call cannot be retried or hedged.
+    with stage("stt"):
+        return await call_upstream("elevenlabs", _attempt, attempts=1, hedge=False)
+
+
+def _transcript_from_response(response: "httpx.Response") -> str:
+    if response.status_code != 200:
+        raise UpstreamStatusError(response.status_code, f"Speech-to-text failed: {response.text}")
 
     payload = response.json()
     text = payload.get("text")
@@ -281,58 +726,694 @@ async def transcribe_audio(file: UploadFile) -> str:
     return text
 
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat_with_assistant(request: ChatRequest) -> ChatResponse:
-    client = _get_openai_client()
+_SESSION_NOT_FOUND = "Session not found or expired; start a new one with POST /api/assist/sessions."
 
-    openai_messages = [
-        {"role": message.role, "content": message.content}
-        for message in request.history
-    ]
+
+def _resolve_session(session_id: Optional[str]) -> Optional[ConversationSession]:
+    """
+    The session to continue, None without a `session_id`.
+
+    Unknown ids (expired, lost in a restart or held by another worker) answer 404 so
+    the client can start a new session, seeded with the history it still has.
+    """
+    if not session_id:
+        return None
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=_SESSION_NOT_FOUND)
+    return session
+
+
+def _build_openai_messages(
+    request: ChatRequest,
+    session: Optional[ConversationSession] = None,
+    local: Optional[LocalExtraction] = None,
+) -> List[Dict[str, str]]:
     format_instruction = _build_format_instruction(request.section)
-    if format_instruction:
-        openai_messages.append({"role": "system", "content": format_instruction})
+    if session is not None:
+        # Stable system prefix first so upstream prompt caching can reuse it across turns.
+        openai_messages = [{"role": "system", "content": format_instruction}] if format_instruction else []
+        openai_messages.extend(session.context_messages())
+    else:
+        openai_messages = [
+            {"role": message.role, "content": message.content}
+            for message in request.history
+        ]
+        if format_instruction:
+            openai_messages.append({"role": "system", "content": format_instruction})
+    if local is not None and local.field_updates:
+        openai_messages.append({"role": "system", "content": _local_extraction_note(local)})
     openai_messages.append({"role": "user", "content": request.message})
+    return openai_messages
 
-    def _run_completion():
-        return client.chat.completions.create(
-            model=OPENAI_CHAT_MODEL,
-            messages=openai_messages,
-        )
 
-    completion = await run_in_threadpool(_run_completion)
+def _local_extraction(request: ChatRequest) -> Optional[LocalExtraction]:
+    """Run the rule-based extractor on section turns; None when it found nothing."""
+    if not FIELD_EXTRACTOR_ENABLED or _build_format_instruction(request.section) is None:
+        return None
+    with stage("local_extract"):
+        extraction = extract_fields(request.message, SECTION_FIELD_CONFIG[request.section]["fields"])
+    if not extraction.field_updates:
+        return None
+    record_outcome("skipped" if extraction.complete else "shortened")
+    return extraction
+
+
+def _route_turn(request: ChatRequest, openai_messages: List[Dict[str, str]]) -> Route:
+    """Pick the model tier for a turn from its message, section and conversation size."""
+    history_tokens = sum(
+        estimate_tokens(message["content"]) for message in openai_messages[:-1] if message["role"] != "system"
+    )
+    structured = _build_format_instruction(request.section) is not None
+    return model_router.route(TurnFeatures.of(request.message, request.section, structured, history_tokens))
+
+
+def _reply_outcome(structured: bool, response_text: str) -> str:
+    """`unstructured` when a section turn did not come back as the JSON object asked for."""
+    if not structured:
+        return "ok"
+    try:
+        payload = json.loads(_strip_code_fence(response_text))
+    except json.JSONDecodeError:
+        return "unstructured"
+    return "ok" if isinstance(payload, dict) else "unstructured"
+
+
+def _field_label(field_name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", " ", field_name).lower()
+
+
+def _local_extraction_note(local: LocalExtraction) -> str:
+    extracted = "; ".join(f"{name} = {value}" for name, value in local.field_updates.items())
+    return (
+        f"These fields were already extracted from the next user message: {extracted}. "
+        "Do not repeat them in field_updates; only add fields that are not listed."
+    )
+
+
+def _local_reply(section: Optional[int], field_updates: Dict[str, str]) -> str:
+    """Reply for turns answered entirely by the local extractor."""
+    filled = [f"{_field_label(name)} ({value})" for name, value in field_updates.items()]
+    if len(filled) > 1:
+        filled_text = ", ".join(filled[:-1]) + f" and {filled[-1]}"
+    else:
+        filled_text = filled[0]
+    description = SECTION_FIELD_CONFIG.get(section if section is not None else -1, {}).get(
+        "description", "this section"
+    )
+    return f"Got it, I've filled in the {filled_text}. What else would you like to add to the {description}?"
+
+
+def _merge_local_updates(
+    local: Optional[LocalExtraction], field_updates: Optional[Dict[str, str]]
+) -> Optional[Dict[str, str]]:
+    """Combine model and local updates; the deterministic local values win."""
+    if local is None or not local.field_updates:
+        return field_updates
+    return {**(field_updates or {}), **local.field_updates}
+
+
+async def _summarize_turns(previous_summary: str, messages: List[Dict[str, str]]) -> str:
+    client = _get_openai_client()
+    transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+    summary_messages = [
+        {
+            "role": "system",
+            "content": (
+                "Condense this grant-proposal coaching conversation into a short factual summary. "
+                "Keep names, numbers, dates, decisions and any proposal details the user provided. "
+                "Reply with the summary only."
+            ),
+        },
+        {
+            "role": "user",
+            "content": f"Existing summary:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}",
+        },
+    ]
+    completion = await call_upstream(
+        "openai",
+        lambda timeout: client.chat.completions.create(
+            model=SESSION_SUMMARY_MODEL,
+            temperature=0,
+            max_tokens=400,
+            messages=summary_messages,
+            timeout=timeout,
+        ),
+        priority=BULK,
+    )
+    return completion.choices[0].message.content or ""
+
+
+def _finish_session_turn(
+    session: Optional[ConversationSession], request: ChatRequest, chat_reply: str, usage: Any
+) -> Optional[SessionInfo]:
+    if session is None:
+        return None
+    session.record_turn(request.message, chat_reply, usage)
+    session_store.schedule_compaction(session, _summarize_turns)
+    return SessionInfo(**session.info())
+
+
+def _filter_field_updates(
+    section: Optional[int], field_updates: Optional[Dict[str, str]]
+) -> Optional[Dict[str, str]]:
+    if not field_updates:
+        return field_updates
+    allowed = _SECTION_ALLOWLISTS.get(section if section is not None else -1)
+    if not allowed:
+        return field_updates
+    filtered = {key: value for key, value in field_updates.items() if key in allowed}
+    return filtered or None
+
+
+class _SentenceChunker:
+    """Accumulate streamed text and release it in sentence-sized pieces for TTS."""
+
+    def __init__(self, min_chars: int) -> None:
+        self._buffer = ""
+        self._min_chars = min_chars
+
+    def feed(self, delta: str) -> List[str]:
+        self._buffer += delta
+        sentences: List[str] = []
+        start = 0
+        for match in _SENTENCE_BOUNDARY.finditer(self._buffer):
+            # Very short sentences ("Great!") are merged with the next one so we do
+            # not pay a full TTS round trip for a single word.
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) >= self._min_chars:
+                sentences.append(candidate)
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return remainder or None
+
+
+def _completion_delta(chunk: Any) -> str:
     try:
-        response_text = completion.choices[0].message.content or ""
+        return chunk.choices[0].delta.content or ""
     except (AttributeError, IndexError):
-        raise HTTPException(status_code=502, detail="Unexpected response from OpenAI.")
+        return ""
+
+
+async def _synthesize_sentence(sentence: str, voice_id: Optional[str]) -> Dict[str, Optional[str]]:
+    if not get_circuit_breaker("elevenlabs").available:
+        count_fallback("sentence_without_audio")
+        return {"audio_base64": None}
+    try:
+        return {"audio_base64": await synthesize_speech(sentence, voice_id)}
+    except Exception as exc:
+        count_fallback("sentence_without_audio")
+        logger.warning("Streaming text-to-speech failed for a sentence: %s", exc)
+        return {"audio_base64": None}
+
+
+async def _sentence_audio_url(
+    sentence: str, voice_id: Optional[str], audio_url_for: Callable[[str], str]
+) -> Dict[str, Optional[str]]:
+    return {"audio_url": audio_url_for(_register_speech_handle(sentence, voice_id))}
 
-    chat_reply, field_updates = _parse_structured_response(response_text)
-    if field_updates:
-        section_key = request.section if request.section is not None else -1
-        allowed = set(SECTION_FIELD_CONFIG.get(section_key, {}).get("fields", []))
-        if allowed:
-            filtered = {key: value for key, value in field_updates.items() if key in allowed}
-            field_updates = filtered or None
+
+async def _stream_chat_events(
+    request: ChatRequest,
+    client: "AsyncOpenAI",
+    session: Optional[ConversationSession],
+    audio_url_for: Optional[Callable[[str], str]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield chat events as they become available.
+
+    Text deltas are relayed as soon as OpenAI produces them. Every completed sentence is
+    sent to ElevenLabs immediately and its audio is emitted (in sentence order) as soon
+    as it is ready, interleaved with the remaining text. In section mode the model
+    replies with JSON: each allowlisted field update is emitted as a `field` event as
+    soon as its value closes, and the reply text is spoken once the JSON is complete.
+    """
+    local = _local_extraction(request)
+    openai_messages = _build_openai_messages(request, session, local)
+    structured = _build_format_instruction(request.section) is not None
+    fields = StructuredReplyParser(_SECTION_ALLOWLISTS.get(request.section) or None) if structured else None
+    chunker = _SentenceChunker(STREAM_TTS_MIN_CHARS)
+    usage: List[Any] = []
+
+    events: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+    speech_jobs: "asyncio.Queue[Optional[tuple[int, str, asyncio.Task]]]" = asyncio.Queue()
+    speech_tasks: List[asyncio.Task] = []
+
+    def _schedule_speech(sentence: str) -> None:
+        if audio_url_for is not None:
+            task = asyncio.create_task(_sentence_audio_url(sentence, request.voice_id, audio_url_for))
+        else:
+            task = asyncio.create_task(_synthesize_sentence(sentence, request.voice_id))
+        speech_jobs.put_nowait((len(speech_tasks), sentence, task))
+        speech_tasks.append(task)
+
+    async def _stream_model_reply() -> tuple[str, Optional[Dict[str, str]]]:
+        first_token = True
+        route = _route_turn(request, openai_messages)
+        async with get_upstream_limiter("openai").slot():
+            with RouteTimer(model_router, route) as routed:
+                started = time.perf_counter()
+                # Only opening the stream is retried; once tokens flow the reply is relayed as is.
+                stream = await call_upstream(
+                    "openai",
+                    lambda timeout: client.chat.completions.create(
+                        model=route.model,
+                        messages=openai_messages,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        timeout=timeout,
+                    ),
+                    hedge=False,
+                    limit=False,
+                )
+                parts: List[str] = []
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None) is not None:
+                        usage.append(chunk.usage)
+                    delta = _completion_delta(chunk)
+                    if not delta:
+                        continue
+                    if first_token:
+                        first_token = False
+                        record_stage("openai_first_token", time.perf_counter() - started)
+                    parts.append(delta)
+                    if fields is not None:
+                        for name, value in fields.feed(delta):
+                            if local is None or name not in local.field_updates:
+                                await events.put({"type": "field", "field": name, "value": value})
+                        continue
+                    await events.put({"type": "text", "delta": delta})
+                    for sentence in chunker.feed(delta):
+                        _schedule_speech(sentence)
+                routed.outcome = _reply_outcome(structured, "".join(parts))
+
+        record_stage("openai", time.perf_counter() - started)
+        with stage("parse"):
+            chat_reply, field_updates = _parse_structured_response("".join(parts))
+            field_updates = _filter_field_updates(request.section, field_updates)
+            if field_updates is None and fields is not None and fields.fields:
+                # Malformed or cut-off JSON: keep the values already sent as `field` events.
+                field_updates = dict(fields.fields)
+        return chat_reply, _merge_local_updates(local, field_updates)
+
+    async def _produce_text() -> tuple[str, Optional[Dict[str, str]]]:
+        try:
+            for name, value in (local.field_updates if local is not None else {}).items():
+                await events.put({"type": "field", "field": name, "value": value})
+            if local is not None and local.complete:
+                # Nothing left for the model to interpret: answer from the extracted values.
+                chat_reply, field_updates = _local_reply(request.section, local.field_updates), dict(local.field_updates)
+            else:
+                chat_reply, field_updates = await _stream_model_reply()
+            if structured:
+                await events.put({"type": "text", "delta": chat_reply})
+                for sentence in chunker.feed(chat_reply):
+                    _schedule_speech(sentence)
+            remainder = chunker.flush()
+            if remainder:
+                _schedule_speech(remainder)
+            return chat_reply, field_updates
+        finally:
+            speech_jobs.put_nowait(None)
+
+    async def _relay_speech() -> None:
+        try:
+            while (job := await speech_jobs.get()) is not None:
+                index, sentence, task = job
+                audio = await task
+                await events.put({"type": "audio", "index": index, "text": sentence, **audio})
+        finally:
+            events.put_nowait(None)
+
+    # Tasks copy the context, so the producer and the speech tasks it spawns share the budget.
+    with request_deadline(CHAT_DEADLINE_SECONDS):
+        producer = asyncio.create_task(_produce_text())
+    relay = asyncio.create_task(_relay_speech())
+    try:
+        while (event := await events.get()) is not None:
+            yield event
+        chat_reply, field_updates = await producer
+        session_info = _finish_session_turn(session, request, chat_reply, usage[-1] if usage else None)
+        yield {
+            "type": "done",
+            "message": chat_reply,
+            "field_updates": field_updates,
+            "session": session_info.model_dump() if session_info else None,
+        }
+    except Exception as exc:
+        logger.warning("Streaming chat failed: %s", exc)
+        yield {"type": "error", "detail": "Assistant response stream failed."}
+    finally:
+        for task in (producer, relay, *speech_tasks):
+            task.cancel()
+
+
+def _audio_url_builder(connection: HTTPConnection) -> Callable[[str], str]:
+    def _audio_url_for(handle: str) -> str:
+        url = connection.url_for("stream_audio_handle", handle=handle)
+        # Audio is always fetched over HTTP, even when the handle was issued on a WebSocket.
+        if url.scheme in ("ws", "wss"):
+            url = url.replace(scheme="https" if url.scheme == "wss" else "http")
+        return str(url)
+
+    return _audio_url_for
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat_with_assistant(request: ChatRequest, http_request: Request) -> ChatResponse:
+    _prefetch_speech(request.session_id, _next_prompts(request.section), request.voice_id)
+    with request_deadline(CHAT_DEADLINE_SECONDS):
+        return await _chat_turn(request, http_request)
+
+
+async def _chat_turn(request: ChatRequest, http_request: Request) -> ChatResponse:
+    client = _get_openai_client()
+
+    session = _resolve_session(request.session_id)
+    local = _local_extraction(request)
+    if local is not None and local.complete:
+        # Nothing left for the model to interpret: answer from the extracted values.
+        chat_reply, field_updates = _local_reply(request.section, local.field_updates), dict(local.field_updates)
+        usage = None
+    else:
+        openai_messages = _build_openai_messages(request, session, local)
+        route = _route_turn(request, openai_messages)
+        with stage("openai"), RouteTimer(model_router, route) as routed:
+            completion = await call_upstream(
+                "openai",
+                lambda timeout: client.chat.completions.create(
+                    model=route.model,
+                    messages=openai_messages,
+                    timeout=timeout,
+                ),
+            )
+            try:
+                response_text = completion.choices[0].message.content or ""
+            except (AttributeError, IndexError):
+                count_upstream_error("openai", "malformed")
+                raise HTTPException(status_code=502, detail="Unexpected response from OpenAI.")
+            routed.outcome = _reply_outcome(_build_format_instruction(request.section) is not None, response_text)
+
+        with stage("parse"):
+            chat_reply, field_updates = _parse_structured_response(response_text)
+            field_updates = _merge_local_updates(local, _filter_field_updates(request.section, field_updates))
+        usage = getattr(completion, "usage", None)
+    session_info = _finish_session_turn(session, request, chat_reply, usage)
+
+    if request.audio_mode == "url":
+        audio_url = _audio_url_builder(http_request)(_register_speech_handle(chat_reply, request.voice_id))
+        return ChatResponse(
+            message=chat_reply, audio_url=audio_url, field_updates=field_updates, session=session_info
+        )
 
     audio_base64 = None
+    if not get_circuit_breaker("elevenlabs").available:
+        # ElevenLabs is failing: answer with text only instead of waiting on it.
+        count_fallback("chat_without_audio")
+        return ChatResponse(message=chat_reply, field_updates=field_updates, session=session_info)
     try:
         audio_base64 = await synthesize_speech(chat_reply, request.voice_id)
-    except HTTPException:
+    except HTTPException as exc:
         # Propagate configuration errors, but swallow synthesis issues to keep chat functional.
-        raise
+        if exc.status_code == 500:
+            raise
+        count_fallback("chat_without_audio")
     except Exception:
+        count_fallback("chat_without_audio")
         audio_base64 = None
 
-    return ChatResponse(message=chat_reply, audio_base64=audio_base64, field_updates=field_updates)
+    return ChatResponse(
+        message=chat_reply, audio_base64=audio_base64, field_updates=field_updates, session=session_info
+    )
+
+
+@router.post("/chat/stream")
+async def stream_chat_with_assistant(request: ChatRequest, http_request: Request) -> StreamingResponse:
+    """
+    Streaming variant of `/chat` that emits newline-delimited JSON events.
+
+    Event types: `text` (reply delta), `field` (one field update in section mode, sent
+    as soon as it is known), `audio` (one sentence, in order, carrying either
+    `audio_base64` or an `audio_url` depending on `audio_mode`), `done` (final message
+    and field updates) and `error`.
+    """
+    client = _get_openai_client()
+    if not ELEVENLABS_API_KEY:
+        raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
+    session = _resolve_session(request.session_id)
+    _prefetch_speech(request.session_id, _next_prompts(request.section), request.voice_id)
+
+    async def _encode() -> AsyncIterator[str]:
+        audio_url_for = _audio_url_builder(http_request) if request.audio_mode == "url" else None
+        async for event in _stream_chat_events(request, client, session, audio_url_for):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(
+        _encode(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/sessions", response_model=SessionInfo, status_code=201)
+async def create_session(request: Optional[SessionCreateRequest] = None) -> SessionInfo:
+    """Start a server-side conversation; pass the returned `session_id` to `/chat`."""
+    session = session_store.create()
+    if request is not None:
+        session.history.extend({"role": message.role, "content": message.content} for message in request.history)
+    return SessionInfo(**session.info())
+
+
+@router.get("/sessions/{session_id}", response_model=SessionInfo)
+async def get_session(session_id: str) -> SessionInfo:
+    """Report turn count, token usage and history size for a session."""
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired.")
+    return SessionInfo(**session.info())
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+async def delete_session(session_id: str) -> None:
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found or expired.")
 
 
 @router.post("/tts", response_model=SynthesisResponse)
 async def text_to_speech(request: SynthesisRequest) -> SynthesisResponse:
-    audio_base64 = await synthesize_speech(request.text, request.voice_id)
-    return SynthesisResponse(audio_base64=audio_base64)
+    """
+    Synthesize narration. Long texts are split at sentence and paragraph boundaries and
+    the segments are synthesized concurrently, then joined into one MP3.
+    """
+    segments = _long_form_segments(request)
+    if segments is None:
+        with request_deadline(TTS_DEADLINE_SECONDS):
+            audio_base64 = await synthesize_speech(request.text, request.voice_id)
+        return SynthesisResponse(audio_base64=audio_base64)
+
+    with request_deadline(TTS_LONGFORM_DEADLINE_SECONDS), stage("tts"):
+        synthesis = SegmentSynthesis(segments, lambda segment: synthesize_audio(segment, request.voice_id))
+        audio = await synthesis.join()
+    with stage("base64"):
+        return SynthesisResponse(audio_base64=base64.b64encode(audio).decode("utf-8"))
+
+
+@router.post("/tts/stream")
+async def stream_text_to_speech(request: SynthesisRequest) -> StreamingResponse:
+    """Relay MP3 audio as ElevenLabs produces it instead of base64 in a JSON body."""
+    segments = _long_form_segments(request)
+    if segments is None:
+        with request_deadline(TTS_DEADLINE_SECONDS):
+            chunks = await stream_speech(request.text, request.voice_id)
+    else:
+        # Segment tasks start inside the scope, so they inherit the long-form budget.
+        with request_deadline(TTS_LONGFORM_DEADLINE_SECONDS):
+            chunks = await stream_long_speech(segments, request.voice_id)
+    return _audio_response(chunks)
+
+
+@router.get("/audio/{handle}", name="stream_audio_handle")
+async def stream_audio_handle(handle: str) -> StreamingResponse:
+    """Stream audio for a handle returned by `/chat` or `/chat/stream` in `url` mode."""
+    pending = _pending_speech.get(handle)
+    if pending is None:
+        cached = await get_tts_cache().get(handle)
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Audio not found or expired.")
+        chunks = _AudioStream(_iter_audio_chunks(cached))
+    else:
+        chunks = await stream_speech(*pending)
+    return _audio_response(chunks)
+
+
+@router.get("/routing")
+async def model_routing_stats() -> Dict[str, Any]:
+    """Report the model tiers, routing thresholds and per-tier latency and failure averages."""
+    return model_router.info()
+
+
+@router.get("/tts/cache")
+async def text_to_speech_cache_stats() -> Dict[str, int]:
+    """Report hit/miss/eviction counters and current size of the TTS audio cache."""
+    return get_tts_cache().stats()
+
+
+@router.post("/tts/prefetch", response_model=PrefetchResponse, status_code=202)
+async def prefetch_text_to_speech(request: PrefetchRequest) -> PrefetchResponse:
+    """
+    Hint that the user is typing or talking in `section`, so the prompts the assistant
+    will speak next are synthesized into the TTS cache in the background, within the
+    prefetch budget. Returns how many clips were started.
+    """
+    texts = _next_prompts(request.section) + [text for text in request.texts if text.strip()]
+    return PrefetchResponse(started=_prefetch_speech(request.session_id, texts, request.voice_id))
+
+
+@router.get("/tts/prefetch")
+async def text_to_speech_prefetch_stats() -> Dict[str, Any]:
+    """Report prefetch outcomes (hits, late hits, wasted, cancelled, skipped) and characters spent."""
+    return speech_prefetcher.stats()
 
 
 @router.post("/stt", response_model=TranscriptionResponse)
 async def speech_to_text(file: UploadFile = File(...)) -> TranscriptionResponse:
-    text = await transcribe_audio(file)
+    with request_deadline(STT_DEADLINE_SECONDS):
+        text = await transcribe_audio(file)
     return TranscriptionResponse(text=text)
+
+
+async def _drain_audio(queue: "asyncio.Queue[Optional[bytes]]") -> AsyncIterator[bytes]:
+    while (chunk := await queue.get()) is not None:
+        yield chunk
+
+
+def _parse_control_message(text: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not text:
+        return None
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+async def _receive_turn_start(websocket: WebSocket) -> VoiceTurnStart:
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        control = _parse_control_message(message.get("text"))
+        if control is None or control.get("type") != "start":
+            continue  # audio or a `stop` left over from an aborted turn
+        try:
+            return VoiceTurnStart.model_validate(control)
+        except ValidationError:
+            await websocket.send_json({"type": "error", "detail": "Invalid `start` message."})
+
+
+async def _skip_turn_audio(websocket: WebSocket) -> None:
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        if (_parse_control_message(message.get("text")) or {}).get("type") == "stop":
+            return
+
+
+async def _run_voice_turn(
+    websocket: WebSocket,
+    client: "AsyncOpenAI",
+    start: VoiceTurnStart,
+    history: List[ConversationMessage],
+) -> None:
+    try:
+        session = _resolve_session(start.session_id)
+    except HTTPException as exc:
+        # Say so before the user finishes speaking; the turn's audio is discarded.
+        await websocket.send_json({"type": "error", "detail": exc.detail, "status": exc.status_code})
+        await _skip_turn_audio(websocket)
+        return
+    audio: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+    transcription = asyncio.create_task(transcribe_stream(_drain_audio(audio), start.filename, start.mime_type))
+    received = 0
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            chunk = message.get("bytes")
+            if chunk is not None:
+                received += len(chunk)
+                if received > VOICE_MAX_TURN_BYTES:
+                    await websocket.send_json({"type": "error", "detail": "Recording exceeds the size limit."})
+                    return
+                audio.put_nowait(chunk)
+            elif (_parse_control_message(message.get("text")) or {}).get("type") == "stop":
+                break
+        audio.put_nowait(None)
+
+        if not received:
+            await websocket.send_json({"type": "error", "detail": "No audio received for this turn."})
+            return
+        try:
+            transcript = await transcription
+        except HTTPException as exc:
+            await websocket.send_json({"type": "error", "detail": exc.detail})
+            return
+    finally:
+        transcription.cancel()
+
+    await websocket.send_json({"type": "transcript", "text": transcript})
+
+    request = ChatRequest(
+        message=transcript,
+        history=history,
+        voice_id=start.voice_id,
+        section=start.section,
+        audio_mode=start.audio_mode,
+        session_id=start.session_id,
+    )
+    audio_url_for = _audio_url_builder(websocket) if start.audio_mode == "url" else None
+    async for event in _stream_chat_events(request, client, session, audio_url_for):
+        await websocket.send_json(event)
+        if event["type"] == "done" and not start.session_id:
+            history.append(ConversationMessage(role="user", content=transcript))
+            history.append(ConversationMessage(role="assistant", content=event["message"]))
+
+
+@router.websocket("/voice")
+async def voice_conversation(websocket: WebSocket) -> None:
+    """
+    Realtime spoken turns over one WebSocket: audio in, transcript, reply text and audio out.
+
+    Per turn the client sends a JSON `start` message (see `VoiceTurnStart`), binary audio
+    frames as they are recorded, then `{"type": "stop"}`. Audio is forwarded to
+    speech-to-text while it arrives; the transcript is answered with the same
+    section-aware prompt as `/chat`, and the reply comes back as the `/chat/stream`
+    events preceded by a `transcript` event. History is kept on the socket between turns.
+    """
+    await websocket.accept()
+    if not OPENAI_API_KEY or not openai_available() or not ELEVENLABS_API_KEY:
+        await websocket.send_json({"type": "error", "detail": "Voice assistant is not configured on the server."})
+        await websocket.close(code=1011)
+        return
+
+    client = get_upstream_clients().openai
+    history: List[ConversationMessage] = []
+    try:
+        while True:
+            start = await _receive_turn_start(websocket)
+            if start.history is not None:
+                history = list(start.history)
+            # Synthesized while the user is still speaking.
+            _prefetch_speech(start.session_id or websocket, _next_prompts(start.section), start.voice_id)
+            await _run_voice_turn(websocket, client, start, history)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        speech_prefetcher.forget(websocket)
@@ -1,17 +1,29 @@
+import asyncio
+import hashlib
 import json
 import logging
 import os
 import re
-from typing import List, Optional
+import uuid
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from starlette.concurrency import run_in_threadpool
 
-try:  # pragma: no cover - optional dependency
-    from openai import OpenAI
-except ImportError:  # pragma: no cover - gracefully handle missing package
-    OpenAI = None  # type: ignore[assignment]
+from ...services.analysis_cache import analysis_cache_key, get_analysis_cache
+from ...services.documents import extract_upload_text, spool_upload
+from ...services.jobs import Job, JobQueue, register_job_queue
+from ...services.keywords import section_keyword_scanner
+from ...services.metrics import count_fallback, stage
+from ...services.proposal_store import get_proposal_store
+from ...services.resilience import call_upstream, get_circuit_breaker, request_deadline
+from ...services.scheduler import AdmissionRejected, BULK
+from ...services.upstream import get_upstream_clients, openai_available
+
+if TYPE_CHECKING:  # pragma: no cover - imported lazily by services.upstream
+    from openai import AsyncOpenAI
 
 router = APIRouter(prefix="/proposals", tags=["proposals"])
 
@@ -19,6 +31,13 @@ logger = logging.getLogger(__name__)
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
+ANALYSIS_CHUNK_CHARS = int(os.getenv("ANALYSIS_CHUNK_CHARS", "12000"))
+# Most sections scored separately per draft; beyond it, runs of neighbouring sections are scored together.
+ANALYSIS_MAX_CHUNKS = int(os.getenv("ANALYSIS_MAX_CHUNKS", "32"))
+# Sections shorter than this are scored together with the section before them.
+ANALYSIS_SECTION_MIN_CHARS = int(os.getenv("ANALYSIS_SECTION_MIN_CHARS", "400"))
+ANALYSIS_MAX_CONCURRENCY = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "4"))
+ANALYSIS_DEADLINE_SECONDS = float(os.getenv("ANALYSIS_DEADLINE_SECONDS", "45"))
 
 
 class DraftAnalysis(BaseModel):
@@ -49,77 +68,264 @@ class ProposalPayload(BaseModel):
     risks: Optional[str] = None
 
 
+class ProposalUpdate(BaseModel):
+    project_title: Optional[str] = None
+    organization_name: Optional[str] = None
+    submission_date: Optional[str] = None
+    executive_summary: Optional[str] = None
+    community_background: Optional[str] = None
+    problem_description: Optional[str] = None
+    objectives: Optional[List[str]] = None
+    milestones: Optional[List[str]] = None
+    requested_amount: Optional[str] = None
+    risks: Optional[str] = None
+
+
+class SectionScoreChange(BaseModel):
+    section: str
+    status: Literal["added", "removed", "changed", "unchanged"]
+    previous_score: Optional[int] = None
+    score: Optional[int] = None
+    delta: Optional[int] = None
+
+
+class AnalysisDiff(BaseModel):
+    analysis_id: str
+    previous_id: str
+    sections_reused: int = Field(..., description="Draft sections whose results were carried over unchanged")
+    sections_rescored: int = Field(..., description="Draft sections that were new or edited and scored again")
+    sections: List[SectionScoreChange]
+
+
+@dataclass
+class AnalysisRun:
+    results: List[DraftAnalysis]
+    cache_status: str  # hit, partial, miss or bypass
+    analysis_id: Optional[str] = None
+    units: List[str] = field(default_factory=list)  # section fingerprints, in draft order
+    sections_reused: int = 0
+    sections_analyzed: int = 0
+    sections_failed: int = 0
+
+
 class ProposalResponse(BaseModel):
     message: str
     proposal_id: str
 
 
+PROPOSAL_FIELDS = set(ProposalPayload.model_fields) | {"created_at", "updated_at"}
+
+
 @router.post("/analyze", response_model=List[DraftAnalysis])
-async def analyze_draft(file: UploadFile = File(...)) -> List[DraftAnalysis]:
-    """Analyze an uploaded proposal draft and return section-level scoring."""
+async def analyze_draft(response: Response, file: UploadFile = File(...)) -> List[DraftAnalysis]:
+    """
+    Analyze an uploaded proposal draft and return section-level scoring.
 
-    content = await file.read()
+    Model results are cached per draft and per section. The `X-Analysis-Cache` header
+    reports `hit` (nothing rescored), `partial` (unchanged sections reused, edited ones
+    rescored), `miss`, or `bypass` when the heuristic fallback produced the result.
+    `X-Analysis-Id` names the result for `GET /analyses/{id}/diff`.
+    """
+
+    with stage("upload"):
+        extracted_text = _require_text(await extract_upload_text(file))
+
+    run = await _analyze_text(extracted_text)
+    response.headers[ANALYSIS_CACHE_HEADER] = run.cache_status
+    if run.analysis_id is not None:
+        response.headers[ANALYSIS_ID_HEADER] = run.analysis_id
+    if run.units:
+        response.headers[ANALYSIS_SECTIONS_HEADER] = f"reused={run.sections_reused}, analyzed={run.sections_analyzed}"
+    return run.results
 
-    if not content:
+
+def _require_text(extracted_text: str) -> str:
+    if not extracted_text:
         raise HTTPException(status_code=400, detail="Uploaded file is empty.")
 
-    extracted_text = _extract_text(content)
     if not extracted_text.strip():
         raise HTTPException(
             status_code=400,
             detail="Uploaded file does not contain readable text for analysis.",
         )
-
-    if OPENAI_API_KEY and OpenAI is not None:
+    return extracted_text
+
+
+async def _analyze_text(
+    extracted_text: str, on_progress: Optional[Callable[[int, int], None]] = None
+) -> AnalysisRun:
+    """Analyze draft text, reusing cached results for the same draft or its unchanged sections."""
+    cache = get_analysis_cache()
+    analysis_id = analysis_cache_key(extracted_text.strip(), OPENAI_CHAT_MODEL, ANALYSIS_PROMPT_VERSION)
+    with stage("analysis_cache"):
+        cached = await cache.get(analysis_id)
+    if cached is not None:
+        results, units = _load_stored_analysis(cached)
+        return AnalysisRun(results, "hit", analysis_id, units, sections_reused=len(units))
+
+    if OPENAI_API_KEY and openai_available() and not get_circuit_breaker("openai").available:
+        # OpenAI is failing: go straight to the heuristic instead of waiting on it.
+        logger.info("OpenAI circuit open, using heuristic analysis.")
+    elif OPENAI_API_KEY and openai_available():
         try:
-            return await _analyze_with_openai(extracted_text)
-        except HTTPException:
-            raise
+            with stage("openai_analysis"), request_deadline(ANALYSIS_DEADLINE_SECONDS):
+                run = await _analyze_with_openai(extracted_text, on_progress)
+        except HTTPException as exc:
+            # Configuration errors and admission-control rejections go back to the client;
+            # upstream failures, deadline expiry and an open circuit use the heuristic.
+            if exc.status_code == 500 or isinstance(exc, AdmissionRejected):
+                raise
+            logger.warning("OpenAI analysis failed, falling back to heuristic scoring: %s", exc.detail)
         except Exception as exc:  # pragma: no cover - defensive logging
             logger.warning("OpenAI analysis failed, falling back to heuristic scoring: %s", exc)
+        else:
+            # A partial result is not stored for the whole draft: the next request then
+            # rescores only the sections that failed instead of repeating the gaps.
+            if not run.sections_failed:
+                run.analysis_id = analysis_id
+                stored = {"sections": [result.model_dump() for result in run.results], "units": run.units}
+                await cache.set(analysis_id, json.dumps(stored))
+            return run
 
-    return _fallback_analysis(extracted_text)
+    # Heuristic results are cheap to recompute and should not mask the model once it
+    # is reachable again, so they are never cached.
+    count_fallback("analysis_heuristic")
+    with stage("fallback_analysis"):
+        return AnalysisRun(_fallback_analysis(extracted_text), "bypass")
 
 
-def _get_openai_client() -> OpenAI:
-    if not OPENAI_API_KEY or OpenAI is None:
-        raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured.")
-    return OpenAI(api_key=OPENAI_API_KEY)
+def _load_stored_analysis(payload: str) -> Tuple[List[DraftAnalysis], List[str]]:
+    stored = json.loads(payload)
+    return [DraftAnalysis(**item) for item in stored["sections"]], list(stored["units"])
 
 
-async def _analyze_with_openai(text: str) -> List[DraftAnalysis]:
-    client = _get_openai_client()
+def _get_openai_client() -> "AsyncOpenAI":
+    if not OPENAI_API_KEY or not openai_available():
+        raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured.")
+    return get_upstream_clients().openai
+
+
+# Bump whenever the prompt, chunking or merge logic changes so cached results expire.
+ANALYSIS_PROMPT_VERSION = "5"
+ANALYSIS_CACHE_HEADER = "X-Analysis-Cache"
+ANALYSIS_ID_HEADER = "X-Analysis-Id"
+ANALYSIS_SECTIONS_HEADER = "X-Analysis-Sections"
+
+_ANALYSIS_SYSTEM_PROMPT = (
+    "You are an expert grant reviewer. Assess the provided proposal text and "
+    "score each major section between 0 and 100. Return JSON with a `sections` "
+    "array. Each element must include `section`, `summary`, `recommendations` "
+    "(array of strings), and `score` (integer)."
+)
+
+# Short lines that look like section headings: numbered ("2.1 Budget"), ending in a
+# colon, ALL CAPS, or starting with one of the standard proposal section names.
+_HEADING_PATTERN = re.compile(
+    r"^(?=[^\n]{3,100}$)"
+    r"(?:\d+(?:\.\d+)*[.)]?\s+\S.*"
+    r"|.+:"
+    r"|[A-Z0-9][A-Z0-9 &/,'()-]+"
+    r"|(?i:executive summary|community (?:context|background)|problem|project (?:description|objectives)"
+    r"|implementation|budget|(?:expected )?outcomes|evaluation|alignment|sustainability|risk)\b.*)$",
+    re.MULTILINE,
+)
+_SOFT_BREAK = re.compile(r"\n|(?<=[.!?])\s")
+
+
+def _split_sections(text: str) -> List[str]:
+    """Split normalized draft text into blocks that each start at a heading."""
+    starts = [match.start() for match in _HEADING_PATTERN.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts[1:] + [len(text)]
+    return [text[start:end].strip() for start, end in zip(starts, bounds) if text[start:end].strip()]
+
+
+def _split_oversized(block: str, limit: int) -> List[str]:
+    pieces: List[str] = []
+    while len(block) > limit:
+        cut = None
+        for match in _SOFT_BREAK.finditer(block, 0, limit):
+            cut = match.end()
+        cut = cut if cut and cut > limit // 2 else limit
+        pieces.append(block[:cut].strip())
+        block = block[cut:]
+    if block.strip():
+        pieces.append(block.strip())
+    return pieces
+
+
+def _group_runs(sections: List[str], limit: int) -> List[str]:
+    """
+    Join neighbouring sections into at most `limit` runs.
+
+    A run ends after a section whose text hash is a multiple of the average run length,
+    so where runs end depends on the sections' own text rather than their positions:
+    inserting, removing or editing a section only changes the run it lands in and the
+    one after it. The average run length is a power of two large enough for `limit`,
+    so it only changes when the section count doubles. Drafts too long to fit in `limit`
+    runs of ANALYSIS_CHUNK_CHARS still get more.
+    """
+    spacing = 1
+    while spacing * limit < len(sections):
+        spacing *= 2
+    while True:
+        runs: List[List[str]] = [[]]
+        for section in sections:
+            runs[-1].append(section)
+            digest = hashlib.sha1(" ".join(section.split()).encode("utf-8")).digest()
+            if int.from_bytes(digest[:8], "big") % spacing == 0:
+                runs.append([])
+        runs = [run for run in runs if run]
+        if len(runs) <= limit:
+            break
+        spacing *= 2
+    # Runs longer than ANALYSIS_CHUNK_CHARS are cut between sections, counting from the run's start.
+    joined: List[str] = []
+    for run in runs:
+        current = run[0]
+        for section in run[1:]:
+            if len(current) + 1 + len(section) > ANALYSIS_CHUNK_CHARS:
+                joined.append(current)
+                current = section
+            else:
+                current = f"{current}\n{section}"
+        joined.append(current)
+    return joined
+
+
+def _analysis_units(text: str) -> List[str]:
+    """
+    Split draft text into the sections that are scored (and cached) independently.
 
-    condensed_text = text if len(text) <= 15000 else text[:15000]
+    A block shorter than ANALYSIS_SECTION_MIN_CHARS joins the one before it and a block
+    longer than ANALYSIS_CHUNK_CHARS is cut at sentence ends. Both decisions depend on the
+    block alone, so an edit changes the section it falls in and leaves the others as they
+    were. A draft with more than ANALYSIS_MAX_CHUNKS sections is scored in runs of
+    neighbouring sections (see `_group_runs`), which keeps edits just as local.
+    """
+    sections: List[str] = []
+    for block in _split_sections(text):
+        if sections and len(block) < ANALYSIS_SECTION_MIN_CHARS:
+            sections[-1] = f"{sections[-1]}\n{block}"
+        else:
+            sections.append(block)
+    limit = max(ANALYSIS_MAX_CHUNKS, 1)
+    if len(sections) > limit:
+        sections = _group_runs(sections, limit)
+    return [piece for section in sections for piece in _split_oversized(section, ANALYSIS_CHUNK_CHARS)]
 
-    system_prompt = (
-        "You are an expert grant reviewer. Assess the provided proposal text and "
-        "score each major section between 0 and 100. Return JSON with a `sections` "
-        "array. Each element must include `section`, `summary`, `recommendations` "
-        "(array of strings), and `score` (integer)."
-    )
 
-    def _run_completion():
-        return client.chat.completions.create(
-            model=OPENAI_CHAT_MODEL,
-            temperature=0.2,
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {
-                    "role": "user",
-                    "content": "Analyze the following proposal and respond with JSON only.\n\n" + condensed_text,
-                },
-            ],
-        )
+def _section_fingerprint(unit: str) -> str:
+    """Cache key of one section; whitespace-only edits (reflowed lines) keep the same key."""
+    return analysis_cache_key(" ".join(unit.split()), OPENAI_CHAT_MODEL, f"{ANALYSIS_PROMPT_VERSION}/section")
 
-    completion = await run_in_threadpool(_run_completion)
 
-    try:
-        payload = completion.choices[0].message.content or "{}"
-    except (AttributeError, IndexError) as exc:  # pragma: no cover - defensive guard
-        raise ValueError("Unexpected response from analysis model.") from exc
+def _section_key(name: str) -> str:
+    return " ".join(name.lower().split())
+
 
+def _parse_analysis_sections(payload: str) -> List[DraftAnalysis]:
     try:
         data = json.loads(payload)
     except json.JSONDecodeError as exc:  # pragma: no cover - propagate parse failure
@@ -156,43 +362,169 @@ async def _analyze_with_openai(text: str) -> List[DraftAnalysis]:
             )
         )
 
-    if not results:
-        raise ValueError("AI analysis did not return any sections.")
-
     return results
 
 
-def _extract_text(content: bytes) -> str:
-    """Attempt to decode uploaded content into text."""
+async def _analyze_chunk(client: "AsyncOpenAI", chunk: str, index: int, total: int) -> List[DraftAnalysis]:
+    if total == 1:
+        instruction = "Analyze the following proposal and respond with JSON only."
+    else:
+        instruction = (
+            f"The following is part {index + 1} of {total} of a longer proposal. "
+            "Score only the sections that appear in this part and respond with JSON only."
+        )
 
-    for encoding in ("utf-8", "utf-16", "latin-1"):
-        try:
-            decoded = content.decode(encoding)
-            return re.sub(r"\s+", " ", decoded)
-        except UnicodeDecodeError:
-            continue
-    return ""
+    # Bulk priority: interactive chat is served first when OpenAI slots are scarce.
+    completion = await call_upstream(
+        "openai",
+        lambda timeout: client.chat.completions.create(
+            model=OPENAI_CHAT_MODEL,
+            temperature=0.2,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": _ANALYSIS_SYSTEM_PROMPT},
+                {"role": "user", "content": f"{instruction}\n\n{chunk}"},
+            ],
+            timeout=timeout,
+        ),
+        priority=BULK,
+    )
+
+    try:
+        payload = completion.choices[0].message.content or "{}"
+    except (AttributeError, IndexError) as exc:  # pragma: no cover - defensive guard
+        raise ValueError("Unexpected response from analysis model.") from exc
+
+    return _parse_analysis_sections(payload)
+
+
+def _merge_chunk_analyses(weighted: List[tuple[int, List[DraftAnalysis]]]) -> List[DraftAnalysis]:
+    """Combine per-chunk results into one entry per section, weighting scores by chunk size."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for weight, analyses in weighted:
+        for analysis in analyses:
+            key = _section_key(analysis.section)
+            entry = merged.setdefault(
+                key,
+                {"section": analysis.section, "summaries": [], "recommendations": [], "score": 0.0, "weight": 0},
+            )
+            if analysis.summary and analysis.summary not in entry["summaries"]:
+                entry["summaries"].append(analysis.summary)
+            for recommendation in analysis.recommendations:
+                if recommendation not in entry["recommendations"]:
+                    entry["recommendations"].append(recommendation)
+            entry["score"] += analysis.score * weight
+            entry["weight"] += weight
+
+    return [
+        DraftAnalysis(
+            section=entry["section"],
+            summary=" ".join(entry["summaries"]),
+            recommendations=entry["recommendations"],
+            score=round(entry["score"] / entry["weight"]) if entry["weight"] else 0,
+        )
+        for entry in merged.values()
+    ]
+
+
+async def _analyze_with_openai(
+    text: str, on_progress: Optional[Callable[[int, int], None]] = None
+) -> AnalysisRun:
+    """
+    Score the draft section by section, reusing results for sections scored before.
+
+    Each section (see `_analysis_units`) is looked up in the analysis cache by its
+    fingerprint; only new or edited sections go to the model, concurrently, and each
+    result is cached as soon as it arrives. Re-analysing an edited draft therefore
+    costs about as much as the edit. Sections that fail are skipped as long as at least
+    one section has results. `on_progress` is called with (sections scored, sections to
+    score) as each model call completes.
+    """
+    client = _get_openai_client()
+    cache = get_analysis_cache()
+    units = _analysis_units(text)
+    keys = [_section_fingerprint(unit) for unit in units]
+    distinct = list(dict.fromkeys(keys))
+    with stage("analysis_cache"):
+        cached = await asyncio.gather(*(cache.get(key) for key in distinct))
+    known: Dict[str, List[DraftAnalysis]] = {
+        key: [DraftAnalysis(**item) for item in json.loads(value)]
+        for key, value in zip(distinct, cached)
+        if value is not None
+    }
+    # First occurrence of each section not scored before, with its position in the draft.
+    pending: Dict[str, Tuple[int, str]] = {}
+    for index, (key, unit) in enumerate(zip(keys, units)):
+        if key not in known and key not in pending:
+            pending[key] = (index, unit)
+
+    semaphore = asyncio.Semaphore(max(ANALYSIS_MAX_CONCURRENCY, 1))
+    finished = 0
+
+    async def _run(key: str, index: int, unit: str) -> List[DraftAnalysis]:
+        nonlocal finished
+        async with semaphore:
+            try:
+                analyses = await _analyze_chunk(client, unit, index, len(units))
+            finally:
+                finished += 1
+                if on_progress is not None:
+                    on_progress(finished, len(pending))
+        if analyses:
+            await cache.set(key, json.dumps([analysis.model_dump() for analysis in analyses]))
+        return analyses
+
+    outcomes = await asyncio.gather(
+        *(_run(key, index, unit) for key, (index, unit) in pending.items()),
+        return_exceptions=True,
+    )
+
+    failures: List[BaseException] = []
+    for key, outcome in zip(pending, outcomes):
+        if isinstance(outcome, BaseException):
+            failures.append(outcome)
+        else:
+            known[key] = outcome
+
+    # A section refused by admission control fails the whole request with its 503 rather
+    # than returning a silently partial analysis.
+    rejected = [failure for failure in failures if isinstance(failure, AdmissionRejected)]
+    if rejected:
+        raise rejected[0]
+    if failures:
+        if not known:
+            raise failures[0]
+        count_fallback("analysis_partial")
+        logger.warning("%d of %d analysis sections failed: %s", len(failures), len(pending), failures[0])
+
+    results = _merge_chunk_analyses(
+        [(len(unit), known[key]) for key, unit in zip(keys, units) if key in known]
+    )
+    if not results:
+        raise ValueError("AI analysis did not return any sections.")
+
+    analyzed = sum(1 for key in keys if key in pending)
+    reused = len(keys) - analyzed
+    cache_status = "hit" if not pending else "partial" if reused else "miss"
+    return AnalysisRun(
+        results,
+        cache_status,
+        units=keys,
+        sections_reused=reused,
+        sections_analyzed=analyzed,
+        sections_failed=len(failures),
+    )
 
 
 def _fallback_analysis(text: str) -> List[DraftAnalysis]:
     """Provide a deterministic heuristic analysis when AI is unavailable."""
 
-    lower_text = text.lower()
-    word_count = max(len(text.split()), 1)
-
-    section_keywords = {
-        "Executive Summary": ["executive", "summary", "overview"],
-        "Community Context": ["community", "population", "needs", "demographic"],
-        "Problem Statement": ["problem", "challenge", "issue"],
-        "Project Description": ["project", "activities", "implementation"],
-        "Budget": ["budget", "cost", "funding"],
-        "Outcomes": ["outcome", "impact", "result"],
-        "Risk Management": ["risk", "mitigation", "contingency"],
-    }
+    scan = section_keyword_scanner.present(text)
+    word_count = max(scan.word_count, 1)
 
     results: List[DraftAnalysis] = []
-    for name, keywords in section_keywords.items():
-        matches = sum(1 for keyword in keywords if keyword in lower_text)
+    for name, keywords in section_keyword_scanner.taxonomy.items():
+        matches = scan.section_matches(keywords)
         coverage_bonus = min(30, int(word_count / 200))
         score = 40 + matches * 12 + coverage_bonus
         score = max(30, min(92, score))
@@ -222,15 +554,282 @@ def _fallback_analysis(text: str) -> List[DraftAnalysis]:
     return results
 
 
+ANALYSIS_BATCH_MAX_FILES = int(os.getenv("ANALYSIS_BATCH_MAX_FILES", "20"))
+# Times a queued analysis waits out an OpenAI admission rejection before failing.
+ANALYSIS_JOB_ADMISSION_RETRIES = int(os.getenv("ANALYSIS_JOB_ADMISSION_RETRIES", "3"))
+JOB_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("JOB_EVENTS_HEARTBEAT_SECONDS", "15"))
+
+
+class AnalysisJobLinks(BaseModel):
+    job_id: str
+    filename: str
+    status: str
+    status_url: str
+    events_url: str
+
+
+class AnalysisBatchResponse(BaseModel):
+    jobs: List[AnalysisJobLinks]
+
+
+async def _run_analysis_job(job: Job) -> Dict[str, Any]:
+    job.report(stage="extracting")
+    with open(job.payload, "rb") as handle:
+        upload = UploadFile(handle, size=os.path.getsize(job.payload), filename=job.name)
+        extracted_text = _require_text(await extract_upload_text(upload))
+
+    job.report(stage="analyzing")
+
+    def _chunk_progress(done: int, total: int) -> None:
+        job.report(chunks_done=done, chunks_total=total)
+
+    for attempt in range(ANALYSIS_JOB_ADMISSION_RETRIES + 1):
+        try:
+            run = await _analyze_text(extracted_text, _chunk_progress)
+            break
+        except AdmissionRejected as exc:
+            # Unlike an interactive upload, a queued job can wait for OpenAI capacity.
+            if attempt == ANALYSIS_JOB_ADMISSION_RETRIES:
+                raise
+            job.report(stage="waiting_for_capacity")
+            await asyncio.sleep(int((exc.headers or {}).get("Retry-After", "1")))
+            job.report(stage="analyzing")
+    return {
+        "cache": run.cache_status,
+        "analysis_id": run.analysis_id,
+        "sections": [result.model_dump() for result in run.results],
+    }
+
+
+def _remove_spooled_upload(job: Job) -> None:
+    if job.payload:
+        try:
+            os.unlink(job.payload)
+        except FileNotFoundError:
+            pass
+
+
+analysis_jobs = register_job_queue(JobQueue("analysis", _run_analysis_job, cleanup=_remove_spooled_upload))
+
+
+def _job_links(job: Job, request: Request) -> AnalysisJobLinks:
+    return AnalysisJobLinks(
+        job_id=job.job_id,
+        filename=job.name,
+        status=job.status,
+        status_url=str(request.url_for("get_analysis_job", job_id=job.job_id)),
+        events_url=str(request.url_for("stream_analysis_job_events", job_id=job.job_id)),
+    )
+
+
+def _get_job_or_404(job_id: str) -> Job:
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Analysis job not found or expired.")
+    return job
+
+
+@router.post("/analyze/batch", response_model=AnalysisBatchResponse, status_code=202)
+async def submit_analysis_batch(request: Request, files: List[UploadFile] = File(...)) -> AnalysisBatchResponse:
+    """
+    Queue one background analysis per uploaded draft and return the job ids at once.
+
+    Jobs run on a fixed pool of `ANALYSIS_JOB_WORKERS` workers. Poll `status_url` (or
+    `GET /jobs?ids=...` for the whole batch) or follow `events_url`, a server-sent event
+    stream of progress ending in the result. A full queue returns 503 with Retry-After.
+    """
+    if len(files) > ANALYSIS_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Submit at most {ANALYSIS_BATCH_MAX_FILES} files per batch.")
+    analysis_jobs.check_room(len(files))
+
+    spooled: List[Tuple[str, str]] = []
+    try:
+        with stage("upload"):
+            for index, file in enumerate(files):
+                spooled.append((file.filename or f"draft-{index + 1}", await spool_upload(file)))
+        jobs = analysis_jobs.submit_many(spooled)
+    except BaseException:
+        for _, path in spooled:
+            os.unlink(path)
+        raise
+    return AnalysisBatchResponse(jobs=[_job_links(job, request) for job in jobs])
+
+
+@router.get("/jobs", response_model=List[Dict[str, Any]])
+async def list_analysis_jobs(ids: str = Query(..., description="Comma-separated job ids")) -> List[Dict[str, Any]]:
+    """Status (and results, once finished) for several jobs; unknown or expired ids report `not_found`."""
+    infos = []
+    for job_id in [value.strip() for value in ids.split(",") if value.strip()]:
+        job = analysis_jobs.get(job_id)
+        infos.append(job.info() if job is not None else {"job_id": job_id, "status": "not_found"})
+    return infos
+
+
+@router.get("/jobs/{job_id}", response_model=Dict[str, Any], name="get_analysis_job")
+async def get_analysis_job(job_id: str) -> Dict[str, Any]:
+    return _get_job_or_404(job_id).info()
+
+
+@router.get("/jobs/{job_id}/events", name="stream_analysis_job_events")
+async def stream_analysis_job_events(job_id: str) -> StreamingResponse:
+    """
+    Server-sent events for one job: a `status` event on every change (queued, running,
+    per-chunk progress) and a final `done` event carrying the result or the error.
+    """
+    job = _get_job_or_404(job_id)
+
+    async def _events() -> AsyncIterator[str]:
+        yield f"retry: {int(JOB_EVENTS_HEARTBEAT_SECONDS * 1000)}\n\n"
+        async for current in analysis_jobs.follow(job, JOB_EVENTS_HEARTBEAT_SECONDS):
+            if current is None:
+                yield ": keep-alive\n\n"  # keeps proxies with idle timeouts from closing the stream
+                continue
+            event = "done" if current.finished else "status"
+            data = json.dumps(current.info(include_result=current.finished))
+            yield f"id: {current.version}\nevent: {event}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/analyses/{analysis_id}/diff", response_model=AnalysisDiff)
+async def diff_analyses(
+    analysis_id: str,
+    previous: str = Query(..., description="X-Analysis-Id of the earlier analysis"),
+) -> AnalysisDiff:
+    """
+    Compare two analyses, usually of successive versions of a draft: how many sections
+    were rescored and how each section's score moved. Both must still be cached.
+    """
+    current_results, current_units = await _get_stored_analysis_or_404(analysis_id)
+    previous_results, previous_units = await _get_stored_analysis_or_404(previous)
+    earlier = set(previous_units)
+    reused = sum(1 for unit in current_units if unit in earlier)
+    return AnalysisDiff(
+        analysis_id=analysis_id,
+        previous_id=previous,
+        sections_reused=reused,
+        sections_rescored=len(current_units) - reused,
+        sections=_diff_sections(previous_results, current_results),
+    )
+
+
+async def _get_stored_analysis_or_404(analysis_id: str) -> Tuple[List[DraftAnalysis], List[str]]:
+    cached = await get_analysis_cache().get(analysis_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"Analysis {analysis_id} not found or expired.")
+    return _load_stored_analysis(cached)
+
+
+def _diff_sections(previous: List[DraftAnalysis], current: List[DraftAnalysis]) -> List[SectionScoreChange]:
+    earlier = {_section_key(analysis.section): analysis for analysis in previous}
+    changes: List[SectionScoreChange] = []
+    for analysis in current:
+        before = earlier.pop(_section_key(analysis.section), None)
+        if before is None:
+            changes.append(SectionScoreChange(section=analysis.section, status="added", score=analysis.score))
+            continue
+        changes.append(
+            SectionScoreChange(
+                section=analysis.section,
+                status="unchanged" if before == analysis else "changed",
+                previous_score=before.score,
+                score=analysis.score,
+                delta=analysis.score - before.score,
+            )
+        )
+    changes.extend(
+        SectionScoreChange(section=before.section, status="removed", previous_score=before.score)
+        for before in earlier.values()
+    )
+    return changes
+
+
 @router.post("", response_model=ProposalResponse, status_code=201)
 async def create_proposal(payload: ProposalPayload) -> ProposalResponse:
     """
-    Accept a structured proposal payload and return a mock identifier.
+    Save a structured proposal payload.
 
-    Hook this into persistence once a database layer is decided.
+    Every save gets a new server-generated identifier; later edits of the same
+    proposal (for example on autosave) go to `PATCH /{proposal_id}` with the returned
+    id. The write is queued and committed in the background.
     """
-    proposal_id = f"proposal-{payload.project_title.lower().replace(' ', '-')}"
+    proposal_id = f"proposal-{uuid.uuid4().hex}"
+    store = await get_proposal_store()
+    await store.upsert(proposal_id, payload.model_dump())
     return ProposalResponse(
         message="Proposal accepted for processing.",
         proposal_id=proposal_id,
     )
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - PROPOSAL_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown proposal fields: {', '.join(unknown)}.")
+    return requested
+
+
+def _select_fields(record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return record
+    return {"proposal_id": record["proposal_id"], **{name: record.get(name) for name in fields}}
+
+
+@router.get("", response_model=List[Dict[str, Any]])
+async def list_proposals(
+    organization: Optional[str] = Query(None, description="Exact organization name"),
+    title: Optional[str] = Query(None, description="Project title prefix"),
+    submitted_from: Optional[str] = Query(None, description="Earliest submission date (inclusive)"),
+    submitted_to: Optional[str] = Query(None, description="Latest submission date (inclusive)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+) -> List[Dict[str, Any]]:
+    """
+    List saved proposals, most recently updated first.
+    """
+    selected = _parse_fields(fields)
+    store = await get_proposal_store()
+    records = await store.list(
+        organization=organization,
+        title_prefix=title,
+        submitted_from=submitted_from,
+        submitted_to=submitted_to,
+        limit=limit,
+        offset=offset,
+    )
+    return [_select_fields(record, selected) for record in records]
+
+
+@router.get("/{proposal_id}", response_model=Dict[str, Any])
+async def get_proposal(
+    proposal_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+) -> Dict[str, Any]:
+    selected = _parse_fields(fields)
+    store = await get_proposal_store()
+    record = await store.get(proposal_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Proposal not found.")
+    return _select_fields(record, selected)
+
+
+@router.patch("/{proposal_id}", response_model=ProposalResponse)
+async def update_proposal(proposal_id: str, update: ProposalUpdate) -> ProposalResponse:
+    """
+    Apply a partial update, e.g. a single field edited in the form.
+    """
+    changes = update.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update.")
+    store = await get_proposal_store()
+    if not await store.update(proposal_id, changes):
+        raise HTTPException(status_code=404, detail="Proposal not found.")
+    return ProposalResponse(message="Proposal update accepted.", proposal_id=proposal_id)
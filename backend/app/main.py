@@ -1,10 +1,19 @@
 import os
-from typing import List
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .api.routes import router as api_router
+from .services.audio_upload import STT_MAX_UPLOAD_BYTES
+from .services.documents import close_document_workers
+from .services.ingest import MAX_BATCH_UPLOAD_BYTES, MAX_UPLOAD_BYTES, UploadSizeLimitMiddleware
+from .services.jobs import close_job_queues
+from .services.metrics import ServerTimingMiddleware, metrics_endpoint
+from .services.proposal_store import close_proposal_store, open_proposal_store
+from .services.readiness import Readiness, readiness_endpoint, start_warmup
+from .services.upstream import close_upstream_clients, open_upstream_clients
 
 
 def _get_allowed_origins() -> List[str]:
@@ -19,21 +28,54 @@ def _get_allowed_origins() -> List[str]:
     ]
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    readiness = app.state.readiness = Readiness(("proposal_store", "upstream_clients"))
+    app.state.upstream = await open_upstream_clients()
+    app.state.proposals = await open_proposal_store()
+    readiness.mark("proposal_store")
+    warmup = await start_warmup(readiness)
+    try:
+        yield
+    finally:
+        if warmup is not None:
+            warmup.cancel()
+        # Running analysis jobs still need the upstream clients and extraction workers.
+        await close_job_queues()
+        # Flush queued proposal writes before the process exits.
+        await close_proposal_store()
+        await close_upstream_clients()
+        close_document_workers()
+
+
 def create_app() -> FastAPI:
     """
     Application factory so tests and ASGI servers can reuse the same setup.
     """
-    app = FastAPI(title="Proposal Builder API", version="0.1.0")
+    app = FastAPI(title="Proposal Builder API", version="0.1.0", lifespan=_lifespan)
 
+    app.add_middleware(ServerTimingMiddleware)
+    app.add_middleware(
+        UploadSizeLimitMiddleware,
+        limits={
+            "/api/proposals/analyze": MAX_UPLOAD_BYTES,
+            "/api/proposals/analyze/batch": MAX_BATCH_UPLOAD_BYTES,
+            "/api/assist/stt": STT_MAX_UPLOAD_BYTES,
+        },
+    )
+    # Added last so it is the outermost middleware and also decorates early 413s.
     app.add_middleware(
         CORSMiddleware,
         allow_origins=_get_allowed_origins(),
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Analysis-Cache", "X-Analysis-Id", "X-Analysis-Sections", "Server-Timing"],
     )
 
     app.include_router(api_router, prefix="/api")
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+    app.add_route("/ready", readiness_endpoint, include_in_schema=False)
 
     return app
 
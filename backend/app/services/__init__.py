@@ -0,0 +1,3 @@
+"""
+Shared services used by the API routes (upstream clients, caches, schedulers).
+"""
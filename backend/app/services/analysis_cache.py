@@ -0,0 +1,147 @@
+"""
+Result cache for draft analysis.
+
+Entries are keyed by the SHA-256 of the normalized draft (or draft section) text plus
+the analysis model and prompt version, and expire after a TTL. The in-process backend
+is the default; the SQLite backend stores entries in a shared file so every
+uvicorn/gunicorn worker on the host sees the same cache.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+ANALYSIS_CACHE_BACKEND = os.getenv("ANALYSIS_CACHE_BACKEND", "memory").lower()
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH") or os.path.join(
+    tempfile.gettempdir(), "voicefirst-analysis-cache.sqlite3"
+)
+ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "3600"))
+# Entries are per draft and per draft section, so a cached draft takes several.
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "2048"))
+
+
+def analysis_cache_key(text: str, model: str, prompt_version: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{model}\0{prompt_version}\0".encode("utf-8"))
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class AnalysisCacheBackend(ABC):
+    """Storage interface for cached analysis payloads (opaque JSON strings)."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached payload, or None when missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        """Store `value`, evicting the oldest entries beyond `max_entries`."""
+
+
+class InMemoryAnalysisCache(AnalysisCacheBackend):
+    """Per-process LRU with TTL expiry."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        super().__init__(ttl_seconds, max_entries)
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteAnalysisCache(AnalysisCacheBackend):
+    """File-backed cache shared by every worker process on the host."""
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int) -> None:
+        super().__init__(ttl_seconds, max_entries)
+        self._path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self._path, timeout=5.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, stored_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS analysis_cache_stored_at ON analysis_cache (stored_at)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM analysis_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, value, expires_at, stored_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, value, now + self.ttl_seconds, now),
+                )
+                connection.execute("DELETE FROM analysis_cache WHERE expires_at <= ?", (now,))
+                connection.execute(
+                    "DELETE FROM analysis_cache WHERE key IN ("
+                    "SELECT key FROM analysis_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    async def get(self, key: str) -> Optional[str]:
+        return await run_in_threadpool(self._get, key)
+
+    async def set(self, key: str, value: str) -> None:
+        await run_in_threadpool(self._set, key, value)
+
+
+_cache: Optional[AnalysisCacheBackend] = None
+
+
+def get_analysis_cache() -> AnalysisCacheBackend:
+    """Return the configured backend (`ANALYSIS_CACHE_BACKEND=memory|sqlite`)."""
+    global _cache
+    if _cache is None:
+        if ANALYSIS_CACHE_BACKEND == "sqlite":
+            _cache = SQLiteAnalysisCache(ANALYSIS_CACHE_PATH, ANALYSIS_CACHE_TTL_SECONDS, ANALYSIS_CACHE_MAX_ENTRIES)
+        else:
+            _cache = InMemoryAnalysisCache(ANALYSIS_CACHE_TTL_SECONDS, ANALYSIS_CACHE_MAX_ENTRIES)
+    return _cache
@@ -0,0 +1,264 @@
+"""
+Streaming preparation of recorded audio for speech-to-text.
+
+`/assist/stt` forwards the spooled upload to ElevenLabs chunk by chunk instead of
+reading it into memory, so per-request memory stays at one read chunk however long the
+dictation is. Before anything is sent the recording is checked against
+`STT_MAX_UPLOAD_BYTES` and, when the format tells us its length (WAV headers, constant
+bitrate MP3), `STT_MAX_DURATION_SECONDS`.
+
+PCM WAV recordings can be downmixed to mono and resampled to `STT_WAV_SAMPLE_RATE` on
+the way through, which cuts the bytes sent upstream by 6x for 48 kHz stereo without
+hurting recognition. Compressed formats (WebM/Opus, MP3, M4A) are forwarded as is.
+Conversion uses the standard library's `audioop`; where it is unavailable (Python
+3.13+) WAV files are forwarded unchanged.
+"""
+
+import math
+import os
+import struct
+import warnings
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from .ingest import UPLOAD_READ_CHUNK_BYTES, upload_too_large
+from .metrics import Counter, registry
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    try:  # pragma: no cover - optional, removed from the standard library in 3.13
+        import audioop
+    except ImportError:  # pragma: no cover - WAV uploads are forwarded unchanged
+        audioop = None  # type: ignore[assignment]
+
+STT_MAX_UPLOAD_BYTES = int(os.getenv("STT_MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+STT_MAX_DURATION_SECONDS = float(os.getenv("STT_MAX_DURATION_SECONDS", "600"))
+# 0 keeps the original sample rate; WAV files are only ever downsampled.
+STT_WAV_SAMPLE_RATE = int(os.getenv("STT_WAV_SAMPLE_RATE", "16000"))
+STT_WAV_DOWNMIX = os.getenv("STT_WAV_DOWNMIX", "true").lower() not in {"0", "false", "no"}
+
+STT_BYTES = registry.register(
+    Counter("stt_audio_bytes_total", "Speech-to-text audio bytes received and forwarded upstream.", ("direction",))
+)
+
+_HEAD_BYTES = 4096
+_PCM = 1
+_EXTENSIBLE = 0xFFFE
+_UNKNOWN_SIZES = {0, 0xFFFFFFFF}
+
+# MPEG audio layer III bitrates (kbps) by bitrate index, for MPEG-1 and MPEG-2/2.5.
+_MP3_BITRATES = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+
+@dataclass
+class WavFormat:
+    channels: int
+    sample_rate: int
+    sample_width: int
+    data_offset: int
+    data_size: Optional[int]  # None when the header leaves it open (streamed recordings)
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.channels * self.sample_width
+
+
+def parse_wav_header(head: bytes) -> Optional[WavFormat]:
+    """Read the format and data chunk position of a PCM WAV file from its first bytes."""
+    if len(head) < 12 or head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        return None
+    offset = 12
+    fmt: Optional[tuple] = None
+    while offset + 8 <= len(head):
+        chunk_id, size = head[offset:offset + 4], struct.unpack_from("<I", head, offset + 4)[0]
+        body = offset + 8
+        if chunk_id == b"fmt " and body + 16 <= len(head):
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", head, body)
+            if audio_format == _EXTENSIBLE and body + 26 <= len(head):
+                audio_format = struct.unpack_from("<H", head, body + 24)[0]
+            fmt = (audio_format, channels, sample_rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None or fmt[0] != _PCM or not fmt[1] or not fmt[2] or fmt[3] % 8:
+                return None
+            return WavFormat(fmt[1], fmt[2], fmt[3] // 8, body, None if size in _UNKNOWN_SIZES else size)
+        offset = body + size + (size & 1)
+    return None
+
+
+def _mp3_bitrate(head: bytes) -> Optional[int]:
+    """Bitrate in bits per second of the first MPEG layer III frame, skipping an ID3v2 tag."""
+    offset = 0
+    if head[:3] == b"ID3" and len(head) >= 10:
+        offset = 10 + ((head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9])
+    if offset + 4 > len(head) or head[offset] != 0xFF or head[offset + 1] & 0xE0 != 0xE0:
+        return None
+    version_bits = (head[offset + 1] >> 3) & 0x03
+    layer_bits = (head[offset + 1] >> 1) & 0x03
+    index = head[offset + 2] >> 4
+    if layer_bits != 0b01 or version_bits == 0b01 or not 0 < index < 15:
+        return None
+    return _MP3_BITRATES[3 if version_bits == 0b11 else 2][index] * 1000
+
+
+def estimate_duration(head: bytes, size: Optional[int]) -> Optional[float]:
+    """Recording length in seconds when the format allows a cheap estimate, else None."""
+    wav = parse_wav_header(head)
+    if wav is not None:
+        data_size = wav.data_size if wav.data_size is not None else (size or 0) - wav.data_offset
+        return max(data_size, 0) / (wav.frame_bytes * wav.sample_rate)
+    bitrate = _mp3_bitrate(head)
+    if bitrate and size:
+        return size * 8 / bitrate  # exact for constant bitrate, a rough guide for VBR
+    return None
+
+
+def _wav_header(channels: int, sample_rate: int, sample_width: int, data_size: int) -> bytes:
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, _PCM, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8,
+        b"data", data_size,
+    )
+
+
+class WavConverter:
+    """Incremental downmix/resample of PCM WAV data; emits a WAV file with an exact header."""
+
+    def __init__(self, source: WavFormat, data_size: int, channels: int, sample_rate: int) -> None:
+        self.source = source
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self._remaining = data_size - data_size % source.frame_bytes
+        self._pending = b""
+        self._state = None
+        self._frames_left = self._remaining // source.frame_bytes * sample_rate // source.sample_rate
+        self.output_size = self._frames_left * channels * source.sample_width
+
+    @classmethod
+    def plan(cls, head: bytes, size: Optional[int]) -> Optional["WavConverter"]:
+        """A converter for this upload, or None when it should be forwarded as is."""
+        source = parse_wav_header(head)
+        if audioop is None or source is None or source.sample_width != 2:
+            return None
+        data_size = source.data_size if source.data_size is not None else (size or 0) - source.data_offset
+        if size is not None:
+            data_size = min(data_size, size - source.data_offset)
+        channels = 1 if STT_WAV_DOWNMIX else source.channels
+        if channels == 1 and source.channels > 2:
+            return None  # audioop only mixes stereo
+        sample_rate = min(source.sample_rate, STT_WAV_SAMPLE_RATE or source.sample_rate)
+        if data_size <= 0 or (channels, sample_rate) == (source.channels, source.sample_rate):
+            return None
+        return cls(source, data_size, channels, sample_rate)
+
+    def header(self) -> bytes:
+        return _wav_header(self.channels, self.sample_rate, self.source.sample_width, self.output_size)
+
+    def feed(self, data: bytes) -> bytes:
+        data = self._pending + data[: self._remaining - len(self._pending)]
+        usable = len(data) - len(data) % self.source.frame_bytes
+        self._pending, data = data[usable:], data[:usable]
+        self._remaining -= usable
+        if not data:
+            return b""
+        width = self.source.sample_width
+        if self.channels == 1 and self.source.channels == 2:
+            data = audioop.tomono(data, width, 0.5, 0.5)
+        if self.sample_rate != self.source.sample_rate:
+            data, self._state = audioop.ratecv(
+                data, width, self.channels, self.source.sample_rate, self.sample_rate, self._state
+            )
+        return self._take(data)
+
+    def finish(self) -> bytes:
+        """Pad to the length promised in the header (resampling rounds per chunk)."""
+        return b"\0" * (self._frames_left * self.channels * self.source.sample_width)
+
+    def _take(self, data: bytes) -> bytes:
+        frame = self.channels * self.source.sample_width
+        frames = min(len(data) // frame, self._frames_left)
+        self._frames_left -= frames
+        return data[: frames * frame]
+
+
+@dataclass
+class PreparedAudio:
+    """An upload checked against the limits, ready to be streamed upstream (any number of times)."""
+
+    file: UploadFile
+    filename: str
+    content_type: str
+    size: Optional[int]
+    duration: Optional[float]
+    head: bytes
+    convert: bool
+
+    async def chunks(self, chunk_bytes: int = UPLOAD_READ_CHUNK_BYTES) -> AsyncIterator[bytes]:
+        """Yield the audio to forward, reading the spooled upload from the start."""
+        await self.file.seek(0)
+        converter = WavConverter.plan(self.head, self.size) if self.convert else None
+        total = forwarded = 0
+        if converter is not None:
+            await self.file.seek(converter.source.data_offset)
+            header = converter.header()
+            forwarded += len(header)
+            yield header
+        try:
+            while True:
+                data = await self.file.read(chunk_bytes)
+                if not data:
+                    break
+                total += len(data)
+                if total > STT_MAX_UPLOAD_BYTES:
+                    raise upload_too_large(STT_MAX_UPLOAD_BYTES)
+                if converter is not None:
+                    data = converter.feed(data)
+                if data:
+                    forwarded += len(data)
+                    yield data
+            if converter is not None:
+                tail = converter.finish()
+                forwarded += len(tail)
+                if tail:
+                    yield tail
+        finally:
+            STT_BYTES.inc("received", amount=total + (converter.source.data_offset if converter else 0))
+            STT_BYTES.inc("forwarded", amount=forwarded)
+
+
+async def prepare_audio_upload(file: UploadFile) -> PreparedAudio:
+    """Check size and duration limits and decide whether the recording is converted."""
+    if file.size is not None and file.size > STT_MAX_UPLOAD_BYTES:
+        raise upload_too_large(STT_MAX_UPLOAD_BYTES)
+    head = await file.read(_HEAD_BYTES)
+    if not head:
+        raise HTTPException(status_code=400, detail="Uploaded recording is empty.")
+
+    duration = estimate_duration(head, file.size)
+    if duration is not None and duration > STT_MAX_DURATION_SECONDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Recording is {math.ceil(duration)} seconds long; the limit is {STT_MAX_DURATION_SECONDS:g} seconds.",
+        )
+
+    converter = WavConverter.plan(head, file.size)
+    filename = file.filename or "audio.webm"
+    content_type = file.content_type or "audio/webm"
+    if converter is not None:
+        filename = os.path.splitext(filename)[0] + ".wav"
+        content_type = "audio/wav"
+    return PreparedAudio(
+        file=file,
+        filename=filename,
+        content_type=content_type,
+        size=file.size,
+        duration=duration,
+        head=head,
+        convert=converter is not None,
+    )
@@ -0,0 +1,460 @@
+"""
+Text extraction for uploaded PDF and DOCX drafts.
+
+The upload's first bytes decide the format (magic bytes, not the file name or the
+client's content type). Plain text keeps the in-process streaming decoder from
+`services.ingest`. PDF and DOCX uploads are spooled to a temporary file and parsed in a
+worker process of their own (at most `DOCUMENT_EXTRACT_WORKERS` at a time), so a large
+document neither blocks the event loop nor holds the GIL. Extractors yield text page by
+page (PDF) or paragraph by paragraph (DOCX) and stop at `DOCUMENT_MAX_CHARS` /
+`DOCUMENT_MAX_PAGES`; each document also gets a wall-clock budget from the moment its
+process starts, after which that process alone is killed.
+
+PDFs are read with `pypdf` when it is installed. Without it a small built-in reader
+handles the common case (uncompressed or Flate-compressed content streams with simply
+encoded fonts); scanned or CID-font PDFs then yield no text and are reported as such.
+Further formats can be added with `register_extractor`.
+"""
+
+import asyncio
+import codecs
+import logging
+import multiprocessing
+import multiprocessing.connection
+import multiprocessing.context
+import multiprocessing.process
+import os
+import re
+import tempfile
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Set, Tuple
+from xml.etree import ElementTree
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from .ingest import MAX_UPLOAD_BYTES, UPLOAD_READ_CHUNK_BYTES, iter_upload_text, normalize_whitespace, upload_too_large
+
+try:  # pragma: no cover - optional dependency
+    import pypdf
+except ImportError:  # pragma: no cover - the built-in reader is used instead
+    pypdf = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_EXTRACT_WORKERS = int(os.getenv("DOCUMENT_EXTRACT_WORKERS", "2"))
+DOCUMENT_EXTRACT_TIMEOUT_SECONDS = float(os.getenv("DOCUMENT_EXTRACT_TIMEOUT_SECONDS", "20"))
+DOCUMENT_MAX_PAGES = int(os.getenv("DOCUMENT_MAX_PAGES", "300"))
+DOCUMENT_MAX_CHARS = int(os.getenv("DOCUMENT_MAX_CHARS", "400000"))
+# Decompressed size limit for the DOCX body and each PDF stream (zip/deflate bombs).
+DOCUMENT_MAX_EXPANDED_BYTES = int(os.getenv("DOCUMENT_MAX_EXPANDED_BYTES", str(64 * 1024 * 1024)))
+
+_SNIFF_BYTES = 1024
+_UTF16_BOMS = (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+# Formats we recognise but cannot read; reported as 415 instead of decoded as noise.
+_UNSUPPORTED_SIGNATURES = (
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "legacy Word/Office (.doc)"),
+    (b"\x89PNG", "PNG image"),
+    (b"\xff\xd8\xff", "JPEG image"),
+    (b"GIF8", "GIF image"),
+    (b"{\\rtf", "RTF"),
+)
+
+
+class DocumentError(Exception):
+    """The document could not be read (corrupt, encrypted or not what it claims to be)."""
+
+
+class DocumentTooLarge(DocumentError):
+    """The document expands beyond the configured limits."""
+
+
+@dataclass
+class DocumentFormat:
+    name: str
+    # Returns True when the first bytes of an upload belong to this format.
+    matches: Callable[[bytes], bool]
+    # Module-level generator function `(path) -> pieces of text`; runs in a worker process.
+    extract: Callable[[str], Iterator[str]]
+
+
+# -- PDF ---------------------------------------------------------------------------
+
+_PDF_OBJECT = re.compile(rb"\d+\s+\d+\s+obj\b(.*?)\bendobj", re.S)
+_PDF_STREAM = re.compile(rb"\bstream\r?\n")
+_PDF_SKIP_STREAM = re.compile(rb"/(?:Image|XRef|ObjStm|FontFile\d?|Length1|Metadata)\b")
+_PDF_ESCAPES = {ord("n"): b"\n", ord("r"): b"\r", ord("t"): b"\t", ord("b"): b"\b", ord("f"): b"\f"}
+
+
+def _pdf_literal(data: bytes, start: int) -> Tuple[bytes, int]:
+    """Read a `( ... )` string starting at `start`; returns (bytes, index after it)."""
+    out = bytearray()
+    depth = 1
+    index = start + 1
+    while index < len(data) and depth:
+        byte = data[index]
+        if byte == 0x5C:  # backslash
+            index += 1
+            if index >= len(data):
+                break
+            escaped = data[index]
+            if escaped in _PDF_ESCAPES:
+                out += _PDF_ESCAPES[escaped]
+            elif 0x30 <= escaped <= 0x37:
+                digits = data[index:index + 3]
+                octal = re.match(rb"[0-7]{1,3}", digits).group(0)  # type: ignore[union-attr]
+                out.append(int(octal, 8) & 0xFF)
+                index += len(octal) - 1
+            elif escaped not in (0x0A, 0x0D):  # a backslash before a line break continues the string
+                out.append(escaped)
+        elif byte == 0x28:
+            depth += 1
+            out.append(byte)
+        elif byte == 0x29:
+            depth -= 1
+            if depth:
+                out.append(byte)
+        else:
+            out.append(byte)
+        index += 1
+    return bytes(out), index
+
+
+def _pdf_decode(raw: bytes) -> str:
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", errors="ignore")
+    return raw.decode("latin-1")
+
+
+_PDF_TOKEN = re.compile(rb"\(|<[0-9A-Fa-f\s]*>|\[|\]|-?\d*\.?\d+|/[^\s/\[\]()<>]+|[A-Za-z'\"*]+")
+
+
+def _pdf_content_text(content: bytes) -> str:
+    """Text shown by Tj/TJ/'/\" operators in one content stream, with line breaks."""
+    out: List[str] = []
+    operands: List[bytes] = []
+    in_array = False
+    index = 0
+    while True:
+        match = _PDF_TOKEN.search(content, index)
+        if match is None:
+            break
+        token = match.group(0)
+        index = match.end()
+        if token == b"(":
+            raw, index = _pdf_literal(content, match.start())
+            operands.append(raw)
+        elif token.startswith(b"<"):
+            operands.append(bytes.fromhex(re.sub(rb"\s", b"", token[1:-1]).decode("ascii").ljust(2, "0")))
+        elif token == b"[":
+            in_array = True
+            operands = []
+        elif token == b"]":
+            in_array = False
+        elif in_array and token[:1] in b"-.0123456789":
+            if float(token) < -200:  # a large negative kern inside TJ is a word gap
+                operands.append(b" ")
+        elif token in (b"Tj", b"TJ", b"'", b'"'):
+            if token in (b"'", b'"'):
+                out.append("\n")
+            out.append("".join(_pdf_decode(piece) for piece in operands))
+            operands = []
+        elif token in (b"T*", b"Td", b"TD", b"ET"):
+            if out and not out[-1].endswith("\n"):
+                out.append("\n")
+            operands = []
+        elif not in_array and token[:1].isalpha():
+            operands = []
+    return "".join(out)
+
+
+def _pdf_stream_data(header: bytes, data: bytes) -> Optional[bytes]:
+    if b"/FlateDecode" in header:
+        decompressor = zlib.decompressobj()
+        try:
+            expanded = decompressor.decompress(data, DOCUMENT_MAX_EXPANDED_BYTES)
+        except zlib.error:
+            return None
+        if decompressor.unconsumed_tail:
+            raise DocumentTooLarge("A PDF stream expands beyond the size limit.")
+        return expanded
+    if b"/Filter" in header:
+        return None  # other filters (images, LZW, ...) carry no text we can read
+    return data
+
+
+def _pdf_builtin_pages(path: str) -> Iterator[str]:
+    with open(path, "rb") as handle:
+        data = handle.read()
+    if b"/Encrypt" in data:
+        raise DocumentError("Encrypted PDFs are not supported.")
+    for obj in _PDF_OBJECT.finditer(data):
+        body = obj.group(1)
+        stream = _PDF_STREAM.search(body)
+        if stream is None:
+            continue
+        header = body[:stream.start()]
+        if _PDF_SKIP_STREAM.search(header):
+            continue
+        end = body.rfind(b"endstream")
+        content = _pdf_stream_data(header, body[stream.end():end if end != -1 else len(body)].rstrip(b"\r\n"))
+        if content and b"BT" in content:
+            text = _pdf_content_text(content)
+            if text.strip():
+                yield text
+
+
+def _pdf_pages(path: str) -> Iterator[str]:
+    if pypdf is None:
+        yield from _pdf_builtin_pages(path)
+        return
+    try:
+        reader = pypdf.PdfReader(path)
+        if reader.is_encrypted and not reader.decrypt(""):
+            raise DocumentError("Encrypted PDFs are not supported.")
+        for page in reader.pages:
+            yield page.extract_text() or ""
+    except DocumentError:
+        raise
+    except Exception as exc:  # pypdf raises a variety of errors for damaged files
+        raise DocumentError(f"Could not read the PDF: {exc}") from exc
+
+
+# -- DOCX --------------------------------------------------------------------------
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def _docx_paragraphs(path: str) -> Iterator[str]:
+    try:
+        archive = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as exc:
+        raise DocumentError("The file is not a valid DOCX archive.") from exc
+    with archive:
+        try:
+            info = archive.getinfo("word/document.xml")
+        except KeyError:
+            raise DocumentError("The archive is not a Word document.") from None
+        if info.file_size > DOCUMENT_MAX_EXPANDED_BYTES:
+            raise DocumentTooLarge("The document body expands beyond the size limit.")
+        with archive.open(info) as body:
+            try:
+                for _, element in ElementTree.iterparse(body, events=("end",)):
+                    if element.tag != f"{_W}p":
+                        continue
+                    pieces = []
+                    for node in element.iter():
+                        if node.tag == f"{_W}t" and node.text:
+                            pieces.append(node.text)
+                        elif node.tag == f"{_W}tab":
+                            pieces.append("\t")
+                        elif node.tag in (f"{_W}br", f"{_W}cr"):
+                            pieces.append("\n")
+                    element.clear()
+                    yield "".join(pieces) + "\n"
+            except ElementTree.ParseError as exc:
+                raise DocumentError(f"Could not read the document body: {exc}") from exc
+
+
+# -- registry and worker --------------------------------------------------------------
+
+_FORMATS: List[DocumentFormat] = [
+    DocumentFormat("pdf", lambda head: b"%PDF-" in head[:_SNIFF_BYTES], _pdf_pages),
+    DocumentFormat("docx", lambda head: head.startswith(b"PK\x03\x04"), _docx_paragraphs),
+]
+
+
+def register_extractor(document_format: DocumentFormat) -> None:
+    """
+    Add a format ahead of the built-in ones.
+
+    `extract` runs in a worker process, so it must be a module-level function.
+    """
+    _FORMATS.insert(0, document_format)
+
+
+def sniff_format(head: bytes) -> Optional[DocumentFormat]:
+    """Return the extractor for `head`, None for plain text; raise 415 for unreadable formats."""
+    for document_format in _FORMATS:
+        if document_format.matches(head):
+            return document_format
+    for signature, description in _UNSUPPORTED_SIGNATURES:
+        if head.startswith(signature):
+            raise HTTPException(status_code=415, detail=f"Unsupported file type: {description}.")
+    if b"\x00" in head and not head.startswith(_UTF16_BOMS):
+        raise HTTPException(status_code=415, detail="Unsupported binary file; upload PDF, DOCX or text.")
+    return None
+
+
+def _run_extractor(
+    extract: Callable[[str], Iterator[str]], path: str, max_chars: int, max_pages: int, budget: float
+) -> Tuple[str, int]:
+    """Worker-side loop: collect pieces until a limit is reached. Returns (text, pieces read)."""
+    deadline = time.monotonic() + budget
+    pieces: List[str] = []
+    total = 0
+    count = 0
+    for count, piece in enumerate(extract(path), start=1):
+        pieces.append(piece)
+        total += len(piece)
+        if total >= max_chars or count >= max_pages:
+            break
+        if time.monotonic() > deadline:
+            raise DocumentError("Extraction took too long.")
+    return "".join(pieces)[:max_chars], count
+
+
+def _extract_in_process(
+    connection: "multiprocessing.connection.Connection",
+    extract: Callable[[str], Iterator[str]],
+    path: str,
+    max_chars: int,
+    max_pages: int,
+    budget: float,
+) -> None:
+    """Worker process entry point: send back `(True, (text, pieces))` or `(False, error)`."""
+    try:
+        result = (True, _run_extractor(extract, path, max_chars, max_pages, budget))
+    except Exception as exc:
+        result = (False, exc if isinstance(exc, DocumentError) else DocumentError(f"Could not read the document: {exc}"))
+    connection.send(result)
+    connection.close()
+
+
+def _warm_worker() -> None:
+    """No-op used to start the fork server ahead of the first upload."""
+
+
+_context: Optional[multiprocessing.context.BaseContext] = None
+_slots: Optional[asyncio.Semaphore] = None
+_running: Set[multiprocessing.process.BaseProcess] = set()
+
+
+def _get_context() -> multiprocessing.context.BaseContext:
+    global _context
+    if _context is None:
+        # forkserver/spawn: workers never inherit the server's threads or locks.
+        methods = multiprocessing.get_all_start_methods()
+        if "forkserver" in methods:
+            _context = multiprocessing.get_context("forkserver")
+            # Workers fork from a server that has the extractors imported already.
+            _context.set_forkserver_preload([__name__])
+        else:
+            _context = multiprocessing.get_context("spawn")
+    return _context
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(1, DOCUMENT_EXTRACT_WORKERS))
+    return _slots
+
+
+def _stop(process: multiprocessing.process.BaseProcess) -> None:
+    if process.is_alive():
+        process.kill()
+    process.join()
+    _running.discard(process)
+
+
+async def _extract_in_worker(
+    document_format: DocumentFormat, path: str, max_chars: int, timeout: float
+) -> Tuple[str, int]:
+    """
+    Extract one document in a process of its own, at most DOCUMENT_EXTRACT_WORKERS at once.
+
+    The timeout starts when the process does, not while the document waits for a slot,
+    and a document that runs over it kills only its own process.
+    """
+    async with _get_slots():
+        context = _get_context()
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_extract_in_process,
+            args=(sender, document_format.extract, path, max_chars, DOCUMENT_MAX_PAGES, timeout),
+            daemon=True,
+        )
+        try:
+            await run_in_threadpool(process.start)
+            _running.add(process)
+            sender.close()
+            if not await run_in_threadpool(receiver.poll, timeout):
+                raise asyncio.TimeoutError
+            try:
+                ok, result = receiver.recv()
+            except EOFError:
+                raise DocumentError("The document crashed the extractor.") from None
+        finally:
+            await run_in_threadpool(_stop, process)
+            receiver.close()
+    if not ok:
+        raise result
+    return result
+
+
+async def start_document_workers() -> None:
+    context = _get_context()
+    process = context.Process(target=_warm_worker, daemon=True)
+    await run_in_threadpool(process.start)
+    await run_in_threadpool(process.join)
+
+
+def close_document_workers() -> None:
+    """Kill extractions still running at shutdown."""
+    for process in list(_running):
+        _stop(process)
+
+
+async def spool_upload(file: UploadFile, head: bytes = b"", max_bytes: int = MAX_UPLOAD_BYTES) -> str:
+    """Copy the upload (after `head`, already read) to a temporary file; returns its path."""
+    handle = tempfile.NamedTemporaryFile(prefix="voicefirst-upload-", delete=False)
+    try:
+        with handle:
+            handle.write(head)
+            total = len(head)
+            while True:
+                data = await file.read(UPLOAD_READ_CHUNK_BYTES)
+                if not data:
+                    break
+                total += len(data)
+                if total > max_bytes:
+                    raise upload_too_large(max_bytes)
+                handle.write(data)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+    return handle.name
+
+
+async def extract_upload_text(
+    file: UploadFile,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    max_chars: int = DOCUMENT_MAX_CHARS,
+    timeout: float = DOCUMENT_EXTRACT_TIMEOUT_SECONDS,
+) -> str:
+    """Return whitespace-normalized text from an uploaded PDF, DOCX or text file."""
+    if file.size is not None and file.size > max_bytes:
+        raise upload_too_large(max_bytes)
+    head = await file.read(_SNIFF_BYTES)
+    document_format = sniff_format(head)
+    if document_format is None:
+        await file.seek(0)
+        return "".join([piece async for piece in iter_upload_text(file, max_bytes)])
+
+    path = await spool_upload(file, head, max_bytes)
+    try:
+        text, pieces = await _extract_in_worker(document_format, path, max_chars, timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=422, detail=f"Reading the {document_format.name.upper()} took too long.")
+    except DocumentTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except DocumentError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    finally:
+        os.unlink(path)
+    logger.debug("Extracted %d characters from %d %s pieces.", len(text), pieces, document_format.name)
+    return normalize_whitespace(text)
@@ -0,0 +1,251 @@
+"""
+Deterministic extraction of contact details, dates and budget amounts from chat turns.
+
+Cover Page and Budget answers are often nothing more than an email address, a phone
+number, a date or a few dollar amounts. `extract_fields` pulls those out with
+precompiled patterns so the chat endpoints can answer without a model round trip when
+the message holds nothing else, or tell the model which fields are already settled.
+
+Values use the formats the form expects: ISO dates (`2026-03-15`, for the date
+input), `(555) 123-4567` phone numbers and `$120,000` amounts.
+"""
+
+import datetime
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .metrics import Counter, registry
+
+FIELD_EXTRACTOR_ENABLED = os.getenv("FIELD_EXTRACTOR_ENABLED", "true").lower() not in {"0", "false", "no"}
+# Words left over after removing extracted values and filler before the model is still needed.
+FIELD_EXTRACTOR_MAX_RESIDUAL_WORDS = int(os.getenv("FIELD_EXTRACTOR_MAX_RESIDUAL_WORDS", "3"))
+
+LOCAL_EXTRACTIONS = registry.register(
+    Counter("local_extractions_total", "Chat turns handled by the local field extractor.", ("outcome",))
+)
+
+_EMAIL = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}\b")
+_PHONE = re.compile(
+    r"(?<![\d$])(?:\+?1[\s.-]?)?\(?(?P<area>[2-9]\d{2})\)?[\s.-]?(?P<exchange>\d{3})[\s.-]?(?P<line>\d{4})"
+    r"(?:\s?(?:x|ext\.?|extension)\s?(?P<ext>\d{1,5}))?(?![\d,])"
+)
+
+_MONTHS = {
+    name: index
+    for index, names in enumerate(
+        (
+            ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"), ("may",),
+            ("june", "jun"), ("july", "jul"), ("august", "aug"), ("september", "sep", "sept"),
+            ("october", "oct"), ("november", "nov"), ("december", "dec"),
+        ),
+        start=1,
+    )
+    for name in names
+}
+_MONTH = r"(?P<month>" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")\.?"
+_DATE_PATTERNS = (
+    re.compile(r"\b(?P<year>\d{4})-(?P<mon>\d{1,2})-(?P<day>\d{1,2})\b"),
+    re.compile(r"\b(?P<mon>\d{1,2})/(?P<day>\d{1,2})/(?P<year>\d{4})\b"),
+    re.compile(rf"\b{_MONTH}\s+(?P<day>\d{{1,2}})(?:st|nd|rd|th)?,?\s+(?P<year>\d{{4}})\b", re.IGNORECASE),
+    re.compile(rf"\b(?P<day>\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH},?\s+(?P<year>\d{{4}})\b", re.IGNORECASE),
+)
+
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_SCALE = r"(?:\s?(?P<scale>k|thousand|million|mil|m)\b)?"
+_CURRENCY = re.compile(
+    rf"(?:(?:CAD|USD|CDN|C)?\s?\$\s?(?P<amount>{_NUMBER}){_SCALE}(?:\s?(?:dollars|CAD|USD))?"
+    rf"|\b(?P<amount2>{_NUMBER})(?:\s?(?P<scale2>k|thousand|million|mil|m)\b)?\s?(?:dollars|bucks|CAD|USD)\b)",
+    re.IGNORECASE,
+)
+_SCALES = {"k": 1_000, "thousand": 1_000, "million": 1_000_000, "mil": 1_000_000, "m": 1_000_000}
+
+# Budget fields keyed by the words that introduce their amount. Specific categories win
+# over the generic "total" cues, so "the training budget is $5,000" is training.
+_BUDGET_CUES: Dict[str, Tuple[str, ...]] = {
+    "requestedAmount": ("request", "requesting", "asking for", "ask for", "applying for", "apply for", "grant of",
+                        "grant amount", "from the fund", "funding of"),
+    "communityContribution": ("contribution", "contribute", "contributing", "in-kind", "in kind", "matching",
+                              "match of", "we cover", "we will cover"),
+    "personnelBudget": ("personnel", "staff", "salaries", "salary", "wages", "coordinator", "payroll"),
+    "equipmentBudget": ("equipment", "tools", "supplies", "materials", "hardware", "vehicle"),
+    "trainingBudget": ("training", "workshop", "workshops", "courses", "certification"),
+    "marketingBudget": ("marketing", "outreach", "promotion", "advertising", "communications"),
+    "otherBudget": ("other costs", "other expenses", "miscellaneous", "misc", "contingency", "overhead",
+                    "administration", "admin"),
+}
+_TOTAL_CUES = ("total", "overall", "whole project", "project cost", "budget is", "costs", "cost")
+_BUDGET_FIELDS = set(_BUDGET_CUES)
+_CUE_PATTERNS = {
+    name: re.compile(r"\b(?:" + "|".join(re.escape(cue) for cue in cues) + r")", re.IGNORECASE)
+    for name, cues in _BUDGET_CUES.items()
+}
+_TOTAL_PATTERN = re.compile(r"\b(?:" + "|".join(re.escape(cue) for cue in _TOTAL_CUES) + r")", re.IGNORECASE)
+_CLAUSE_BREAK = re.compile(r"[.;!?\n]|,\s|\band\b|\bwhile\b|\bplus\b", re.IGNORECASE)
+
+EXTRACTABLE_FIELDS = frozenset({"contactEmail", "contactPhone", "submissionDate", "totalBudget"} | _BUDGET_FIELDS)
+
+# Words that carry no information of their own in answers like "my email is ...".
+_FILLER = frozenset(
+    """
+    a an the is are was be will would it its it's that this these those our my we i i'm we're you your
+    and or but so to of for on in at by with from as about around approximately roughly just
+    yes yeah sure ok okay ah um uh well please thanks thank also too here there
+    email e-mail address mail phone number cell mobile telephone contact reach call me us
+    date submission submit submitting submitted due deadline day
+    budget total overall cost costs project amount requested request requesting asking ask grant funding fund
+    contribution contributing contribute community in-kind kind match matching personnel staff salaries salary
+    wages equipment tools supplies materials training workshops workshop marketing outreach other misc
+    miscellaneous contingency overhead admin administration expenses expense dollars bucks cad usd
+    planned plan set going need needs
+    """.split()
+)
+# Negations and corrections ("not x@y.com", "actually it's ...") change which value is meant.
+_CORRECTION = frozenset(
+    "not no nope never don't doesn't isn't wasn't aren't won't wrong actually instead rather correction sorry".split()
+)
+# Leftover numbers count too: an ambiguous "03/04/2026" still needs the model.
+_WORD = re.compile(r"[A-Za-z][A-Za-z'-]*|\d[\d/.,:-]*")
+
+
+@dataclass
+class LocalExtraction:
+    field_updates: Dict[str, str] = field(default_factory=dict)
+    residual_words: int = 0
+
+    @property
+    def complete(self) -> bool:
+        """True when the message held only extractable values, so no model call is needed."""
+        return bool(self.field_updates) and self.residual_words <= FIELD_EXTRACTOR_MAX_RESIDUAL_WORDS
+
+
+def _format_amount(raw: str, scale: Optional[str]) -> Optional[str]:
+    try:
+        value = float(raw.replace(",", ""))
+    except ValueError:
+        return None
+    if scale:
+        value *= _SCALES[scale.lower()]
+    cents = round(value * 100)
+    if cents % 100:
+        return f"${cents / 100:,.2f}"
+    return f"${cents // 100:,}"
+
+
+def _find_dates(text: str) -> List[Tuple[Tuple[int, int], str]]:
+    found: List[Tuple[Tuple[int, int], str]] = []
+    for pattern in _DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            if any(start <= match.start() < end for (start, end), _ in found):
+                continue
+            groups = match.groupdict()
+            month = _MONTHS[groups["month"].lower()] if groups.get("month") else int(groups["mon"])
+            day, year = int(groups["day"]), int(groups["year"])
+            if groups.get("mon") and "/" in match.group(0) and day <= 12 and month != day:
+                continue  # 03/04/2026 could be either order; leave it to the model
+            try:
+                value = datetime.date(year, month, day)
+            except ValueError:
+                continue
+            found.append((match.span(), value.isoformat()))
+    return found
+
+
+def _budget_field(text: str, start: int, end: int, previous_end: int, next_start: int) -> Optional[str]:
+    """Pick the budget field an amount belongs to from the words around it."""
+    lead_start = previous_end
+    joined = ""
+    for breaker in _CLAUSE_BREAK.finditer(text, previous_end, start):
+        # Text right after the previous amount is that amount's trailing clause, not a list.
+        opens_list = breaker.group(0).lower() == "and" and (lead_start > previous_end or previous_end == 0)
+        joined = text[lead_start:breaker.start()] if opens_list else ""
+        lead_start = breaker.end()
+    lead = text[lead_start:start]
+    trail_end = next_start
+    breaker = _CLAUSE_BREAK.search(text, end, next_start)
+    if breaker is not None:
+        trail_end = breaker.start()
+    trail = text[end:trail_end]
+
+    for segment in (lead, trail):
+        matches = {name for name, pattern in _CUE_PATTERNS.items() if pattern.search(segment)}
+        if segment is lead and matches and joined.strip():
+            # "personnel and equipment cost $50,000": the amount covers both categories.
+            matches |= {name for name, pattern in _CUE_PATTERNS.items() if pattern.search(joined)}
+        if len(matches) == 1:
+            return matches.pop()
+        if len(matches) > 1:
+            return None  # "personnel and equipment cost $50,000" is ambiguous
+    if _TOTAL_PATTERN.search(lead) or _TOTAL_PATTERN.search(trail):
+        return "totalBudget"
+    return None
+
+
+def extract_fields(text: str, allowed: Iterable[str]) -> LocalExtraction:
+    """Extract allowlisted fields; values found more than once or ambiguously are skipped."""
+    allowed_fields = EXTRACTABLE_FIELDS.intersection(allowed)
+    result = LocalExtraction()
+    if not allowed_fields or not text.strip():
+        return result
+
+    consumed: List[Tuple[int, int]] = []
+    candidates: Dict[str, List[str]] = {}
+
+    if "contactEmail" in allowed_fields:
+        for match in _EMAIL.finditer(text):
+            candidates.setdefault("contactEmail", []).append(match.group(0).rstrip(".").lower())
+            consumed.append(match.span())
+
+    if "submissionDate" in allowed_fields:
+        for span, value in _find_dates(text):
+            candidates.setdefault("submissionDate", []).append(value)
+            consumed.append(span)
+
+    if "contactPhone" in allowed_fields:
+        for match in _PHONE.finditer(text):
+            if any(start <= match.start() < end for start, end in consumed):
+                continue
+            value = f"({match['area']}) {match['exchange']}-{match['line']}"
+            if match["ext"]:
+                value += f" ext. {match['ext']}"
+            candidates.setdefault("contactPhone", []).append(value)
+            consumed.append(match.span())
+
+    if allowed_fields & ({"totalBudget"} | _BUDGET_FIELDS):
+        amounts = list(_CURRENCY.finditer(text))
+        for index, match in enumerate(amounts):
+            amount = _format_amount(match["amount"] or match["amount2"], match["scale"] or match["scale2"])
+            if amount is None:
+                continue
+            consumed.append(match.span())
+            previous_end = amounts[index - 1].end() if index else 0
+            next_start = amounts[index + 1].start() if index + 1 < len(amounts) else len(text)
+            name = _budget_field(text, match.start(), match.end(), previous_end, next_start)
+            if name is not None and name in allowed_fields:
+                candidates.setdefault(name, []).append(amount)
+            else:
+                result.residual_words += 1  # an amount we could not place needs the model
+
+    for name, values in candidates.items():
+        if len(set(values)) == 1:
+            result.field_updates[name] = values[0]
+        else:
+            result.residual_words += len(values)
+
+    remainder = text
+    for start, end in sorted(consumed, reverse=True):
+        remainder = remainder[:start] + " " + remainder[end:]
+    for index, word in enumerate(_WORD.findall(remainder)):
+        if word.lower() in _CORRECTION:
+            result.residual_words += FIELD_EXTRACTOR_MAX_RESIDUAL_WORDS + 1
+            continue
+        if word.lower() in _FILLER:
+            continue
+        # Capitalised words mid-sentence are usually names ("Mary Cardinal") the model should see.
+        result.residual_words += 2 if index and word[0].isupper() else 1
+    return result
+
+
+def record_outcome(outcome: str) -> None:
+    LOCAL_EXTRACTIONS.inc(outcome)
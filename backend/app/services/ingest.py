@@ -0,0 +1,176 @@
+"""
+Bounded-memory ingestion of uploaded drafts.
+
+Uploads are read in fixed-size chunks, decoded incrementally and whitespace-normalized
+on the fly, so no stage holds more than one chunk of raw bytes at a time. Oversized
+requests are rejected with a 413 before their body is read.
+"""
+
+import codecs
+import json
+import os
+import re
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import HTTPException, UploadFile
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+# Whole request limit for multi-file uploads (each file is still held to MAX_UPLOAD_BYTES).
+MAX_BATCH_UPLOAD_BYTES = int(os.getenv("MAX_BATCH_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+UPLOAD_READ_CHUNK_BYTES = int(os.getenv("UPLOAD_READ_CHUNK_BYTES", str(64 * 1024)))
+# Allowance for multipart boundaries and part headers on top of the file itself.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class WhitespaceNormalizer:
+    """
+    Incremental whitespace collapsing.
+
+    Runs containing a line break become a single newline and other runs a single space,
+    even when a run is split across chunk boundaries.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Optional[str] = None
+
+    def feed(self, text: str) -> str:
+        out = []
+        position = 0
+        for match in _WHITESPACE.finditer(text):
+            if match.start() > position:
+                self._emit_pending(out)
+                out.append(text[position:match.start()])
+            if "\n" in match.group() or self._pending == "\n":
+                self._pending = "\n"
+            else:
+                self._pending = " "
+            position = match.end()
+        if position < len(text):
+            self._emit_pending(out)
+            out.append(text[position:])
+        return "".join(out)
+
+    def flush(self) -> str:
+        pending, self._pending = self._pending, None
+        return pending or ""
+
+    def _emit_pending(self, out: list) -> None:
+        if self._pending is not None:
+            out.append(self._pending)
+            self._pending = None
+
+
+def normalize_whitespace(text: str) -> str:
+    normalizer = WhitespaceNormalizer()
+    return normalizer.feed(text) + normalizer.flush()
+
+
+class IncrementalTextDecoder:
+    """
+    Decode a byte stream chunk by chunk.
+
+    UTF-16 is used when the stream starts with a byte-order mark; otherwise UTF-8 is
+    tried and the decoder switches to latin-1 (which never fails) at the first invalid
+    sequence.
+    """
+
+    def __init__(self) -> None:
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+        self._fallback = False
+        self._head = b""
+
+    def decode(self, data: bytes, final: bool = False) -> str:
+        if self._decoder is None:
+            # Hold back bytes until the two-byte BOM can be inspected.
+            data = self._head + data
+            if len(data) < 2 and not final:
+                self._head = data
+                return ""
+            self._head = b""
+            encoding = "utf-16" if data[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE) else "utf-8"
+            self._decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            return self._decoder.decode(data, final)
+        except UnicodeDecodeError:
+            if self._fallback:
+                raise
+            buffered, _ = self._decoder.getstate()
+            self._fallback = True
+            self._decoder = codecs.getincrementaldecoder("latin-1")()
+            return self._decoder.decode(buffered + data, final)
+
+
+async def iter_upload_text(
+    file: UploadFile,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_bytes: int = UPLOAD_READ_CHUNK_BYTES,
+) -> AsyncIterator[str]:
+    """Yield decoded, whitespace-normalized text from `file` one chunk at a time."""
+    if file.size is not None and file.size > max_bytes:
+        raise upload_too_large(max_bytes)
+
+    decoder = IncrementalTextDecoder()
+    normalizer = WhitespaceNormalizer()
+    total = 0
+    while True:
+        data = await file.read(chunk_bytes)
+        if not data:
+            break
+        total += len(data)
+        if total > max_bytes:
+            raise upload_too_large(max_bytes)
+        text = normalizer.feed(decoder.decode(data))
+        if text:
+            yield text
+
+    tail = normalizer.feed(decoder.decode(b"", final=True)) + normalizer.flush()
+    if tail:
+        yield tail
+
+
+def upload_too_large(max_bytes: int) -> HTTPException:
+    """The 413 raised when an upload (document or audio) exceeds `max_bytes`."""
+    return HTTPException(
+        status_code=413,
+        detail=f"Uploaded file exceeds the {max_bytes}-byte upload limit.",
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject uploads to selected paths whose declared Content-Length exceeds a limit.
+
+    Runs before the multipart body is parsed, so an oversized request is refused
+    without being spooled to disk first.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]) -> None:
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send) -> None:
+        limit = self.limits.get(scope.get("path", "")) if scope["type"] == "http" else None
+        if limit is not None:
+            headers = dict(scope.get("headers") or [])
+            try:
+                declared = int(headers.get(b"content-length", b"0"))
+            except ValueError:
+                declared = 0
+            if declared > limit + MULTIPART_OVERHEAD_BYTES:
+                body = json.dumps({"detail": upload_too_large(limit).detail}).encode("utf-8")
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": 413,
+                        "headers": [
+                            (b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode("ascii")),
+                            (b"connection", b"close"),
+                        ],
+                    }
+                )
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)
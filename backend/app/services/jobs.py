@@ -0,0 +1,303 @@
+"""
+Background jobs for work that outlives an HTTP request (batch draft analysis).
+
+`JobQueue` accepts jobs into a bounded FIFO and runs them on a fixed number of worker
+tasks, so a batch of fifty drafts occupies the same upstream capacity as a couple of
+interactive uploads. Clients poll `Job.info()` or follow the job's change
+notifications (the SSE endpoint). Finished jobs stay in the store for
+`ANALYSIS_JOB_TTL_SECONDS` and the oldest finished ones are dropped beyond
+`ANALYSIS_JOB_MAX_STORED`; queued and running jobs are never evicted.
+
+Jobs live in the process that accepted them, so with several uvicorn/gunicorn workers
+the status and event URLs must reach the same worker (sticky sessions).
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from fastapi import HTTPException
+
+from .metrics import Counter, Gauge, record_stage, registry
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_JOB_WORKERS = int(os.getenv("ANALYSIS_JOB_WORKERS", "2"))
+ANALYSIS_JOB_QUEUE_MAX = int(os.getenv("ANALYSIS_JOB_QUEUE_MAX", "100"))
+ANALYSIS_JOB_TTL_SECONDS = float(os.getenv("ANALYSIS_JOB_TTL_SECONDS", "3600"))
+ANALYSIS_JOB_MAX_STORED = int(os.getenv("ANALYSIS_JOB_MAX_STORED", "500"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = frozenset({SUCCEEDED, FAILED})
+
+JOBS = registry.register(Counter("jobs_total", "Background jobs by final status.", ("queue", "status")))
+
+Runner = Callable[["Job"], Awaitable[Any]]
+Cleanup = Callable[["Job"], None]
+
+
+class QueueFull(HTTPException):
+    """Not enough room in the job queue for the submission; surfaces as a 503."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(
+            status_code=503,
+            detail="Too many jobs are waiting; retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+@dataclass
+class Job:
+    job_id: str
+    name: str
+    payload: Any = None
+    status: str = QUEUED
+    # Free-form progress reported by the runner, e.g. {"stage": "analyzing", "chunks_done": 2}.
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    version: int = 0
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def report(self, **progress: Any) -> None:
+        """Merge progress fields and wake anyone following the job."""
+        self.progress.update(progress)
+        self._notify()
+
+    def _notify(self) -> None:
+        self.version += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_changed(self, version: int, timeout: float) -> bool:
+        """Wait until the job moves past `version`; False on timeout."""
+        if self.version != version:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def info(self, include_result: bool = True) -> Dict[str, Any]:
+        body: Dict[str, Any] = {
+            "job_id": self.job_id,
+            "name": self.name,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error is not None:
+            body["error"] = {"status_code": self.error_status, "detail": self.error}
+        if include_result and self.status == SUCCEEDED:
+            body["result"] = self.result
+        return body
+
+
+class JobQueue:
+    """Bounded FIFO of jobs served by `workers` tasks, plus a TTL store of their outcomes."""
+
+    def __init__(
+        self,
+        name: str,
+        runner: Runner,
+        workers: int = ANALYSIS_JOB_WORKERS,
+        max_queued: int = ANALYSIS_JOB_QUEUE_MAX,
+        ttl_seconds: float = ANALYSIS_JOB_TTL_SECONDS,
+        max_stored: int = ANALYSIS_JOB_MAX_STORED,
+        cleanup: Optional[Cleanup] = None,
+    ) -> None:
+        self.name = name
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_queued = max(1, max_queued)
+        self.ttl_seconds = ttl_seconds
+        self.max_stored = max_stored
+        self.cleanup = cleanup
+        self.running = 0
+        self._queue: "asyncio.Queue[Job]" = asyncio.Queue()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        # Smoothed job duration, used to estimate Retry-After when the queue is full.
+        self._job_seconds = 5.0
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def retry_after(self) -> int:
+        estimate = self._job_seconds * (self.queued + 1) / self.workers
+        return max(1, min(300, round(estimate)))
+
+    def check_room(self, count: int) -> None:
+        """Raise `QueueFull` unless `count` more jobs fit in the queue."""
+        if self.queued + count > self.max_queued:
+            raise QueueFull(self.retry_after())
+
+    def submit_many(self, items: List[tuple[str, Any]]) -> List[Job]:
+        """Queue one job per `(name, payload)`; all or none are accepted."""
+        self.check_room(len(items))
+        self._start_workers()
+        self._evict()
+        jobs = []
+        for name, payload in items:
+            job = Job(job_id=uuid.uuid4().hex, name=name, payload=payload)
+            self._jobs[job.job_id] = job
+            self._queue.put_nowait(job)
+            jobs.append(job)
+        return jobs
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None and self._expired(job, time.time()):
+            self._drop(job)
+            return None
+        return job
+
+    async def follow(self, job: Job, heartbeat_seconds: float = 15.0) -> AsyncIterator[Optional[Job]]:
+        """Yield the job on every change until it finishes; None marks an idle heartbeat."""
+        version = -1
+        while True:
+            if job.version != version:
+                version = job.version
+                yield job
+                if job.finished:
+                    return
+            elif not await job.wait_changed(version, heartbeat_seconds):
+                yield None
+
+    def _start_workers(self) -> None:
+        if self._tasks:
+            return
+        for index in range(self.workers):
+            # A fresh context: workers are first started inside a request, and must not
+            # inherit its Server-Timing stage list or upstream deadline.
+            task = asyncio.create_task(self._work(), name=f"{self.name}-worker-{index}", context=contextvars.Context())
+            self._tasks.add(task)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        record_stage(f"{self.name}_job_queue", job.started_at - job.created_at)
+        job._notify()
+        self.running += 1
+        started = time.perf_counter()
+        try:
+            job.result = await self.runner(job)
+            job.status = SUCCEEDED
+        except asyncio.CancelledError:
+            job.status, job.error, job.error_status = FAILED, "The server shut down before the job finished.", 503
+            raise
+        except HTTPException as exc:
+            job.status, job.error, job.error_status = FAILED, str(exc.detail), exc.status_code
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job.job_id, self.name)
+            job.status, job.error, job.error_status = FAILED, f"Job failed: {exc}", 500
+        finally:
+            self.running -= 1
+            elapsed = time.perf_counter() - started
+            self._job_seconds = 0.8 * self._job_seconds + 0.2 * elapsed
+            record_stage(f"{self.name}_job", elapsed)
+            job.finished_at = time.time()
+            self._release(job)
+            JOBS.inc(self.name, job.status)
+            job._notify()
+
+    def _release(self, job: Job) -> None:
+        """Free the job's input once it can no longer run."""
+        if self.cleanup is not None:
+            try:
+                self.cleanup(job)
+            except Exception as exc:  # pragma: no cover - best effort
+                logger.warning("Cleanup for job %s failed: %s", job.job_id, exc)
+        job.payload = None
+
+    def _expired(self, job: Job, now: float) -> bool:
+        return job.finished_at is not None and now - job.finished_at > self.ttl_seconds
+
+    def _drop(self, job: Job) -> None:
+        self._jobs.pop(job.job_id, None)
+
+    def _evict(self) -> None:
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished:
+            if self._expired(job, now):
+                self._drop(job)
+        excess = len(self._jobs) - self.max_stored
+        for job in sorted((job for job in finished if job.job_id in self._jobs), key=lambda job: job.finished_at or 0):
+            if excess <= 0:
+                break
+            self._drop(job)
+            excess -= 1
+
+    def counts(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    async def close(self) -> None:
+        """Stop the workers; jobs still queued are failed and cleaned up."""
+        tasks, self._tasks = self._tasks, set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            job.status, job.error, job.error_status = FAILED, "The server shut down before the job started.", 503
+            job.finished_at = time.time()
+            self._release(job)
+            job._notify()
+
+
+_queues: Dict[str, JobQueue] = {}
+
+
+def register_job_queue(queue: JobQueue) -> JobQueue:
+    _queues[queue.name] = queue
+    return queue
+
+
+async def close_job_queues() -> None:
+    for queue in list(_queues.values()):
+        await queue.close()
+
+
+def _job_readings() -> Optional[Dict[tuple, float]]:
+    readings = {}
+    for queue in _queues.values():
+        for status, count in queue.counts().items():
+            readings[(queue.name, status)] = float(count)
+    return readings or None
+
+
+registry.register(Gauge("jobs", "Background jobs held in memory by status.", _job_readings, ("queue", "status")))
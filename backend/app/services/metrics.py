@@ -0,0 +1,274 @@
+"""
+Low-overhead request timing and Prometheus-format metrics.
+
+Code wraps interesting steps in `stage("name")`. Each stage is observed into a
+histogram and, while a request is in flight, remembered on a per-request context
+variable so `ServerTimingMiddleware` can report it in a `Server-Timing` header.
+`/metrics` renders every metric in the Prometheus text exposition format.
+
+The implementation is deliberately small (no client library): observing a value is a
+`perf_counter()` pair, a bisect and a dict update under a lock.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # pragma: no cover - anyio ships with starlette, but keep the gauge optional
+    from anyio.to_thread import current_default_thread_limiter
+except ImportError:  # pragma: no cover
+    current_default_thread_limiter = None  # type: ignore[assignment]
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() not in {"0", "false", "no"}
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        lines.extend(f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}" for labels, value in items)
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum.
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose value is read from a callback at scrape time.
+
+    With `labelnames`, the callback returns a mapping of label values to readings.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable[[], Any],
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> List[str]:
+        value = self.read()
+        if value is None:
+            return []
+        readings = value if self.labelnames else {(): value}
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        lines.extend(
+            f"{self.name}{_format_labels(self.labelnames, labels)} {reading:g}" for labels, reading in readings.items()
+        )
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List[object] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())  # type: ignore[attr-defined]
+        return "\n".join(lines) + "\n"
+
+
+def _thread_limiter_stat(attribute: str) -> Callable[[], Optional[float]]:
+    def _read() -> Optional[float]:
+        if current_default_thread_limiter is None:
+            return None
+        try:
+            statistics = current_default_thread_limiter().statistics()
+        except RuntimeError:  # no running event loop
+            return None
+        return float(getattr(statistics, attribute))
+
+    return _read
+
+
+registry = MetricsRegistry()
+
+REQUEST_SECONDS = registry.register(
+    Histogram("http_request_duration_seconds", "Time to first response byte per handler.", ("handler", "method", "status"))
+)
+STAGE_SECONDS = registry.register(
+    Histogram("stage_duration_seconds", "Duration of instrumented request stages.", ("stage",))
+)
+UPSTREAM_ERRORS = registry.register(
+    Counter("upstream_errors_total", "Failed calls to OpenAI or ElevenLabs.", ("upstream", "reason"))
+)
+FALLBACKS = registry.register(
+    Counter("fallbacks_total", "Degraded responses served instead of the primary path.", ("kind",))
+)
+registry.register(
+    Gauge("threadpool_tasks_waiting", "Calls queued for a worker thread.", _thread_limiter_stat("tasks_waiting"))
+)
+registry.register(
+    Gauge("threadpool_busy_threads", "Worker threads currently in use.", _thread_limiter_stat("borrowed_tokens"))
+)
+registry.register(
+    Gauge("threadpool_max_threads", "Worker thread limit.", _thread_limiter_stat("total_tokens"))
+)
+
+_request_stages: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_stages", default=None)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, name)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages.append((name, seconds))
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as request stage `name`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def count_upstream_error(upstream: str, reason: object) -> None:
+    UPSTREAM_ERRORS.inc(upstream, str(reason))
+
+
+def count_fallback(kind: str) -> None:
+    FALLBACKS.inc(kind)
+
+
+def format_server_timing(stages: List[Tuple[str, float]], total: float) -> str:
+    """Collapse repeated stages (e.g. concurrent chunk calls) into one entry each."""
+    merged: Dict[str, List[float]] = {}
+    for name, seconds in stages:
+        entry = merged.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    parts = []
+    for name, (seconds, count) in merged.items():
+        description = f';desc="{int(count)} calls"' if count > 1 else ""
+        parts.append(f"{name};dur={seconds * 1000:.1f}{description}")
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """Collect stage timings per request and report them in a `Server-Timing` header."""
+
+    def __init__(self, app: ASGIApp, header: bool = SERVER_TIMING_ENABLED) -> None:
+        self.app = app
+        self.header = header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stages: List[Tuple[str, float]] = []
+        token = _request_stages.set(stages)
+        started = time.perf_counter()
+        status = "500"
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                elapsed = time.perf_counter() - started
+                endpoint = scope.get("endpoint")
+                handler = getattr(endpoint, "__name__", "unmatched")
+                REQUEST_SECONDS.observe(elapsed, handler, scope["method"], status)
+                if self.header:
+                    MutableHeaders(scope=message).append("Server-Timing", format_server_timing(stages, elapsed))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stages.reset(token)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
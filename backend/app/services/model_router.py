@@ -0,0 +1,227 @@
+"""
+Latency-aware routing of chat turns between a fast and a heavy model tier.
+
+Most turns in a proposal interview are short: an acknowledgement, a name, a phone
+number, one budget line. They do not need the model that writes an executive summary,
+and they should not wait as long for it. `ModelRouter.route` classifies each turn from
+features that cost nothing to compute (message length, the section and whether it asks
+for structured extraction, history size) and picks a tier:
+
+- acknowledgements and short answers go to the fast tier;
+- long messages, long histories and narrative sections go to the heavy tier.
+
+Each tier's latency and failures are tracked as moving averages. When the fast tier
+becomes slower than the heavy one, or keeps failing or missing the requested JSON,
+turns are sent to the heavy tier except for an occasional probe that notices recovery.
+Every decision is counted by reason, and each route's latency and outcome are exported
+on `/metrics`.
+
+Until `OPENAI_FAST_MODEL` names a different model both tiers are the same model, so
+routing only records what it would have done.
+"""
+
+import asyncio
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional
+
+from .metrics import Counter, Histogram, registry
+
+OPENAI_CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
+OPENAI_HEAVY_MODEL = os.getenv("OPENAI_HEAVY_MODEL", OPENAI_CHAT_MODEL)
+OPENAI_FAST_MODEL = os.getenv("OPENAI_FAST_MODEL", OPENAI_HEAVY_MODEL)
+MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() not in {"0", "false", "no"}
+# Turns at or below these sizes may use the fast tier.
+ROUTER_FAST_MAX_CHARS = int(os.getenv("ROUTER_FAST_MAX_CHARS", "160"))
+ROUTER_FAST_MAX_HISTORY_TOKENS = int(os.getenv("ROUTER_FAST_MAX_HISTORY_TOKENS", "1500"))
+# Sections whose fields are short values (cover page, budget); other sections ask for narrative.
+ROUTER_FAST_SECTIONS = frozenset(
+    int(value) for value in os.getenv("ROUTER_FAST_SECTIONS", "1,7").split(",") if value.strip()
+)
+# Prefer the heavy tier once the fast tier's average latency exceeds the heavy tier's by this factor.
+ROUTER_FAST_SLOWDOWN = float(os.getenv("ROUTER_FAST_SLOWDOWN", "1.0"))
+ROUTER_MAX_FAST_FAILURE_RATE = float(os.getenv("ROUTER_MAX_FAST_FAILURE_RATE", "0.5"))
+# While the fast tier is bypassed, every Nth fast-eligible turn still goes to it so recovery is noticed.
+ROUTER_PROBE_EVERY = int(os.getenv("ROUTER_PROBE_EVERY", "10"))
+
+FAST = "fast"
+HEAVY = "heavy"
+
+ROUTES = registry.register(Counter("model_routes_total", "Chat turns routed per model tier.", ("tier", "reason")))
+ROUTE_SECONDS = registry.register(
+    Histogram("model_route_duration_seconds", "Model call latency per routed tier.", ("tier",))
+)
+ROUTE_OUTCOMES = registry.register(
+    Counter("model_route_outcomes_total", "Outcome of routed model calls.", ("tier", "outcome"))
+)
+
+_ACK_WORD = (
+    r"(?:ok(?:ay)?|k|sure|yes|yeah|yep|no|nope|thanks|thank you|great|perfect|sounds good|got it|cool|"
+    r"right|correct|done|next|continue|go on|that's (?:it|all|right|correct))"
+)
+_ACKNOWLEDGEMENT = re.compile(rf"^\s*{_ACK_WORD}(?:[\s.!,]+{_ACK_WORD})*[\s.!,]*$", re.IGNORECASE)
+# Samples needed before a tier's moving averages are trusted.
+_MIN_SAMPLES = 5
+_EWMA_WEIGHT = 0.2
+
+
+@dataclass
+class TurnFeatures:
+    message_chars: int
+    section: Optional[int]
+    structured: bool
+    history_tokens: int
+    acknowledgement: bool = False
+
+    @classmethod
+    def of(cls, message: str, section: Optional[int], structured: bool, history_tokens: int) -> "TurnFeatures":
+        return cls(len(message.strip()), section, structured, history_tokens, bool(_ACKNOWLEDGEMENT.match(message)))
+
+
+@dataclass
+class Route:
+    tier: str
+    model: str
+    reason: str
+
+
+class _TierStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.failures = 0
+        self.latency = 0.0  # exponentially weighted, seconds
+        self.failure_rate = 0.0
+        self.samples = 0
+
+    def observe(self, seconds: Optional[float], outcome: str) -> None:
+        """Errors and replies that miss the requested JSON both count as failures."""
+        self.calls += 1
+        failed = outcome != "ok"
+        self.failures += failed
+        self.failure_rate += _EWMA_WEIGHT * (failed - self.failure_rate)
+        if seconds is not None and outcome != "error":
+            self.samples += 1
+            self.latency = seconds if self.samples == 1 else self.latency + _EWMA_WEIGHT * (seconds - self.latency)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "avg_latency_ms": round(self.latency * 1000, 1),
+            "failure_rate": round(self.failure_rate, 3),
+        }
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        fast_model: str = OPENAI_FAST_MODEL,
+        heavy_model: str = OPENAI_HEAVY_MODEL,
+        enabled: bool = MODEL_ROUTING_ENABLED,
+        fast_max_chars: int = ROUTER_FAST_MAX_CHARS,
+        fast_max_history_tokens: int = ROUTER_FAST_MAX_HISTORY_TOKENS,
+        fast_sections: FrozenSet[int] = ROUTER_FAST_SECTIONS,
+    ) -> None:
+        self.models = {FAST: fast_model, HEAVY: heavy_model}
+        self.enabled = enabled
+        self.fast_max_chars = fast_max_chars
+        self.fast_max_history_tokens = fast_max_history_tokens
+        self.fast_sections = fast_sections
+        self.stats = {FAST: _TierStats(), HEAVY: _TierStats()}
+        self.reasons: Dict[str, int] = {}
+        self._bypassed = 0
+
+    def classify(self, features: TurnFeatures) -> tuple[str, str]:
+        """Return (tier, reason) from the turn alone, before tier health is considered."""
+        if features.acknowledgement:
+            return FAST, "acknowledgement"
+        if features.message_chars > self.fast_max_chars:
+            return HEAVY, "long_message"
+        if features.history_tokens > self.fast_max_history_tokens:
+            return HEAVY, "long_history"
+        if features.structured and features.section not in self.fast_sections:
+            return HEAVY, "narrative_section"
+        return FAST, "short_turn"
+
+    def _fast_tier_degraded(self) -> Optional[str]:
+        fast, heavy = self.stats[FAST], self.stats[HEAVY]
+        if self.models[FAST] == self.models[HEAVY]:
+            return None
+        if fast.calls >= _MIN_SAMPLES and fast.failure_rate > ROUTER_MAX_FAST_FAILURE_RATE:
+            return "fast_tier_failing"
+        if (
+            fast.samples >= _MIN_SAMPLES
+            and heavy.samples >= _MIN_SAMPLES
+            and fast.latency > heavy.latency * ROUTER_FAST_SLOWDOWN
+        ):
+            return "fast_tier_slow"
+        return None
+
+    def route(self, features: TurnFeatures) -> Route:
+        if not self.enabled:
+            tier, reason = HEAVY, "routing_disabled"
+        else:
+            tier, reason = self.classify(features)
+            degraded = self._fast_tier_degraded() if tier == FAST else None
+            if degraded is not None:
+                self._bypassed += 1
+                if ROUTER_PROBE_EVERY > 0 and self._bypassed % ROUTER_PROBE_EVERY == 0:
+                    reason = "probe"
+                else:
+                    tier, reason = HEAVY, degraded
+        ROUTES.inc(tier, reason)
+        key = f"{tier}/{reason}"
+        self.reasons[key] = self.reasons.get(key, 0) + 1
+        return Route(tier, self.models[tier], reason)
+
+    def record(self, route: Route, seconds: Optional[float], outcome: str) -> None:
+        """Record a routed call; `outcome` is `ok`, `unstructured` (reply was not the JSON asked for) or `error`."""
+        self.stats[route.tier].observe(seconds, outcome)
+        ROUTE_OUTCOMES.inc(route.tier, outcome)
+        if seconds is not None:
+            ROUTE_SECONDS.observe(seconds, route.tier)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "models": dict(self.models),
+            "thresholds": {
+                "fast_max_chars": self.fast_max_chars,
+                "fast_max_history_tokens": self.fast_max_history_tokens,
+                "fast_sections": sorted(self.fast_sections),
+                "fast_slowdown": ROUTER_FAST_SLOWDOWN,
+                "max_fast_failure_rate": ROUTER_MAX_FAST_FAILURE_RATE,
+                "probe_every": ROUTER_PROBE_EVERY,
+            },
+            "tiers": {tier: stats.info() for tier, stats in self.stats.items()},
+            "routes": dict(sorted(self.reasons.items())),
+            "fast_tier_degraded": self._fast_tier_degraded(),
+        }
+
+
+class RouteTimer:
+    """Time one routed call: `with RouteTimer(router, route) as timer: ...; timer.outcome = ...`."""
+
+    def __init__(self, router: ModelRouter, route: Route) -> None:
+        self.router = router
+        self.route = route
+        self.outcome = "ok"
+        self._started = 0.0
+
+    def __enter__(self) -> "RouteTimer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        if exc_type is not None and issubclass(exc_type, asyncio.CancelledError):
+            # The caller went away; says nothing about the tier.
+            ROUTE_OUTCOMES.inc(self.route.tier, "cancelled")
+            return
+        if exc_type is not None:
+            self.outcome = "error"
+        self.router.record(self.route, time.perf_counter() - self._started, self.outcome)
+
+
+model_router = ModelRouter()
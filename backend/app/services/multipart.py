@@ -0,0 +1,47 @@
+"""
+Streamed multipart/form-data request bodies.
+
+Lets an upload be forwarded to an upstream API while it is still arriving: the body
+is produced chunk by chunk, so the full file never has to be held in memory.
+"""
+
+import uuid
+from typing import AsyncIterator, Dict
+
+
+def new_boundary() -> str:
+    return f"voicefirst-{uuid.uuid4().hex}"
+
+
+def multipart_content_type(boundary: str) -> str:
+    return f"multipart/form-data; boundary={boundary}"
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\r", "").replace("\n", "")
+
+
+async def stream_multipart(
+    boundary: str,
+    fields: Dict[str, str],
+    file_field: str,
+    filename: str,
+    content_type: str,
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[bytes]:
+    """Yield a multipart body made of plain `fields` followed by one streamed file part."""
+    preamble = []
+    for name, value in fields.items():
+        preamble.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"\r\n\r\n{value}\r\n'
+        )
+    preamble.append(
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{_quote(file_field)}"; filename="{_quote(filename)}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    )
+    yield "".join(preamble).encode("utf-8")
+    async for chunk in chunks:
+        if chunk:
+            yield chunk
+    yield f"\r\n--{boundary}--\r\n".encode("utf-8")
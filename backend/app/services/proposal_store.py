@@ -0,0 +1,367 @@
+"""
+Persistent proposal storage.
+
+Proposals live in a local SQLite database in WAL mode. Writes go through a
+write-behind queue that coalesces repeated saves of the same proposal and commits
+them in batches on a dedicated writer thread, so autosave traffic never blocks the
+event loop. Reads run in the thread pool and see queued writes immediately.
+
+A batch that fails to commit is kept and retried with exponential backoff; while
+the last attempt failed the store reports itself unhealthy on `/ready`.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+PROPOSAL_DB_PATH = os.getenv("PROPOSAL_DB_PATH") or str(
+    Path(__file__).resolve().parents[2] / "data" / "proposals.sqlite3"
+)
+PROPOSAL_WRITE_BATCH_SIZE = int(os.getenv("PROPOSAL_WRITE_BATCH_SIZE", "200"))
+PROPOSAL_WRITE_BATCH_INTERVAL_MS = float(os.getenv("PROPOSAL_WRITE_BATCH_INTERVAL_MS", "50"))
+PROPOSAL_WRITE_QUEUE_MAX = int(os.getenv("PROPOSAL_WRITE_QUEUE_MAX", "10000"))
+PROPOSAL_WRITE_RETRY_MAX_MS = float(os.getenv("PROPOSAL_WRITE_RETRY_MAX_MS", "5000"))
+
+# Columns promoted out of the JSON document so they can be indexed and filtered.
+INDEXED_COLUMNS = ("project_title", "organization_name", "submission_date")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS proposals ("
+    "proposal_id TEXT PRIMARY KEY, project_title TEXT, organization_name TEXT, "
+    "submission_date TEXT, document TEXT NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS proposals_organization ON proposals (organization_name)",
+    "CREATE INDEX IF NOT EXISTS proposals_title ON proposals (project_title)",
+    "CREATE INDEX IF NOT EXISTS proposals_submission_date ON proposals (submission_date)",
+)
+
+
+@dataclass
+class _PendingWrite:
+    """Coalesced writes for one proposal that have not been committed yet."""
+
+    document: Optional[Dict[str, Any]] = None  # full replacement, if any
+    patch: Dict[str, Any] = field(default_factory=dict)  # applied on top
+    queued_at: float = field(default_factory=time.time)
+    sequence: int = 0  # of the oldest save coalesced into this write
+
+
+class ProposalStore:
+    def __init__(
+        self,
+        path: str = PROPOSAL_DB_PATH,
+        batch_size: int = PROPOSAL_WRITE_BATCH_SIZE,
+        batch_interval_ms: float = PROPOSAL_WRITE_BATCH_INTERVAL_MS,
+        queue_max: int = PROPOSAL_WRITE_QUEUE_MAX,
+        retry_max_ms: float = PROPOSAL_WRITE_RETRY_MAX_MS,
+    ) -> None:
+        self._path = path
+        self._batch_size = batch_size
+        self._batch_interval = batch_interval_ms / 1000
+        self._retry_max = retry_max_ms / 1000
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_max)
+        self._pending: Dict[str, _PendingWrite] = {}
+        self._inflight: Dict[str, _PendingWrite] = {}
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="proposal-writer")
+        self._write_connection: Optional[sqlite3.Connection] = None
+        self._readers = threading.local()
+        self._flusher: Optional[asyncio.Task] = None
+        self._batch_done = asyncio.Event()
+        self._sequence = 0
+        self.healthy = True
+        self.committed_writes = 0
+        self.committed_batches = 0
+        self.failed_batches = 0
+
+    # -- lifecycle -------------------------------------------------------------
+
+    async def start(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._init_schema)
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        if not await self.flush():
+            logger.error(
+                "Closing the proposal store with %d uncommitted proposal writes.",
+                len(self._pending) + len(self._inflight),
+            )
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._close_writer)
+        self._writer.shutdown(wait=True)
+
+    async def flush(self) -> bool:
+        """
+        Wait until every write queued before the call has been committed.
+
+        Saves arriving while waiting are not waited for, so steady autosave traffic
+        cannot hold the caller up. Returns False as soon as a commit fails instead;
+        the writes stay queued for retry.
+        """
+        sequence = self._sequence
+        failed = self.failed_batches
+        while self._queued_since(sequence):
+            if self.failed_batches != failed:
+                return False
+            if self._flusher is None or self._flusher.done():
+                await self._commit_batch(list(self._pending))
+                continue
+            self._batch_done.clear()
+            await self._batch_done.wait()
+        return True
+
+    # -- writes ----------------------------------------------------------------
+
+    async def upsert(self, proposal_id: str, document: Dict[str, Any]) -> None:
+        pending = self._pending.get(proposal_id)
+        if pending is None:
+            self._pending[proposal_id] = _PendingWrite(document=dict(document), sequence=self._next_sequence())
+            await self._queue.put(proposal_id)
+        else:
+            pending.document = dict(document)
+            pending.patch = {}
+
+    async def update(self, proposal_id: str, changes: Dict[str, Any]) -> bool:
+        """Queue a partial update; returns False when the proposal does not exist."""
+        if proposal_id not in self._pending and await self.get(proposal_id) is None:
+            return False
+        pending = self._pending.get(proposal_id)
+        if pending is None:
+            pending = self._pending[proposal_id] = _PendingWrite(sequence=self._next_sequence())
+            await self._queue.put(proposal_id)
+        pending.patch.update(changes)
+        return True
+
+    # -- reads -----------------------------------------------------------------
+
+    async def get(self, proposal_id: str) -> Optional[Dict[str, Any]]:
+        # Writes being committed come first, then anything queued after them.
+        layers = [write for write in (self._inflight.get(proposal_id), self._pending.get(proposal_id)) if write]
+        full = [index for index, write in enumerate(layers) if write.document is not None]
+        if full:
+            record: Optional[Dict[str, Any]] = {**layers[full[-1]].document, "proposal_id": proposal_id}
+            layers = layers[full[-1]:]
+        else:
+            record = await self._read_row(proposal_id)
+            if record is None:
+                return None
+        for write in layers:
+            record.update(write.patch)
+        return record
+
+    async def list(
+        self,
+        organization: Optional[str] = None,
+        title_prefix: Optional[str] = None,
+        submitted_from: Optional[str] = None,
+        submitted_to: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        # Saves made before the call must show up; if the database is failing, list what is committed.
+        await self.flush()
+        clauses: List[str] = []
+        params: List[Any] = []
+        if organization:
+            clauses.append("organization_name = ?")
+            params.append(organization)
+        if title_prefix:
+            # Range scan keeps the prefix search on the title index.
+            clauses.append("project_title >= ? AND project_title < ?")
+            params.extend([title_prefix, title_prefix + "\U0010ffff"])
+        if submitted_from:
+            clauses.append("submission_date >= ?")
+            params.append(submitted_from)
+        if submitted_to:
+            clauses.append("submission_date <= ?")
+            params.append(submitted_to)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = (
+            "SELECT proposal_id, document, created_at, updated_at FROM proposals "
+            f"{where} ORDER BY updated_at DESC LIMIT ? OFFSET ?"
+        )
+        params.extend([limit, offset])
+        rows = await run_in_threadpool(self._query, query, params)
+        return [self._row_to_record(row) for row in rows]
+
+    # -- internals -------------------------------------------------------------
+
+    def _next_sequence(self) -> int:
+        self._sequence += 1
+        return self._sequence
+
+    def _queued_since(self, sequence: int) -> bool:
+        """Whether a write queued at or before `sequence` is still uncommitted."""
+        return any(
+            write.sequence <= sequence for writes in (self._inflight, self._pending) for write in writes.values()
+        )
+
+    async def _flush_loop(self) -> None:
+        while True:
+            ids = [await self._queue.get()]
+            deadline = time.monotonic() + self._batch_interval
+            while len(ids) < self._batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    ids.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            delay = self._batch_interval
+            # Failed writes went back to the pending map; retry them until they commit.
+            while not await self._commit_batch(ids):
+                await asyncio.sleep(delay)
+                delay = min(max(delay * 2, 0.01), self._retry_max)
+
+    async def _commit_batch(self, ids: List[str]) -> bool:
+        """Commit the pending writes for `ids`; returns False when the batch failed."""
+        # Move the batch out of the pending map so saves arriving mid-commit queue afresh.
+        batch = {proposal_id: self._pending.pop(proposal_id) for proposal_id in ids if proposal_id in self._pending}
+        if not batch:
+            return True
+        self._inflight.update(batch)
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._writer, self._write_batch, batch)
+        except Exception as exc:
+            self._restore(batch)
+            self.healthy = False
+            self.failed_batches += 1
+            logger.error("Committing %d proposal writes failed, will retry: %s", len(batch), exc)
+            return False
+        finally:
+            for proposal_id in batch:
+                self._inflight.pop(proposal_id, None)
+            self._batch_done.set()
+        self.healthy = True
+        self.committed_writes += len(batch)
+        self.committed_batches += 1
+        return True
+
+    def _restore(self, batch: Dict[str, _PendingWrite]) -> None:
+        """Put a failed batch back in front of any saves queued while it was committing."""
+        for proposal_id, write in batch.items():
+            newer = self._pending.get(proposal_id)
+            if newer is None:
+                self._pending[proposal_id] = write
+                continue
+            if newer.document is None:
+                newer.document = write.document
+                newer.patch = {**write.patch, **newer.patch}
+            newer.queued_at = write.queued_at
+            newer.sequence = write.sequence
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self._path, timeout=10.0, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _init_schema(self) -> None:
+        self._write_connection = self._connect()
+        with self._write_connection:
+            for statement in _SCHEMA:
+                self._write_connection.execute(statement)
+
+    def _close_writer(self) -> None:
+        if self._write_connection is not None:
+            self._write_connection.close()
+            self._write_connection = None
+
+    def _write_batch(self, batch: Dict[str, _PendingWrite]) -> None:
+        connection = self._write_connection or self._connect()
+        self._write_connection = connection
+        now = time.time()
+        rows = []
+        with connection:
+            for proposal_id, write in batch.items():
+                document = write.document
+                created_at = write.queued_at
+                if document is None or write.patch:
+                    existing = connection.execute(
+                        "SELECT document, created_at FROM proposals WHERE proposal_id = ?", (proposal_id,)
+                    ).fetchone()
+                    if document is None:
+                        if existing is None:
+                            continue
+                        document = json.loads(existing[0])
+                    if existing is not None:
+                        created_at = existing[1]
+                    document = {**document, **write.patch}
+                rows.append(
+                    (
+                        proposal_id,
+                        *(document.get(column) for column in INDEXED_COLUMNS),
+                        json.dumps(document),
+                        created_at,
+                        now,
+                    )
+                )
+            connection.executemany(
+                "INSERT INTO proposals (proposal_id, project_title, organization_name, submission_date, "
+                "document, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(proposal_id) DO UPDATE SET project_title = excluded.project_title, "
+                "organization_name = excluded.organization_name, submission_date = excluded.submission_date, "
+                "document = excluded.document, updated_at = excluded.updated_at",
+                rows,
+            )
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._readers, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            self._readers.connection = connection
+        return connection
+
+    def _query(self, query: str, params: List[Any]) -> List[tuple]:
+        return self._reader().execute(query, params).fetchall()
+
+    async def _read_row(self, proposal_id: str) -> Optional[Dict[str, Any]]:
+        rows = await run_in_threadpool(
+            self._query,
+            "SELECT proposal_id, document, created_at, updated_at FROM proposals WHERE proposal_id = ?",
+            [proposal_id],
+        )
+        return self._row_to_record(rows[0]) if rows else None
+
+    @staticmethod
+    def _row_to_record(row: tuple) -> Dict[str, Any]:
+        proposal_id, document, created_at, updated_at = row
+        return {**json.loads(document), "proposal_id": proposal_id, "created_at": created_at, "updated_at": updated_at}
+
+
+_store: Optional[ProposalStore] = None
+
+
+async def open_proposal_store() -> ProposalStore:
+    global _store
+    if _store is None:
+        _store = ProposalStore()
+        await _store.start()
+    return _store
+
+
+async def close_proposal_store() -> None:
+    global _store
+    store, _store = _store, None
+    if store is not None:
+        await store.close()
+
+
+async def get_proposal_store() -> ProposalStore:
+    """Return the lifespan-owned store, opening it on demand outside a lifespan."""
+    return await open_proposal_store()
@@ -0,0 +1,95 @@
+"""
+Startup warmup and the `/ready` probe.
+
+Importing `openai`/`httpx` and building the pooled clients is the slowest part of a
+cold start. With `STARTUP_WARMUP=background` (the default) the lifespan finishes as soon
+as local resources are open and that work continues in a background task, followed by
+starting the document extraction workers; `/ready` answers 503 until the clients are
+built, so a load balancer only routes traffic to warm instances.
+`eager` finishes the warmup before the server accepts requests, `off` leaves everything
+to the first request that needs it.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from .documents import start_document_workers
+from .upstream import warm_up_upstream_clients
+
+logger = logging.getLogger(__name__)
+
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "background").lower()
+
+
+class Readiness:
+    """Named startup checks; the instance is ready once every check has passed."""
+
+    def __init__(self, checks: Iterable[str]) -> None:
+        self.started = time.monotonic()
+        self.checks: Dict[str, bool] = {name: False for name in checks}
+        self.ready_after: Optional[float] = None
+
+    def mark(self, name: str) -> None:
+        self.checks[name] = True
+        if self.ready and self.ready_after is None:
+            self.ready_after = time.monotonic() - self.started
+            logger.info("Ready %.0f ms after startup began.", self.ready_after * 1000)
+
+    @property
+    def ready(self) -> bool:
+        return all(self.checks.values())
+
+
+async def _warm_up(readiness: Readiness) -> None:
+    try:
+        await warm_up_upstream_clients()
+    except Exception as exc:  # pragma: no cover - the lazy path still works per request
+        logger.warning("Upstream warmup failed; clients will be built on first use: %s", exc)
+    readiness.mark("upstream_clients")
+
+
+async def _warm_up_in_background(readiness: Readiness) -> None:
+    await _warm_up(readiness)
+    # Extraction workers are not needed to serve traffic, so they do not gate readiness.
+    try:
+        await start_document_workers()
+    except Exception as exc:  # pragma: no cover - workers are started on first upload instead
+        logger.warning("Could not prestart document extraction workers: %s", exc)
+
+
+async def start_warmup(readiness: Readiness) -> Optional[asyncio.Task]:
+    """Run the warmup according to `STARTUP_WARMUP`; returns the task when backgrounded."""
+    if STARTUP_WARMUP == "off":
+        readiness.mark("upstream_clients")
+        return None
+    if STARTUP_WARMUP == "eager":
+        await _warm_up(readiness)
+        return None
+    return asyncio.create_task(_warm_up_in_background(readiness))
+
+
+async def readiness_endpoint(request: Request) -> Response:
+    readiness: Optional[Readiness] = getattr(request.app.state, "readiness", None)
+    if readiness is None:
+        return JSONResponse({"status": "starting", "checks": {}}, status_code=503)
+    checks = dict(readiness.checks)
+    store = getattr(request.app.state, "proposals", None)
+    if store is not None and checks.get("proposal_store"):
+        # A store whose last commit failed is holding saves it cannot persist.
+        checks["proposal_store"] = store.healthy
+    ready = all(checks.values())
+    status = "ready" if ready else "unhealthy" if readiness.ready else "starting"
+    body = {
+        "status": status,
+        "checks": checks,
+        "uptime_seconds": round(time.monotonic() - readiness.started, 3),
+    }
+    if readiness.ready_after is not None:
+        body["ready_after_seconds"] = round(readiness.ready_after, 3)
+    return JSONResponse(body, status_code=200 if ready else 503)
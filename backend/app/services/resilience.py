@@ -0,0 +1,313 @@
+"""
+Deadline budgets, retries, hedging and circuit breaking for upstream calls.
+
+Endpoints open a `request_deadline(seconds)` scope; every upstream call made inside it
+(including from tasks it spawns) derives its timeout from the time left. `call_upstream`
+runs one logical call as a series of attempts: each attempt takes an admission slot,
+retryable failures (connection errors, timeouts, 429 and 5xx) are retried with full
+jitter while the budget allows, and an optional hedged second attempt is started when
+the first is slower than `hedge_after`. A per-upstream `CircuitBreaker` opens after
+repeated failures so callers fail fast (or take their fallback) until a probe succeeds.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException
+
+from .metrics import Counter, Gauge, count_upstream_error, registry
+from .scheduler import INTERACTIVE, get_upstream_limiter
+
+UPSTREAM_RETRY_ATTEMPTS = int(os.getenv("UPSTREAM_RETRY_ATTEMPTS", "3"))
+UPSTREAM_RETRY_BASE_SECONDS = float(os.getenv("UPSTREAM_RETRY_BASE_SECONDS", "0.25"))
+UPSTREAM_RETRY_MAX_SECONDS = float(os.getenv("UPSTREAM_RETRY_MAX_SECONDS", "2"))
+OPENAI_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("OPENAI_ATTEMPT_TIMEOUT_SECONDS", "30"))
+ELEVENLABS_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("ELEVENLABS_ATTEMPT_TIMEOUT_SECONDS", "15"))
+# Start a second, parallel attempt when the first is slower than this (0 disables hedging).
+OPENAI_HEDGE_AFTER_SECONDS = float(os.getenv("OPENAI_HEDGE_AFTER_SECONDS", "0"))
+ELEVENLABS_HEDGE_AFTER_SECONDS = float(os.getenv("ELEVENLABS_HEDGE_AFTER_SECONDS", "0"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+RETRIES = registry.register(Counter("upstream_retries_total", "Upstream attempts retried after a failure.", ("upstream",)))
+HEDGES = registry.register(Counter("upstream_hedges_total", "Hedged second attempts started.", ("upstream",)))
+SHORT_CIRCUITS = registry.register(
+    Counter("upstream_short_circuits_total", "Calls refused while the circuit breaker was open.", ("upstream",))
+)
+
+
+class UpstreamStatusError(HTTPException):
+    """An upstream answered with a non-success status; surfaces to clients as a 502."""
+
+    def __init__(self, upstream_status: int, detail: str) -> None:
+        super().__init__(status_code=502, detail=detail)
+        self.upstream_status = upstream_status
+
+
+class UpstreamUnavailable(HTTPException):
+    """The circuit breaker for an upstream is open."""
+
+    def __init__(self, upstream: str, retry_after: int) -> None:
+        super().__init__(
+            status_code=503,
+            detail=f"{upstream} is temporarily unavailable; retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class DeadlineExceeded(HTTPException):
+    """The request budget (or the last attempt's timeout) ran out; surfaces as a 504."""
+
+    def __init__(self, upstream: str) -> None:
+        super().__init__(status_code=504, detail=f"Timed out waiting for {upstream}.")
+
+
+# -- deadline budget -----------------------------------------------------------
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(seconds: float) -> Iterator[None]:
+    """Bound upstream work in this scope to `seconds` (never extends an outer deadline)."""
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+# -- circuit breaker -------------------------------------------------------------
+
+
+class CircuitBreaker:
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = CIRCUIT_RESET_SECONDS,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> int:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    @property
+    def available(self) -> bool:
+        """False while open, so callers can skip straight to their fallback."""
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN and not self._probing)
+
+    def retry_after(self) -> int:
+        if self.opened_at is None:
+            return 1
+        return max(1, int(self.reset_seconds - (time.monotonic() - self.opened_at)) + 1)
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True  # let exactly one probe through
+            return
+        SHORT_CIRCUITS.inc(self.name)
+        raise UpstreamUnavailable(self.name, self.retry_after())
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Give up the half-open probe without a verdict (e.g. a client error)."""
+        self._probing = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+registry.register(
+    Gauge(
+        "upstream_circuit_state",
+        "Circuit breaker state per upstream (0 closed, 1 half-open, 2 open).",
+        lambda: {(name,): float(breaker.state) for name, breaker in _breakers.items()} or None,
+        ("upstream",),
+    )
+)
+
+
+# -- calls -------------------------------------------------------------------------
+
+
+@dataclass
+class _Policy:
+    attempt_timeout: float
+    hedge_after: float
+
+
+_POLICIES = {
+    "openai": _Policy(OPENAI_ATTEMPT_TIMEOUT_SECONDS, OPENAI_HEDGE_AFTER_SECONDS),
+    "elevenlabs": _Policy(ELEVENLABS_ATTEMPT_TIMEOUT_SECONDS, ELEVENLABS_HEDGE_AFTER_SECONDS),
+}
+
+
+def _classify(exc: BaseException) -> Tuple[bool, str]:
+    """Return (retryable, reason) for a failed attempt."""
+    if isinstance(exc, UpstreamStatusError):
+        return exc.upstream_status in RETRYABLE_STATUSES, str(exc.upstream_status)
+    if isinstance(exc, HTTPException):
+        return False, str(exc.status_code)  # our own rejections and configuration errors
+    if isinstance(exc, asyncio.TimeoutError):
+        return True, "timeout"
+    # The SDKs are imported lazily; an exception from one means it is already loaded.
+    httpx = sys.modules.get("httpx")
+    if httpx is not None:
+        if isinstance(exc, httpx.TimeoutException):
+            return True, "timeout"
+        if isinstance(exc, httpx.TransportError):
+            return True, type(exc).__name__
+    openai = sys.modules.get("openai")
+    if openai is not None:
+        if isinstance(exc, openai.APIStatusError):
+            return exc.status_code in RETRYABLE_STATUSES, str(exc.status_code)
+        if isinstance(exc, openai.APIConnectionError):
+            return True, type(exc).__name__
+    return False, type(exc).__name__
+
+
+async def _hedged(
+    upstream: str, run: Callable[[float], Awaitable[T]], timeout: float, hedge_after: float
+) -> T:
+    if not hedge_after or hedge_after >= timeout:
+        return await asyncio.wait_for(run(timeout), timeout)
+
+    attempts = {asyncio.ensure_future(asyncio.wait_for(run(timeout), timeout))}
+    try:
+        done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+        if not done:
+            HEDGES.inc(upstream)
+            remaining = timeout - hedge_after
+            attempts.add(asyncio.ensure_future(asyncio.wait_for(run(remaining), remaining)))
+        error: Optional[BaseException] = None
+        pending = set(attempts)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in attempts:
+            task.cancel()
+
+
+async def call_upstream(
+    upstream: str,
+    attempt: Callable[[float], Awaitable[T]],
+    priority: int = INTERACTIVE,
+    attempts: int = UPSTREAM_RETRY_ATTEMPTS,
+    hedge: bool = True,
+    limit: bool = True,
+) -> T:
+    """
+    Run `attempt(timeout)` against `upstream` with retries, hedging and circuit breaking.
+
+    `attempt` must be safe to repeat. Pass `limit=False` when the caller already holds an
+    admission slot (streams that keep the slot while relaying), `hedge=False` for calls
+    whose losing attempt cannot simply be cancelled.
+    """
+    breaker = get_circuit_breaker(upstream)
+    policy = _POLICIES.get(upstream, _Policy(OPENAI_ATTEMPT_TIMEOUT_SECONDS, 0.0))
+    limiter = get_upstream_limiter(upstream)
+
+    async def _run(timeout: float) -> T:
+        if not limit:
+            return await attempt(timeout)
+        async with limiter.slot(priority):
+            return await attempt(timeout)
+
+    for number in range(1, max(1, attempts) + 1):
+        budget = remaining_budget()
+        if budget is not None and budget <= 0:
+            raise DeadlineExceeded(upstream)
+        timeout = policy.attempt_timeout if budget is None else min(policy.attempt_timeout, budget)
+        truncated = timeout < policy.attempt_timeout
+
+        breaker.before_call()
+        try:
+            result = await _hedged(upstream, _run, timeout, policy.hedge_after if hedge else 0.0)
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        except Exception as exc:
+            retryable, reason = _classify(exc)
+            if not retryable:
+                breaker.release_probe()
+                if not isinstance(exc, HTTPException) or isinstance(exc, UpstreamStatusError):
+                    count_upstream_error(upstream, reason)
+                raise
+            if reason == "timeout" and truncated:
+                # The caller's budget cut the attempt short; that says nothing about the upstream.
+                count_upstream_error(upstream, "deadline")
+                breaker.release_probe()
+            else:
+                count_upstream_error(upstream, reason)
+                breaker.record_failure()
+            backoff = random.uniform(0, min(UPSTREAM_RETRY_MAX_SECONDS, UPSTREAM_RETRY_BASE_SECONDS * 2 ** (number - 1)))
+            budget = remaining_budget()
+            if number >= attempts or not breaker.available or (budget is not None and backoff >= budget):
+                if isinstance(exc, asyncio.TimeoutError):
+                    raise DeadlineExceeded(upstream) from exc
+                raise
+            RETRIES.inc(upstream)
+            await asyncio.sleep(backoff)
+        else:
+            breaker.record_success()
+            return result
+
+    raise DeadlineExceeded(upstream)  # pragma: no cover - loop always returns or raises
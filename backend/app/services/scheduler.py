@@ -0,0 +1,191 @@
+"""
+Admission control for upstream calls.
+
+Each upstream (OpenAI, ElevenLabs) gets an `UpstreamLimiter`: a concurrency limit
+plus a bounded, priority-ordered wait queue. Interactive work (chat, voice, TTS) is
+served before bulk work (draft analysis, session summaries), bulk work may only use
+part of the queue, and callers that cannot be queued get an immediate 503 with a
+`Retry-After` estimate instead of piling up behind a saturated provider.
+
+`SingleFlight` coalesces identical in-flight calls so concurrent requests for the
+same TTS clip share one upstream request.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from .metrics import Counter, Gauge, record_stage, registry
+
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "32"))
+ELEVENLABS_MAX_CONCURRENCY = int(os.getenv("ELEVENLABS_MAX_CONCURRENCY", "8"))
+UPSTREAM_QUEUE_MAX = int(os.getenv("UPSTREAM_QUEUE_MAX", "64"))
+UPSTREAM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT_SECONDS", "10"))
+# Share of the wait queue that bulk work may occupy; the rest is kept for interactive calls.
+UPSTREAM_BULK_QUEUE_SHARE = float(os.getenv("UPSTREAM_BULK_QUEUE_SHARE", "0.5"))
+
+INTERACTIVE = 0
+BULK = 1
+_PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+REJECTIONS = registry.register(
+    Counter("upstream_rejections_total", "Calls refused because the upstream queue was full.", ("upstream", "priority"))
+)
+COALESCED = registry.register(
+    Counter("coalesced_requests_total", "Calls served by joining an identical in-flight call.", ("kind",))
+)
+
+
+class AdmissionRejected(HTTPException):
+    """The upstream's wait queue is full or the wait timed out; surfaces as a 503."""
+
+    def __init__(self, upstream: str, reason: str, retry_after: int) -> None:
+        super().__init__(
+            status_code=503,
+            detail=f"{upstream} is busy ({reason}); retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class UpstreamLimiter:
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_waiting: int = UPSTREAM_QUEUE_MAX,
+        max_wait_seconds: float = UPSTREAM_QUEUE_TIMEOUT_SECONDS,
+        bulk_share: float = UPSTREAM_BULK_QUEUE_SHARE,
+    ) -> None:
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_waiting = max(0, max_waiting)
+        self.max_wait_seconds = max_wait_seconds
+        self.bulk_share = bulk_share
+        self.active = 0
+        self.waiting = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        # Smoothed time a slot is held, used to estimate Retry-After.
+        self._hold_seconds = 1.0
+
+    def retry_after(self) -> int:
+        estimate = self._hold_seconds * (self.waiting + 1) / self.max_concurrency
+        return max(1, min(30, math.ceil(estimate)))
+
+    def _reject(self, priority: int, reason: str) -> AdmissionRejected:
+        REJECTIONS.inc(self.name, _PRIORITY_NAMES.get(priority, str(priority)))
+        return AdmissionRejected(self.name, reason, self.retry_after())
+
+    async def acquire(self, priority: int = INTERACTIVE) -> None:
+        if self.active < self.max_concurrency and self.waiting == 0:
+            self.active += 1
+            return
+
+        limit = self.max_waiting if priority == INTERACTIVE else int(self.max_waiting * self.bulk_share)
+        if self.waiting >= limit:
+            raise self._reject(priority, "queue full")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if not self._abandon(future):
+                raise self._reject(priority, "queue timeout") from None
+        except BaseException:
+            if self._abandon(future):
+                self.release()
+            raise
+        record_stage(f"{self.name}_queue", time.perf_counter() - started)
+
+    def _abandon(self, future: asyncio.Future) -> bool:
+        """Withdraw a waiter; returns True when it had already been handed a slot."""
+        if future.done():
+            return True
+        future.cancel()
+        self.waiting -= 1
+        return False
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            # Hand the slot straight to the next waiter; `active` is unchanged.
+            self.waiting -= 1
+            future.set_result(None)
+            return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = INTERACTIVE) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_hold(time.perf_counter() - started)
+            self.release()
+
+    def observe_hold(self, seconds: float) -> None:
+        self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * seconds
+
+
+class SingleFlight:
+    """Share one in-flight call between every caller asking for the same key."""
+
+    def __init__(self, kind: str) -> None:
+        self.kind = kind
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            # A separate task, so one caller disconnecting does not cancel the others.
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            COALESCED.inc(self.kind)
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller has gone away
+
+
+_limiters: Dict[str, UpstreamLimiter] = {}
+_LIMITS = {"openai": OPENAI_MAX_CONCURRENCY, "elevenlabs": ELEVENLABS_MAX_CONCURRENCY}
+
+
+def get_upstream_limiter(name: str) -> UpstreamLimiter:
+    limiter = _limiters.get(name)
+    if limiter is None:
+        limiter = _limiters[name] = UpstreamLimiter(name, _LIMITS.get(name, OPENAI_MAX_CONCURRENCY))
+    return limiter
+
+
+def _limiter_readings(attribute: str) -> Callable[[], Optional[Dict[Tuple[str, ...], float]]]:
+    def _read() -> Optional[Dict[Tuple[str, ...], float]]:
+        return {(name,): float(getattr(limiter, attribute)) for name, limiter in _limiters.items()} or None
+
+    return _read
+
+
+registry.register(
+    Gauge("upstream_active_calls", "Upstream calls holding a slot.", _limiter_readings("active"), ("upstream",))
+)
+registry.register(
+    Gauge("upstream_queue_depth", "Calls waiting for an upstream slot.", _limiter_readings("waiting"), ("upstream",))
+)
@@ -0,0 +1,190 @@
+"""
+Server-side conversation sessions.
+
+Clients send only the newest message plus a session id; the server keeps the history,
+holds it under a token budget by folding older turns into a running summary, and
+tracks per-session token usage.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", str(6 * 60 * 60)))
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "1000"))
+SESSION_HISTORY_TOKEN_BUDGET = int(os.getenv("SESSION_HISTORY_TOKEN_BUDGET", "3000"))
+SESSION_KEEP_RECENT_MESSAGES = int(os.getenv("SESSION_KEEP_RECENT_MESSAGES", "6"))
+
+Summarizer = Callable[[str, List[Dict[str, str]]], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English prose; close enough for budgeting.
+    return len(text) // 4 + 1
+
+
+@dataclass
+class SessionUsage:
+    turns: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    compactions: int = 0
+
+
+@dataclass
+class ConversationSession:
+    session_id: str
+    history: List[Dict[str, str]] = field(default_factory=list)
+    summary: str = ""
+    usage: SessionUsage = field(default_factory=SessionUsage)
+    last_used: float = field(default_factory=time.monotonic)
+    compaction_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def history_tokens(self) -> int:
+        return sum(estimate_tokens(message["content"]) for message in self.history)
+
+    def context_messages(self, budget: int = SESSION_HISTORY_TOKEN_BUDGET) -> List[Dict[str, str]]:
+        """
+        Summary plus the newest history that fits in `budget` tokens.
+
+        Compaction runs after the reply, so until it finishes the oldest turns are
+        simply left out here; that keeps per-turn prompt size capped regardless.
+        """
+        recent: List[Dict[str, str]] = []
+        remaining = budget
+        for message in reversed(self.history):
+            cost = estimate_tokens(message["content"])
+            if recent and cost > remaining:
+                break
+            recent.append(message)
+            remaining -= cost
+        recent.reverse()
+
+        messages: List[Dict[str, str]] = []
+        if self.summary:
+            messages.append(
+                {"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"}
+            )
+        messages.extend(recent)
+        return messages
+
+    def record_turn(self, user_message: str, assistant_reply: str, usage: Any = None) -> None:
+        self.history.append({"role": "user", "content": user_message})
+        self.history.append({"role": "assistant", "content": assistant_reply})
+        self.usage.turns += 1
+        if usage is not None:
+            self.usage.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+            self.usage.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+        self.last_used = time.monotonic()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "turns": self.usage.turns,
+            "prompt_tokens": self.usage.prompt_tokens,
+            "completion_tokens": self.usage.completion_tokens,
+            "compactions": self.usage.compactions,
+            "history_messages": len(self.history),
+            "history_tokens": self.history_tokens(),
+            "has_summary": bool(self.summary),
+        }
+
+
+def _extractive_summary(previous: str, messages: List[Dict[str, str]], limit: int = 1200) -> str:
+    """Cheap local summary used when the model summarizer is unavailable."""
+    lines = [previous] if previous else []
+    for message in messages:
+        first_sentence = message["content"].strip().split(". ")[0][:200]
+        if first_sentence:
+            lines.append(f"{message['role']}: {first_sentence}")
+    return " | ".join(lines)[-limit:]
+
+
+async def compact_session(
+    session: ConversationSession,
+    summarize: Optional[Summarizer],
+    budget: int = SESSION_HISTORY_TOKEN_BUDGET,
+    keep_recent: int = SESSION_KEEP_RECENT_MESSAGES,
+) -> bool:
+    """Fold the oldest turns into the session summary until history is within half the budget."""
+    async with session.compaction_lock:
+        if session.history_tokens() <= budget:
+            return False
+
+        # Pick turns to drop without removing them yet, so replies generated while the
+        # summary is being written still see them.
+        target = budget // 2
+        total = session.history_tokens()
+        dropped: List[Dict[str, str]] = []
+        for message in session.history[: max(len(session.history) - keep_recent, 0)]:
+            if total <= target:
+                break
+            dropped.append(message)
+            total -= estimate_tokens(message["content"])
+        if not dropped:
+            return False
+
+        summary: Optional[str] = None
+        if summarize is not None:
+            try:
+                summary = (await summarize(session.summary, dropped)).strip()
+            except Exception as exc:
+                logger.warning("Session summarization failed, using extractive summary: %s", exc)
+        session.summary = summary or _extractive_summary(session.summary, dropped)
+        del session.history[: len(dropped)]
+        session.usage.compactions += 1
+        return True
+
+
+class SessionStore:
+    """In-process LRU of sessions with idle expiry."""
+
+    def __init__(self, ttl_seconds: float = SESSION_TTL_SECONDS, max_sessions: int = SESSION_MAX_SESSIONS) -> None:
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self._ttl_seconds = ttl_seconds
+        self._max_sessions = max_sessions
+        self._background: Set[asyncio.Task] = set()
+
+    def create(self) -> ConversationSession:
+        session = ConversationSession(session_id=uuid.uuid4().hex)
+        self._sessions[session.session_id] = session
+        self._evict()
+        return session
+
+    def get(self, session_id: str) -> Optional[ConversationSession]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if time.monotonic() - session.last_used > self._ttl_seconds:
+            del self._sessions[session_id]
+            return None
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def schedule_compaction(self, session: ConversationSession, summarize: Optional[Summarizer]) -> None:
+        """Compact in the background so summarization never delays a reply."""
+        if session.history_tokens() <= SESSION_HISTORY_TOKEN_BUDGET:
+            return
+        task = asyncio.create_task(compact_session(session, summarize))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for session_id in [key for key, value in self._sessions.items() if now - value.last_used > self._ttl_seconds]:
+            del self._sessions[session_id]
+        while len(self._sessions) > self._max_sessions:
+            self._sessions.popitem(last=False)
+
+
+session_store = SessionStore()
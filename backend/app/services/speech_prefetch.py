@@ -0,0 +1,283 @@
+"""
+Speculative synthesis of the prompts the assistant is about to speak.
+
+The guided interview walks the proposal sections in order and each section opens
+with a fixed introduction, so while the user is still answering one section the next
+thing the assistant says is very likely the next section's intro. `SpeechPrefetcher`
+synthesizes such predicted clips in the background while the user is still talking or
+typing, so the TTS cache already holds them when they are requested.
+
+Speculation must not slow down or pay for real work, so prefetches:
+
+- run at bulk priority and are skipped while ElevenLabs has no free slot;
+- are limited to `TTS_PREFETCH_MAX_INFLIGHT` at a time and to a character budget per
+  minute (ElevenLabs bills by the character);
+- are cancelled if unfinished when the same owner (a session or voice socket) makes
+  a new prediction that no longer includes them.
+
+A prefetched clip is tracked until it is requested (a hit; a `late_hit` when the
+request arrived while it was still being synthesized) or until `TTS_PREFETCH_TTL_SECONDS`
+pass without a request, at which point its characters count as wasted. Outcomes are
+exported on `/metrics` and summarized by `stats()`.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from .metrics import Counter, Gauge, registry
+from .scheduler import get_upstream_limiter
+
+logger = logging.getLogger(__name__)
+
+TTS_PREFETCH_ENABLED = os.getenv("TTS_PREFETCH_ENABLED", "true").lower() not in {"0", "false", "no"}
+TTS_PREFETCH_MAX_INFLIGHT = int(os.getenv("TTS_PREFETCH_MAX_INFLIGHT", "2"))
+# Characters speculation may send to ElevenLabs per minute, across all users.
+TTS_PREFETCH_BUDGET_CHARS_PER_MINUTE = int(os.getenv("TTS_PREFETCH_BUDGET_CHARS_PER_MINUTE", "3000"))
+TTS_PREFETCH_MAX_TEXT_CHARS = int(os.getenv("TTS_PREFETCH_MAX_TEXT_CHARS", "400"))
+# A prefetched clip nobody asked for within this long counts as wasted.
+TTS_PREFETCH_TTL_SECONDS = float(os.getenv("TTS_PREFETCH_TTL_SECONDS", "600"))
+TTS_PREFETCH_MAX_TRACKED = int(os.getenv("TTS_PREFETCH_MAX_TRACKED", "512"))
+
+PREFETCHES = registry.register(
+    Counter("tts_prefetches_total", "Speculative TTS prefetches by outcome.", ("outcome",))
+)
+PREFETCH_CHARS = registry.register(
+    Counter("tts_prefetch_chars_total", "Characters of speculative TTS by outcome.", ("outcome",))
+)
+
+Fetch = Callable[[], Awaitable[Optional[bytes]]]
+
+
+@dataclass
+class PrefetchClip:
+    """One predicted utterance: its TTS cache key, length and how to synthesize it.
+
+    `fetch` stores the clip in the TTS cache and returns the audio, or None when the
+    clip was already cached and nothing was synthesized.
+    """
+
+    key: str
+    chars: int
+    fetch: Fetch
+
+
+@dataclass
+class _Prefetch:
+    chars: int
+    task: "asyncio.Task[Optional[bytes]]"
+    owners: Set[Hashable] = field(default_factory=set)
+    ready_at: Optional[float] = None
+
+
+class SpeechPrefetcher:
+    def __init__(
+        self,
+        enabled: bool = TTS_PREFETCH_ENABLED,
+        max_inflight: int = TTS_PREFETCH_MAX_INFLIGHT,
+        budget_chars_per_minute: int = TTS_PREFETCH_BUDGET_CHARS_PER_MINUTE,
+        max_text_chars: int = TTS_PREFETCH_MAX_TEXT_CHARS,
+        ttl_seconds: float = TTS_PREFETCH_TTL_SECONDS,
+        max_tracked: int = TTS_PREFETCH_MAX_TRACKED,
+    ) -> None:
+        self.enabled = enabled
+        self.max_inflight = max(0, max_inflight)
+        self.budget_chars_per_minute = max(0, budget_chars_per_minute)
+        self.max_text_chars = max_text_chars
+        self.ttl_seconds = ttl_seconds
+        self.max_tracked = max(1, max_tracked)
+        self._entries: "OrderedDict[str, _Prefetch]" = OrderedDict()
+        self._owners: Dict[Hashable, Set[str]] = {}
+        # Token bucket of characters, refilled continuously up to one minute's budget.
+        self._budget = float(self.budget_chars_per_minute)
+        self._refilled_at = time.monotonic()
+        self._counts: Dict[str, int] = {}
+        self._chars: Dict[str, int] = {}
+
+    @property
+    def inflight(self) -> int:
+        return sum(1 for entry in self._entries.values() if not entry.task.done())
+
+    def predict(self, owner: Optional[Hashable], clips: List[PrefetchClip]) -> int:
+        """
+        Start prefetching `clips` on behalf of `owner`; returns how many were started.
+
+        The owner's previous prediction is replaced: its clips that are not in `clips`
+        and are still being synthesized are cancelled.
+        """
+        if not self.enabled:
+            return 0
+        self._expire()
+        wanted = {clip.key for clip in clips}
+        if owner is not None:
+            for key in self._owners.pop(owner, set()) - wanted:
+                self._release(key, owner)
+        started = 0
+        for clip in clips:
+            entry = self._entries.get(clip.key)
+            if entry is not None:
+                self._count("duplicate")
+            elif self._start(clip):
+                started += 1
+                entry = self._entries[clip.key]
+            if entry is not None and owner is not None:
+                entry.owners.add(owner)
+                self._owners.setdefault(owner, set()).add(clip.key)
+        return started
+
+    def forget(self, owner: Hashable) -> None:
+        """The owner went away (socket closed): cancel what only it was waiting for."""
+        for key in self._owners.pop(owner, set()):
+            self._release(key, owner)
+
+    async def claim(self, key: str) -> Optional[bytes]:
+        """
+        Return the audio for `key` when it was prefetched, waiting for a prefetch that
+        is still running; None when it was not (or the prefetch failed).
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._disown(key, entry)
+        outcome = "hit" if entry.task.done() else "late_hit"
+        self._count(outcome)
+        self._count_chars("used", entry.chars)
+        try:
+            return await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            if entry.task.cancelled():
+                return None
+            raise
+        except Exception:
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        self._expire()
+        used = self._counts.get("hit", 0) + self._counts.get("late_hit", 0)
+        resolved = used + self._counts.get("wasted", 0) + self._counts.get("cancelled", 0)
+        synthesized = self._chars.get("synthesized", 0)
+        return {
+            "enabled": self.enabled,
+            "inflight": self.inflight,
+            "tracked": len(self._entries),
+            "budget_chars_remaining": int(self._refill()),
+            "outcomes": dict(sorted(self._counts.items())),
+            "chars": dict(sorted(self._chars.items())),
+            "hit_rate": round(used / resolved, 3) if resolved else None,
+            "wasted_char_ratio": round(self._chars.get("wasted", 0) / synthesized, 3) if synthesized else None,
+        }
+
+    def _start(self, clip: PrefetchClip) -> bool:
+        if clip.chars > self.max_text_chars:
+            return self._skip("too_long")
+        if self.inflight >= self.max_inflight:
+            return self._skip("inflight")
+        limiter = get_upstream_limiter("elevenlabs")
+        if limiter.waiting or limiter.active >= limiter.max_concurrency:
+            return self._skip("busy")
+        if self._refill() < clip.chars:
+            return self._skip("budget")
+        self._budget -= clip.chars
+        # A fresh context: the prefetch must not inherit the triggering request's deadline.
+        task = asyncio.get_running_loop().create_task(self._run(clip), context=contextvars.Context())
+        self._entries[clip.key] = _Prefetch(clip.chars, task)
+        task.add_done_callback(lambda done: self._finished(clip, done))
+        self._count("started")
+        while len(self._entries) > self.max_tracked:
+            oldest = next(iter(self._entries))
+            self._drop(oldest, "wasted" if self._entries[oldest].task.done() else "cancelled")
+        return True
+
+    async def _run(self, clip: PrefetchClip) -> Optional[bytes]:
+        try:
+            return await clip.fetch()
+        except Exception as exc:
+            logger.info("Speculative text-to-speech failed: %s", exc)
+            raise
+
+    def _finished(self, clip: PrefetchClip, task: "asyncio.Task[Optional[bytes]]") -> None:
+        entry = self._entries.get(clip.key)
+        tracked = entry is not None and entry.task is task
+        if task.cancelled():
+            return  # counted where it was cancelled
+        if task.exception() is not None:
+            self._count("failed")
+            if tracked:
+                self._drop(clip.key, None)
+            return
+        if task.result() is None:
+            # Already cached: nothing was synthesized, so give the characters back.
+            self._budget = min(self._budget + clip.chars, float(self.budget_chars_per_minute))
+            self._count("cached")
+            if tracked:
+                self._drop(clip.key, None)
+            return
+        self._count_chars("synthesized", clip.chars)
+        if tracked:
+            entry.ready_at = time.monotonic()
+
+    def _release(self, key: str, owner: Hashable) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.owners.discard(owner)
+        if not entry.owners and not entry.task.done():
+            self._drop(key, "cancelled")
+
+    def _drop(self, key: str, outcome: Optional[str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._disown(key, entry)
+        if outcome is not None:
+            self._count(outcome)
+            self._count_chars(outcome, entry.chars)
+        if not entry.task.done():
+            entry.task.cancel()
+
+    def _disown(self, key: str, entry: _Prefetch) -> None:
+        for owner in entry.owners:
+            keys = self._owners.get(owner)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._owners[owner]
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [
+            key for key, entry in self._entries.items() if entry.ready_at is not None and entry.ready_at < cutoff
+        ]
+        for key in expired:
+            self._drop(key, "wasted")
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        rate = self.budget_chars_per_minute / 60.0
+        self._budget = min(float(self.budget_chars_per_minute), self._budget + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+        return self._budget
+
+    def _skip(self, reason: str) -> bool:
+        self._count(f"skipped_{reason}")
+        return False
+
+    def _count(self, outcome: str) -> None:
+        self._counts[outcome] = self._counts.get(outcome, 0) + 1
+        PREFETCHES.inc(outcome)
+
+    def _count_chars(self, outcome: str, chars: int) -> None:
+        self._chars[outcome] = self._chars.get(outcome, 0) + chars
+        PREFETCH_CHARS.inc(outcome, amount=chars)
+
+
+speech_prefetcher = SpeechPrefetcher()
+
+registry.register(
+    Gauge("tts_prefetch_inflight", "Speculative TTS prefetches being synthesized.", lambda: speech_prefetcher.inflight)
+)
@@ -0,0 +1,147 @@
+"""
+Long-form text-to-speech: split, synthesize segments concurrently, join the MP3.
+
+Generation time at ElevenLabs grows with the length of the text, so reading back a full
+executive summary in one call takes as long as all of its sentences put together.
+`split_for_speech` cuts the text at paragraph and sentence boundaries into segments of
+at most `TTS_SEGMENT_MAX_CHARS` (the first one shorter, so playback starts sooner), and
+`SegmentSynthesis` synthesizes them concurrently and hands them back in order as soon
+as each is ready. Wall-clock time then tracks the slowest segment instead of the sum.
+
+MP3 is a sequence of self-contained frames, so segments are joined by concatenation
+once the ID3 tags that would otherwise land mid-stream are removed.
+"""
+
+import asyncio
+import os
+import re
+from typing import AsyncIterator, Awaitable, Callable, List, Sequence
+
+TTS_LONGFORM_MIN_CHARS = int(os.getenv("TTS_LONGFORM_MIN_CHARS", "800"))
+TTS_SEGMENT_MAX_CHARS = int(os.getenv("TTS_SEGMENT_MAX_CHARS", "500"))
+TTS_FIRST_SEGMENT_MAX_CHARS = int(os.getenv("TTS_FIRST_SEGMENT_MAX_CHARS", "200"))
+TTS_SEGMENT_CONCURRENCY = int(os.getenv("TTS_SEGMENT_CONCURRENCY", "4"))
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]”’]*\s+")
+_SOFT_BREAK = re.compile(r"[,;:–—]\s+|\s+")
+
+
+def _sentences(paragraph: str) -> List[str]:
+    sentences: List[str] = []
+    start = 0
+    for match in _SENTENCE_END.finditer(paragraph):
+        sentences.append(paragraph[start:match.end()].strip())
+        start = match.end()
+    if paragraph[start:].strip():
+        sentences.append(paragraph[start:].strip())
+    return [sentence for sentence in sentences if sentence]
+
+
+def _split_oversized(sentence: str, limit: int) -> List[str]:
+    """Cut a sentence longer than `limit` at the last comma or space that fits."""
+    pieces: List[str] = []
+    while len(sentence) > limit:
+        cut = None
+        for match in _SOFT_BREAK.finditer(sentence, 0, limit):
+            cut = match.end()
+        cut = cut if cut and cut > limit // 2 else limit
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+def split_for_speech(
+    text: str,
+    max_chars: int = TTS_SEGMENT_MAX_CHARS,
+    first_max_chars: int = TTS_FIRST_SEGMENT_MAX_CHARS,
+) -> List[str]:
+    """
+    Pack sentences into segments of at most `max_chars` (`first_max_chars` for the first).
+
+    A segment is closed at a paragraph end once it is half full, so the natural pause
+    between paragraphs falls between segments rather than inside one.
+    """
+    max_chars = max(max_chars, 1)
+    segments: List[str] = []
+    current = ""
+
+    def _limit() -> int:
+        return min(first_max_chars, max_chars) if not segments else max_chars
+
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        separator = "\n\n"  # keeps the paragraph pause when two paragraphs share a segment
+        for sentence in _sentences(paragraph):
+            for piece in _split_oversized(sentence, max_chars):
+                if current and len(current) + len(separator) + len(piece) > _limit():
+                    segments.append(current)
+                    current = ""
+                current = f"{current}{separator}{piece}" if current else piece
+                separator = " "
+        if current and len(current) >= _limit() // 2:
+            segments.append(current)
+            current = ""
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _syncsafe(data: bytes) -> int:
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def mp3_frames(audio: bytes, keep_header: bool = False) -> bytes:
+    """Drop the trailing ID3v1 tag and, unless `keep_header`, the leading ID3v2 tag."""
+    start, end = 0, len(audio)
+    if not keep_header and audio[:3] == b"ID3" and len(audio) >= 10:
+        footer = 10 if audio[5] & 0x10 else 0
+        start = min(end, 10 + _syncsafe(audio[6:10]) + footer)
+    if end - start >= 128 and audio[end - 128:end - 125] == b"TAG":
+        end -= 128
+    return audio[start:end]
+
+
+class SegmentSynthesis:
+    """
+    Segments synthesized concurrently from creation on, read back in order.
+
+    At most `concurrency` segments are in flight; they start in text order, so the
+    earliest segments are ready first. Iterating yields each segment's MP3 frames as
+    soon as it and every segment before it are done. Call `cancel` when giving up early.
+    """
+
+    def __init__(
+        self,
+        segments: Sequence[str],
+        synthesize: Callable[[str], Awaitable[bytes]],
+        concurrency: int = TTS_SEGMENT_CONCURRENCY,
+        keep_first_header: bool = True,
+    ) -> None:
+        self.segments = list(segments)
+        self._keep_first_header = keep_first_header
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def _one(segment: str) -> bytes:
+            async with semaphore:
+                return await synthesize(segment)
+
+        self._tasks = [asyncio.ensure_future(_one(segment)) for segment in self.segments]
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            for index, task in enumerate(self._tasks):
+                yield mp3_frames(await task, keep_header=index == 0 and self._keep_first_header)
+        finally:
+            self.cancel()
+
+    async def join(self) -> bytes:
+        return b"".join([frames async for frames in self])
+
+    def cancel(self) -> None:
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()  # mark retrieved; the first failure was already raised
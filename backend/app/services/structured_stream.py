@@ -0,0 +1,186 @@
+"""
+Incremental parsing of the `{"chat_reply": ..., "field_updates": {...}}` section replies.
+
+In section mode the model answers with one JSON object, so a parser that waits for
+the closing brace can only fill the form once the whole reply has arrived.
+`StructuredReplyParser` is fed the completion deltas as they stream and returns each
+`field_updates` entry as soon as its string value closes, so fields can be shown while
+the rest of the reply (usually the longer `chat_reply`) is still being generated.
+
+It accepts what `_parse_structured_response` in the assist router accepts: optional
+whitespace, an optional code fence line, then the object. Anything else in front of
+the object, or a syntax error inside it, stops the parser; entries already returned
+stay valid because each one was a complete string in a well-formed prefix. Values
+follow the final parser's rules (strings only, stripped, empty ones dropped), and keys
+outside `allowed` are skipped.
+"""
+
+import json
+import re
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+FIELD_UPDATES_KEY = "field_updates"
+
+# Parser states.
+_PREFIX = "prefix"  # before the top-level object
+_FENCE = "fence"  # inside the opening code fence line
+_KEY = "key"  # expecting an object key or, in an empty object, `}`
+_NEXT_KEY = "next_key"  # expecting an object key after `,`
+_COLON = "colon"
+_VALUE = "value"  # expecting a value (or `]` right after `[`)
+_AFTER = "after"  # after a value: expecting `,` or the closing bracket
+_DONE = "done"  # top-level object closed; the rest is ignored
+_FAILED = "failed"
+
+_STRING_STOP = re.compile(r'["\\]')
+_LITERAL = re.compile(r"[-+.\w]+")
+_VALID_LITERAL = re.compile(r"true|false|null|-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?")
+
+
+class StructuredReplyParser:
+    def __init__(self, allowed: Optional[FrozenSet[str]] = None) -> None:
+        self.allowed = allowed
+        self.fields: Dict[str, str] = {}
+        self._state = _PREFIX
+        # One entry per open container: [kind, key of the value being parsed].
+        self._stack: List[List[Optional[str]]] = []
+        self._in_string = False
+        self._raw: List[str] = []  # characters of the open string, escapes undecoded
+        self._string_is_key = False
+        self._escaped = False
+        self._literal: Optional[List[str]] = None  # characters of the open number/true/false/null
+
+    @property
+    def failed(self) -> bool:
+        return self._state == _FAILED
+
+    @property
+    def complete(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, delta: str) -> List[Tuple[str, str]]:
+        """Consume the next chunk; returns the field updates whose values closed in it."""
+        closed: List[Tuple[str, str]] = []
+        index, length = 0, len(delta)
+        while index < length and self._state not in (_DONE, _FAILED):
+            if self._in_string:
+                index = self._consume_string(delta, index, closed)
+                continue
+            char = delta[index]
+            index += 1
+            if self._literal is not None:
+                if _LITERAL.fullmatch(char):
+                    self._literal.append(char)
+                    continue
+                literal, self._literal = "".join(self._literal), None
+                if not _VALID_LITERAL.fullmatch(literal):
+                    self._state = _FAILED
+                    break
+                self._state = _AFTER
+            self._step(char)
+        return closed
+
+    def _step(self, char: str) -> None:
+        state = self._state
+        if state == _PREFIX:
+            if char == "{":
+                self._open("object")
+            elif char == "`":
+                self._state = _FENCE
+            elif not char.isspace():
+                self._state = _FAILED
+        elif state == _FENCE:
+            if char == "\n":
+                self._state = _PREFIX
+        elif char.isspace():
+            return
+        elif state in (_KEY, _NEXT_KEY):
+            if char == '"':
+                self._start_string(is_key=True)
+            elif char == "}" and state == _KEY:
+                self._close("object")
+            else:
+                self._state = _FAILED
+        elif state == _COLON:
+            self._state = _VALUE if char == ":" else _FAILED
+        elif state == _VALUE:
+            if char == '"':
+                self._start_string(is_key=False)
+            elif char == "{":
+                self._open("object")
+            elif char == "[":
+                self._open("array")
+            elif char == "]" and self._stack[-1] == ["array", None]:
+                self._close("array")
+            elif _LITERAL.fullmatch(char):
+                self._literal = [char]
+            else:
+                self._state = _FAILED
+        elif state == _AFTER:
+            top = self._stack[-1]
+            if char == ",":
+                if top[0] == "object":
+                    top[1] = None
+                    self._state = _NEXT_KEY
+                else:
+                    top[1] = "item"
+                    self._state = _VALUE
+            elif char == ("}" if top[0] == "object" else "]"):
+                self._close(top[0])
+            else:
+                self._state = _FAILED
+
+    def _open(self, kind: str) -> None:
+        self._stack.append([kind, None])
+        self._state = _KEY if kind == "object" else _VALUE
+
+    def _close(self, kind: str) -> None:
+        self._stack.pop()
+        self._state = _AFTER if self._stack else _DONE
+
+    def _start_string(self, is_key: bool) -> None:
+        self._in_string = True
+        self._raw = []
+        self._string_is_key = is_key
+        self._escaped = False
+
+    def _consume_string(self, delta: str, index: int, closed: List[Tuple[str, str]]) -> int:
+        raw = self._raw
+        while index < len(delta):
+            if self._escaped:
+                raw.append(delta[index])
+                self._escaped = False
+                index += 1
+                continue
+            match = _STRING_STOP.search(delta, index)
+            if match is None:
+                raw.append(delta[index:])
+                return len(delta)
+            raw.append(delta[index:match.start()])
+            index = match.end()
+            if match.group() == "\\":
+                raw.append("\\")
+                self._escaped = True
+                continue
+            self._finish_string(closed)
+            return index
+        return index
+
+    def _finish_string(self, closed: List[Tuple[str, str]]) -> None:
+        self._in_string = False
+        try:
+            value = json.loads('"' + "".join(self._raw) + '"')
+        except ValueError:
+            self._state = _FAILED
+            return
+        top = self._stack[-1]
+        if self._string_is_key:
+            top[1] = value
+            self._state = _COLON
+            return
+        self._state = _AFTER
+        if len(self._stack) == 2 and self._stack[0][1] == FIELD_UPDATES_KEY and top[0] == "object":
+            key, value = top[1], value.strip()
+            if key is not None and value and (self.allowed is None or key in self.allowed):
+                self.fields[key] = value
+                closed.append((key, value))
@@ -0,0 +1,212 @@
+"""
+Content-addressed cache for synthesized speech.
+
+Audio is keyed by (voice id, TTS model id, normalized text). A bounded in-memory LRU
+serves hot phrases without touching the disk, and a size-capped directory keeps clips
+across restarts so repeated greetings and prompts do not spend upstream quota.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_MEMORY_BYTES = int(os.getenv("TTS_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+TTS_CACHE_MEMORY_ENTRIES = int(os.getenv("TTS_CACHE_MEMORY_ENTRIES", "512"))
+TTS_CACHE_DISK_BYTES = int(os.getenv("TTS_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+TTS_CACHE_MAX_ENTRY_BYTES = int(os.getenv("TTS_CACHE_MAX_ENTRY_BYTES", str(4 * 1024 * 1024)))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "voicefirst-tts-cache")
+
+
+def normalize_tts_text(text: str) -> str:
+    """Collapse whitespace so trivially different renderings share a cache entry."""
+    return " ".join(text.split())
+
+
+def tts_cache_key(voice_id: str, model_id: str, text: str) -> str:
+    material = "\0".join((voice_id, model_id, normalize_tts_text(text)))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class TTSAudioCache:
+    """Two-tier (memory LRU + disk) cache of MP3 clips keyed by `tts_cache_key`."""
+
+    def __init__(
+        self,
+        memory_bytes: int = TTS_CACHE_MEMORY_BYTES,
+        memory_entries: int = TTS_CACHE_MEMORY_ENTRIES,
+        directory: Optional[str] = TTS_CACHE_DIR,
+        disk_bytes: int = TTS_CACHE_DISK_BYTES,
+        max_entry_bytes: int = TTS_CACHE_MAX_ENTRY_BYTES,
+    ) -> None:
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._memory_bytes = memory_bytes
+        self._memory_entries = memory_entries
+        self._max_entry_bytes = max_entry_bytes
+
+        self._directory = Path(directory) if directory and disk_bytes > 0 else None
+        self._disk_bytes = disk_bytes
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_size = 0
+        self._disk_loaded = False
+        self._disk_lock = threading.Lock()
+
+        self._counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "stores": 0,
+        }
+
+    @property
+    def max_entry_bytes(self) -> int:
+        return self._max_entry_bytes
+
+    async def get(self, key: str) -> Optional[bytes]:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self._counters["memory_hits"] += 1
+            return audio
+
+        if self._directory is not None:
+            audio = await run_in_threadpool(self._read_disk, key)
+            if audio is not None:
+                self._counters["disk_hits"] += 1
+                self._remember(key, audio)
+                return audio
+
+        self._counters["misses"] += 1
+        return None
+
+    async def contains(self, key: str) -> bool:
+        """Whether `key` is cached, without reading it or touching the hit counters."""
+        if key in self._memory:
+            return True
+        if self._directory is None:
+            return False
+        return await run_in_threadpool(self._on_disk, key)
+
+    async def put(self, key: str, audio: bytes) -> None:
+        if not audio or len(audio) > self._max_entry_bytes:
+            return
+        self._counters["stores"] += 1
+        self._remember(key, audio)
+        if self._directory is not None:
+            await run_in_threadpool(self._write_disk, key, audio)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            **self._counters,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_entries": len(self._disk_index),
+            "disk_bytes": self._disk_size,
+        }
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = audio
+        self._memory_size += len(audio)
+        while self._memory and (
+            self._memory_size > self._memory_bytes or len(self._memory) > self._memory_entries
+        ):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self._counters["memory_evictions"] += 1
+
+    def _path_for(self, key: str) -> Path:
+        assert self._directory is not None
+        return self._directory / key[:2] / f"{key}.mp3"
+
+    def _load_disk_index(self) -> None:
+        # Called with the disk lock held. Oldest files (by mtime) are evicted first.
+        if self._disk_loaded or self._directory is None:
+            return
+        self._disk_loaded = True
+        entries = []
+        try:
+            for path in self._directory.glob("*/*.mp3"):
+                stat = path.stat()
+                entries.append((stat.st_mtime, path.stem, stat.st_size))
+        except OSError as exc:
+            logger.warning("Unable to scan TTS cache directory %s: %s", self._directory, exc)
+        for _, key, size in sorted(entries):
+            self._disk_index[key] = size
+            self._disk_size += size
+
+    def _on_disk(self, key: str) -> bool:
+        with self._disk_lock:
+            self._load_disk_index()
+            return key in self._disk_index
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        with self._disk_lock:
+            self._load_disk_index()
+            if key not in self._disk_index:
+                return None
+            self._disk_index.move_to_end(key)
+        path = self._path_for(key)
+        try:
+            audio = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            with self._disk_lock:
+                size = self._disk_index.pop(key, None)
+                if size is not None:
+                    self._disk_size -= size
+            return None
+        return audio
+
+    def _write_disk(self, key: str, audio: bytes) -> None:
+        path = self._path_for(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False, suffix=".tmp") as handle:
+                handle.write(audio)
+            os.replace(handle.name, path)
+        except OSError as exc:
+            logger.warning("Unable to persist TTS cache entry %s: %s", key, exc)
+            return
+
+        evicted = []
+        with self._disk_lock:
+            self._load_disk_index()
+            previous = self._disk_index.pop(key, None)
+            if previous is not None:
+                self._disk_size -= previous
+            self._disk_index[key] = len(audio)
+            self._disk_size += len(audio)
+            while self._disk_index and self._disk_size > self._disk_bytes:
+                old_key, size = self._disk_index.popitem(last=False)
+                self._disk_size -= size
+                self._counters["disk_evictions"] += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                self._path_for(old_key).unlink()
+            except OSError:
+                pass
+
+
+_cache: Optional[TTSAudioCache] = None
+
+
+def get_tts_cache() -> TTSAudioCache:
+    global _cache
+    if _cache is None:
+        _cache = TTSAudioCache()
+    return _cache
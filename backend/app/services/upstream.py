@@ -0,0 +1,141 @@
+"""
+App-lifetime upstream clients for OpenAI and ElevenLabs.
+
+The clients are opened once from the `create_app()` lifespan and shared by every
+request, so connections, TLS sessions and HTTP/2 streams are reused instead of being
+rebuilt per call.
+
+`httpx` and `openai` together take a few hundred milliseconds to import, so they are
+only imported when a client is first built (or by `warm_up_upstream_clients`, which
+the lifespan can run in the background) rather than when the app module loads.
+"""
+
+import asyncio
+import importlib
+import importlib.util
+import logging
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:  # pragma: no cover
+    import httpx
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Retries are handled per call by services.resilience; the SDK's own retries stack on top.
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "0"))
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+UPSTREAM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "10"))
+UPSTREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "60"))
+UPSTREAM_POOL_TIMEOUT = float(os.getenv("UPSTREAM_POOL_TIMEOUT", "10"))
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "true").lower() not in {"0", "false", "no"}
+
+
+@lru_cache(maxsize=None)
+def openai_available() -> bool:
+    """Whether the openai package is installed, without importing it."""
+    return importlib.util.find_spec("openai") is not None
+
+
+def _http2_supported() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _build_http_client() -> "httpx.AsyncClient":
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        UPSTREAM_READ_TIMEOUT,
+        connect=UPSTREAM_CONNECT_TIMEOUT,
+        pool=UPSTREAM_POOL_TIMEOUT,
+    )
+    http2 = UPSTREAM_HTTP2 and _http2_supported()
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+
+class UpstreamClients:
+    """Pooled clients shared by all requests for the lifetime of the application."""
+
+    def __init__(self) -> None:
+        self._elevenlabs: Optional["httpx.AsyncClient"] = None
+        self._openai_http: Optional["httpx.AsyncClient"] = None
+        self._openai: Optional["AsyncOpenAI"] = None
+
+    @property
+    def elevenlabs(self) -> "httpx.AsyncClient":
+        if self._elevenlabs is None:
+            self._elevenlabs = _build_http_client()
+        return self._elevenlabs
+
+    @property
+    def openai(self) -> Optional["AsyncOpenAI"]:
+        """Shared `AsyncOpenAI` client, or None when the key or package is missing."""
+        if self._openai is None and OPENAI_API_KEY and openai_available():
+            from openai import AsyncOpenAI
+
+            self._openai_http = _build_http_client()
+            self._openai = AsyncOpenAI(
+                api_key=OPENAI_API_KEY,
+                http_client=self._openai_http,
+                max_retries=OPENAI_MAX_RETRIES,
+            )
+        return self._openai
+
+    async def aclose(self) -> None:
+        if self._elevenlabs is not None:
+            await self._elevenlabs.aclose()
+        if self._openai is not None:
+            await self._openai.close()
+        elif self._openai_http is not None:
+            await self._openai_http.aclose()
+
+
+_clients: Optional[UpstreamClients] = None
+
+
+async def open_upstream_clients() -> UpstreamClients:
+    global _clients
+    if _clients is None:
+        _clients = UpstreamClients()
+    return _clients
+
+
+def _import_sdks() -> None:
+    importlib.import_module("httpx")
+    if OPENAI_API_KEY and openai_available():
+        importlib.import_module("openai")
+
+
+async def warm_up_upstream_clients() -> None:
+    """Import the SDKs off the event loop, then build the shared clients."""
+    await asyncio.to_thread(_import_sdks)
+    clients = await open_upstream_clients()
+    # Touch the lazy properties so the first request does not pay for building them.
+    clients.elevenlabs
+    clients.openai
+
+
+async def close_upstream_clients() -> None:
+    global _clients
+    clients, _clients = _clients, None
+    if clients is not None:
+        await clients.aclose()
+
+
+def get_upstream_clients() -> UpstreamClients:
+    """Return the lifespan-owned clients, creating them on demand outside a lifespan."""
+    global _clients
+    if _clients is None:
+        logger.debug("Upstream clients requested before application startup; creating them now.")
+        _clients = UpstreamClients()
+    return _clients
@@ -0,0 +1,196 @@
+"""
+Accuracy and latency of the local field extractor against the LLM extraction path.
+
+Replays `benchmarks/data/field_extraction_corpus.jsonl` (Cover Page and Budget turns
+with hand-labelled fields) through `extract_fields` and reports per-field precision
+and recall, per-call latency and how many turns would skip the model entirely. With
+`--llm` (and OPENAI_API_KEY set) every turn is also sent through the section prompt
+used by `/api/assist/chat`, so both paths and the hybrid (local when complete, model
+otherwise) can be compared on the same labels.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_field_extraction
+    OPENAI_API_KEY=... python -m benchmarks.bench_field_extraction --llm
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "data", "field_extraction_corpus.jsonl")
+
+Updates = Dict[str, str]
+
+
+def _load_corpus(path: str) -> List[Dict[str, Any]]:
+    with open(path) as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _normalize(field: str, value: str) -> str:
+    """Compare values the way a reviewer would: $250,000 == 250000, (613) 555-0199 == 613.555.0199."""
+    value = value.strip().lower()
+    if field.endswith("Budget") or field in {"totalBudget", "requestedAmount", "communityContribution"}:
+        digits = re.sub(r"[^\d.]", "", value)
+        try:
+            return f"{float(digits):.2f}"
+        except ValueError:
+            return value
+    if field == "contactPhone":
+        return re.sub(r"\D", "", value).lstrip("1")
+    return re.sub(r"\s+", " ", value).rstrip(".")
+
+
+class _Score:
+    def __init__(self) -> None:
+        self.per_field: Dict[str, List[int]] = {}  # field -> [tp, fp, fn]
+
+    def add(self, expected: Updates, predicted: Optional[Updates], fields: Optional[set] = None) -> bool:
+        predicted = predicted or {}
+        exact = True
+        for name in set(expected) | set(predicted):
+            if fields is not None and name not in fields:
+                continue
+            counts = self.per_field.setdefault(name, [0, 0, 0])
+            want, got = expected.get(name), predicted.get(name)
+            if want is not None and got is not None and _normalize(name, want) == _normalize(name, got):
+                counts[0] += 1
+                continue
+            exact = False
+            if got is not None:
+                counts[1] += 1
+            if want is not None:
+                counts[2] += 1
+        return exact
+
+    def totals(self) -> Tuple[float, float]:
+        tp = sum(counts[0] for counts in self.per_field.values())
+        fp = sum(counts[1] for counts in self.per_field.values())
+        fn = sum(counts[2] for counts in self.per_field.values())
+        precision = tp / (tp + fp) if tp + fp else 1.0
+        recall = tp / (tp + fn) if tp + fn else 1.0
+        return precision, recall
+
+    def print_fields(self) -> None:
+        for name, (tp, fp, fn) in sorted(self.per_field.items()):
+            precision = tp / (tp + fp) if tp + fp else 1.0
+            recall = tp / (tp + fn) if tp + fn else 1.0
+            print(f"  {name:<24} precision={precision:6.1%} recall={recall:6.1%} (tp={tp} fp={fp} fn={fn})")
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))]
+
+
+def _run_local(corpus: List[Dict[str, Any]], repeat: int) -> List[Tuple[Any, float]]:
+    from app.api.routes.assist import SECTION_FIELD_CONFIG
+    from app.services.field_extractor import extract_fields
+
+    results = []
+    for row in corpus:
+        fields = SECTION_FIELD_CONFIG[row["section"]]["fields"]
+        started = time.perf_counter()
+        for _ in range(repeat):
+            extraction = extract_fields(row["message"], fields)
+        results.append((extraction, (time.perf_counter() - started) / repeat))
+    return results
+
+
+async def _run_llm(corpus: List[Dict[str, Any]], model: str) -> List[Tuple[Optional[Updates], float]]:
+    from openai import AsyncOpenAI
+
+    from app.api.routes.assist import _build_format_instruction, _filter_field_updates, _parse_structured_response
+
+    client = AsyncOpenAI()
+    results = []
+    for row in corpus:
+        messages = [
+            {"role": "system", "content": _build_format_instruction(row["section"])},
+            {"role": "user", "content": row["message"]},
+        ]
+        started = time.perf_counter()
+        completion = await client.chat.completions.create(model=model, messages=messages)
+        elapsed = time.perf_counter() - started
+        _, updates = _parse_structured_response(completion.choices[0].message.content or "")
+        results.append((_filter_field_updates(row["section"], updates), elapsed))
+    await client.close()
+    return results
+
+
+def _report(label: str, score: _Score, latencies: List[float], exact: int, total: int) -> None:
+    precision, recall = score.totals()
+    print(
+        f"{label:<8} precision={precision:6.1%} recall={recall:6.1%} exact turns={exact}/{total} "
+        f"latency p50={_percentile(latencies, 50) * 1000:.3f}ms p95={_percentile(latencies, 95) * 1000:.3f}ms"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=200, help="Local extractions per turn when timing")
+    parser.add_argument("--llm", action="store_true", help="Also run the OpenAI extraction path")
+    parser.add_argument("--model", default=os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini"))
+    parser.add_argument("--verbose", action="store_true", help="Print every local mismatch")
+    args = parser.parse_args(argv)
+
+    from app.services.field_extractor import EXTRACTABLE_FIELDS
+
+    corpus = _load_corpus(args.corpus)
+    local_results = _run_local(corpus, args.repeat)
+
+    local_score = _Score()
+    skipped = skipped_exact = local_exact = 0
+    for row, (extraction, _) in zip(corpus, local_results):
+        # The extractor only claims the rule-friendly fields; score it on those.
+        exact = local_score.add(row["expected"], extraction.field_updates, EXTRACTABLE_FIELDS)
+        local_exact += exact
+        if extraction.complete:
+            skipped += 1
+            # Skipping is only right when the local values cover every labelled field.
+            skipped_exact += _Score().add(row["expected"], extraction.field_updates)
+        if args.verbose and not exact:
+            print(f"  mismatch: {row['message']!r} -> {extraction.field_updates}")
+
+    print(f"{len(corpus)} turns from {args.corpus}")
+    _report("local", local_score, [elapsed for _, elapsed in local_results], local_exact, len(corpus))
+    local_score.print_fields()
+    print(f"model skipped on {skipped}/{len(corpus)} turns ({skipped_exact} of them fully correct)")
+
+    if not args.llm:
+        print("LLM comparison skipped (pass --llm with OPENAI_API_KEY set)")
+        return
+    if not os.getenv("OPENAI_API_KEY"):
+        print("LLM comparison skipped: OPENAI_API_KEY is not set")
+        return
+
+    llm_results = asyncio.run(_run_llm(corpus, args.model))
+    llm_score, hybrid_score = _Score(), _Score()
+    llm_exact = hybrid_exact = 0
+    hybrid_latencies = []
+    for row, (extraction, local_elapsed), (updates, llm_elapsed) in zip(corpus, local_results, llm_results):
+        llm_exact += llm_score.add(row["expected"], updates)
+        if extraction.complete:
+            combined, elapsed = extraction.field_updates, local_elapsed
+        else:
+            combined, elapsed = {**(updates or {}), **extraction.field_updates}, local_elapsed + llm_elapsed
+        hybrid_exact += hybrid_score.add(row["expected"], combined)
+        hybrid_latencies.append(elapsed)
+    _report("llm", llm_score, [elapsed for _, elapsed in llm_results], llm_exact, len(corpus))
+    llm_score.print_fields()
+    _report("hybrid", hybrid_score, hybrid_latencies, hybrid_exact, len(corpus))
+    print(f"mean latency: llm {statistics.fmean(e for _, e in llm_results) * 1000:.1f}ms, "
+          f"hybrid {statistics.fmean(hybrid_latencies) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Re-analysis cost of an edited draft: whole-draft scoring against section reuse.
+
+Starts the fake OpenAI server from `benchmarks.fake_upstreams` (one model call takes
+`--latency-ms`), uploads a generated draft of `--sections` sections to
+`/api/proposals/analyze`, then uploads versions of it with one and with three sections
+edited. For each upload it reports latency, model calls, characters sent to the model
+and the `X-Analysis-Cache` / `X-Analysis-Sections` headers; the first (cold) upload is
+what every edit cost when the whole draft was rescored. Finally prints the score diff
+between the original and the one-edit version from `GET /analyses/{id}/diff`.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_incremental_analysis
+    python -m benchmarks.bench_incremental_analysis --sections 24 --latency-ms 1500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_upstreams import FakeUpstreamConfig, FakeUpstreams
+
+_HEADINGS = (
+    "Executive Summary", "Community Background", "Problem Statement", "Project Objectives",
+    "Implementation Plan", "Budget", "Expected Outcomes", "Evaluation", "Alignment", "Sustainability",
+    "Risk Management", "Partnerships",
+)
+_SENTENCE = (
+    "The Land Guardians program trains young people from the community in water monitoring and "
+    "wetland restoration, guided by Elders and certified instructors. "
+)
+
+
+def _draft(sections: int, edited: List[int]) -> str:
+    blocks = []
+    for index in range(sections):
+        heading = f"{index + 1}. {_HEADINGS[index % len(_HEADINGS)]}"
+        body = f"Section {index + 1}. " + _SENTENCE * 7
+        if index in edited:
+            body += "Since the last draft we added quarterly reporting to the band council and the funder."
+        blocks.append(f"{heading}\n{body}")
+    return "\n\n".join(blocks)
+
+
+async def _upload(client: Any, fake: FakeUpstreams, text: str) -> Dict[str, Any]:
+    calls_before = fake.stats()["calls"].get("openai", 0)
+    chars_before = fake.app.state.behaviour.prompt_chars
+    started = time.perf_counter()
+    response = await client.post(
+        "/api/proposals/analyze", files={"file": ("draft.txt", text.encode(), "text/plain")}
+    )
+    elapsed = time.perf_counter() - started
+    if response.status_code != 200:
+        raise RuntimeError(f"/analyze answered {response.status_code}: {response.text}")
+    return {
+        "ms": round(elapsed * 1000, 1),
+        "model_calls": fake.stats()["calls"].get("openai", 0) - calls_before,
+        "chars_sent": fake.app.state.behaviour.prompt_chars - chars_before,
+        "cache": response.headers.get("X-Analysis-Cache"),
+        "sections": response.headers.get("X-Analysis-Sections"),
+        "analysis_id": response.headers.get("X-Analysis-Id"),
+    }
+
+
+async def _run(args: argparse.Namespace, fake: FakeUpstreams) -> Dict[str, Any]:
+    import httpx
+
+    from app.main import create_app
+
+    app = create_app()
+    runs: Dict[str, Dict[str, Any]] = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            runs["cold (whole draft)"] = await _upload(client, fake, _draft(args.sections, []))
+            runs["unchanged"] = await _upload(client, fake, _draft(args.sections, []))
+            runs["1 section edited"] = await _upload(client, fake, _draft(args.sections, [2]))
+            runs["3 sections edited"] = await _upload(client, fake, _draft(args.sections, [0, 5, 9]))
+            diff = await client.get(
+                f"/api/proposals/analyses/{runs['1 section edited']['analysis_id']}/diff",
+                params={"previous": runs["cold (whole draft)"]["analysis_id"]},
+            )
+    return {"runs": runs, "diff": diff.json()}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=12, help="Sections in the generated draft")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Fake model latency per call")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.TemporaryDirectory()
+    config = FakeUpstreamConfig(latency_ms=args.latency_ms, jitter_ms=0)
+    with FakeUpstreams(config) as fake:
+        os.environ.update(fake.environment())
+        os.environ.update(
+            PROPOSAL_DB_PATH=os.path.join(scratch.name, "proposals.sqlite3"),
+            TTS_CACHE_DIR=os.path.join(scratch.name, "tts-cache"),
+            ANALYSIS_CACHE_BACKEND="memory",
+            UPSTREAM_HTTP2="false",
+            STARTUP_WARMUP="eager",
+        )
+        results = asyncio.run(_run(args, fake))
+
+    print(f"\n{'upload':<20} {'ms':>8} {'calls':>6} {'chars sent':>11}  {'cache':<8} sections")
+    for label, run in results["runs"].items():
+        print(
+            f"{label:<20} {run['ms']:>8} {run['model_calls']:>6} {run['chars_sent']:>11}  "
+            f"{run['cache'] or '-':<8} {run['sections'] or '-'}"
+        )
+    diff = results["diff"]
+    print(f"\ndiff original -> 1 edit: {diff['sections_rescored']} rescored, {diff['sections_reused']} reused")
+    for change in diff["sections"]:
+        if change["status"] != "unchanged":
+            print(f"  {change['section']}: {change['status']} {change['previous_score']} -> {change['score']}")
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark for the heuristic analyzer's keyword scan on ~1 MB drafts.
+
+Compares the previous per-keyword `in` checks plus `split()` word count against the
+scanner's `present()`, which the fallback analyzer uses for scoring, on a sparse and
+a dense draft.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_keyword_scan
+"""
+
+import random
+import time
+from typing import Callable, Dict, List
+
+from app.services.keywords import DEFAULT_SECTION_KEYWORDS, KeywordScanner
+
+DRAFT_BYTES = 1_000_000
+REPEATS = 10
+
+FILLER = (
+    "the and of grant program youth training will our we to a in for local partners "
+    "with students elders language school season harvest water health families services "
+    "staff support year regional office"
+).split()
+
+
+def _legacy_scan(text: str, taxonomy: Dict[str, List[str]]) -> Dict[str, int]:
+    lower_text = text.lower()
+    word_count = max(len(text.split()), 1)
+    matches = {name: sum(1 for keyword in keywords if keyword in lower_text) for name, keywords in taxonomy.items()}
+    matches["__words__"] = word_count
+    return matches
+
+
+def _build_draft(keyword_rate: float, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    keywords = [keyword for values in DEFAULT_SECTION_KEYWORDS.values() for keyword in values]
+    words = []
+    size = 0
+    while size < DRAFT_BYTES:
+        word = rng.choice(keywords).capitalize() if rng.random() < keyword_rate else rng.choice(FILLER)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:DRAFT_BYTES]
+
+
+def _time(fn: Callable[[], object]) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main() -> None:
+    scanner = KeywordScanner(DEFAULT_SECTION_KEYWORDS)
+    print(f"{'draft':<8}{'legacy ms':>11}{'present ms':>12}{'speedup':>9}")
+    for label, rate in (("sparse", 0.01), ("dense", 0.25)):
+        text = _build_draft(rate)
+        legacy = _time(lambda: _legacy_scan(text, DEFAULT_SECTION_KEYWORDS))
+        present = _time(lambda: scanner.present(text))
+        print(f"{label:<8}{legacy:>11.1f}{present:>12.1f}{legacy / present:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+End-to-end load benchmark for the assist and proposal endpoints.
+
+Starts the fake OpenAI/ElevenLabs server from `benchmarks.fake_upstreams`, points the
+backend at it through the usual environment variables, and drives `create_app()` in
+process at a fixed concurrency. For each endpoint it reports throughput, p50/p95/p99
+latency, status codes and peak RSS, and writes everything to a JSON file. Pass
+`--baseline` with an earlier results file to print the change per metric.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_load --concurrency 32 --requests 400 --output load.json
+    python -m benchmarks.bench_load --endpoints chat,tts --latency-ms 300 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.fake_upstreams import FakeUpstreamConfig, FakeUpstreams
+
+ENDPOINTS = ("chat", "chat_stream", "tts", "stt", "analyze")
+
+RequestSpec = Tuple[str, str, Dict[str, Any]]
+
+
+def _draft(index: int, size: int) -> bytes:
+    paragraph = (
+        "EXECUTIVE SUMMARY\nOur community program trains youth as land guardians. "
+        "OBJECTIVES\nWe will restore 40 hectares of wetland and mentor 25 students. "
+        "BUDGET\nThe total request is $120,000 over two years. "
+    )
+    text = f"Draft {index}\n" + paragraph * (size // len(paragraph) + 1)
+    return text[:size].encode()
+
+
+def _request_factory(endpoint: str, args: argparse.Namespace) -> Callable[[int], RequestSpec]:
+    recording = bytes(args.upload_bytes)
+
+    def build(index: int) -> RequestSpec:
+        # Vary the content per request so the TTS and analysis caches measure the miss path.
+        if endpoint == "chat":
+            return "POST", "/api/assist/chat", {"json": {"message": f"Our project serves {index} families.", "section": 3}}
+        if endpoint == "chat_stream":
+            return "POST", "/api/assist/chat/stream", {"json": {"message": f"Tell me more about step {index}."}}
+        if endpoint == "tts":
+            return "POST", "/api/assist/tts", {"json": {"text": f"Section {index}: describe the community you serve."}}
+        if endpoint == "stt":
+            files = {"file": ("turn.webm", recording, "audio/webm")}
+            return "POST", "/api/assist/stt", {"files": files}
+        if endpoint == "analyze":
+            files = {"file": (f"draft-{index}.txt", _draft(index, args.upload_bytes), "text/plain")}
+            return "POST", "/api/proposals/analyze", {"files": files}
+        raise ValueError(f"Unknown endpoint {endpoint}")
+
+    return build
+
+
+def _current_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _RSSSampler:
+    """Track peak resident memory during one endpoint run."""
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self.interval = interval
+        self.peak = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _sample(self) -> None:
+        while True:
+            rss = _current_rss_bytes()
+            if rss is not None:
+                self.peak = max(self.peak, rss)
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self) -> "_RSSSampler":
+        self._task = asyncio.create_task(self._sample())
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        rss = _current_rss_bytes()
+        if rss is None:
+            # No /proc (e.g. macOS): fall back to the process-lifetime maximum.
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            rss = maxrss if sys.platform == "darwin" else maxrss * 1024
+        self.peak = max(self.peak, rss)
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+async def _run_endpoint(client: httpx.AsyncClient, endpoint: str, args: argparse.Namespace) -> Dict[str, Any]:
+    build = _request_factory(endpoint, args)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    failures = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index, failures
+        while next_index < args.requests:
+            index = next_index
+            next_index += 1
+            method, url, kwargs = build(index)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                status = str(response.status_code)
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not status.startswith("2"):
+                failures += 1
+
+    for index in range(min(args.warmup, args.requests)):
+        method, url, kwargs = build(-1 - index)
+        await client.request(method, url, **kwargs)
+
+    with _RSSSampler() as sampler:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+            "p50": round(_percentile(latencies, 50) * 1000, 2),
+            "p95": round(_percentile(latencies, 95) * 1000, 2),
+            "p99": round(_percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+        "error_rate": round(failures / len(latencies), 4) if latencies else 0.0,
+        "status_counts": statuses,
+        "peak_rss_mb": round(sampler.peak / (1024 * 1024), 1),
+    }
+
+
+async def _run(args: argparse.Namespace, fake: FakeUpstreams) -> Dict[str, Any]:
+    # Imported after the environment points at the fake server: settings are read at import.
+    from app.main import create_app
+
+    app = create_app()
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            for endpoint in args.endpoints:
+                results[endpoint] = await _run_endpoint(client, endpoint, args)
+                summary = results[endpoint]
+                print(
+                    f"{endpoint:<12} {summary['throughput_rps']:>8.1f} req/s  "
+                    f"p50={summary['latency_ms']['p50']:>8.1f}ms p95={summary['latency_ms']['p95']:>8.1f}ms "
+                    f"p99={summary['latency_ms']['p99']:>8.1f}ms errors={summary['error_rate']:.1%} "
+                    f"rss={summary['peak_rss_mb']}MB"
+                )
+    return results
+
+
+def _compare(results: Dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path) as handle:
+        baseline = json.load(handle).get("results", {})
+    print(f"\nChange vs {baseline_path}:")
+    for endpoint, current in results.items():
+        previous = baseline.get(endpoint)
+        if not previous:
+            continue
+        deltas = []
+        for label, now, before in (
+            ("rps", current["throughput_rps"], previous["throughput_rps"]),
+            ("p50", current["latency_ms"]["p50"], previous["latency_ms"]["p50"]),
+            ("p99", current["latency_ms"]["p99"], previous["latency_ms"]["p99"]),
+            ("rss", current["peak_rss_mb"], previous["peak_rss_mb"]),
+        ):
+            change = (now - before) / before * 100 if before else 0.0
+            deltas.append(f"{label} {change:+.1f}%")
+        print(f"{endpoint:<12} " + "  ".join(deltas))
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="Comma-separated subset of " + ", ".join(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per endpoint")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--upload-bytes", type=int, default=64_000, help="Recording / draft size for stt and analyze")
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--reply-chars", type=int, default=400)
+    parser.add_argument("--audio-bytes", type=int, default=48_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="load-results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+    args.endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _parse_args(argv)
+    config = FakeUpstreamConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        reply_chars=args.reply_chars,
+        audio_bytes=args.audio_bytes,
+        seed=args.seed,
+    )
+    scratch = tempfile.TemporaryDirectory()
+    with FakeUpstreams(config) as fake:
+        os.environ.update(fake.environment())
+        os.environ.setdefault("TTS_CACHE_DIR", os.path.join(scratch.name, "tts-cache"))
+        os.environ.setdefault("PROPOSAL_DB_PATH", os.path.join(scratch.name, "proposals.sqlite3"))
+        os.environ.setdefault("UPSTREAM_HTTP2", "false")
+        print(f"fake upstreams on {fake.base_url}; {args.requests} requests/endpoint at concurrency {args.concurrency}")
+        results = asyncio.run(_run(args, fake))
+        upstream_stats = fake.stats()
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "upload_bytes": args.upload_bytes,
+            "upstream": config.as_dict(),
+        },
+        "upstream_calls": upstream_stats,
+        "results": results,
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"wrote {args.output}")
+    if args.baseline:
+        _compare(results, args.baseline)
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
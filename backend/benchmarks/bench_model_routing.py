@@ -0,0 +1,161 @@
+"""
+Chat latency with every turn on one model against latency-aware fast/heavy routing.
+
+Replays `benchmarks/data/chat_replay.jsonl` (three interview conversations: cover page
+and budget answers, acknowledgements, long narrative turns) through `/api/assist/chat`
+against the fake OpenAI server from `benchmarks.fake_upstreams`, where the heavy model
+answers in `--heavy-ms` and the fast one in `--fast-ms`. Each conversation runs in its
+own session, first with routing disabled (every turn on the heavy model) and then with
+routing on. Reports p50/p95 turn latency overall and per tier, and how turns were routed.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_model_routing
+    python -m benchmarks.bench_model_routing --heavy-ms 1200 --fast-ms 250 --runs 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_upstreams import FakeUpstreamConfig, FakeUpstreams
+
+DEFAULT_LOG = os.path.join(os.path.dirname(__file__), "data", "chat_replay.jsonl")
+FAST_MODEL = "fake-fast"
+HEAVY_MODEL = "fake-heavy"
+
+
+def _load_log(path: str) -> List[Dict[str, Any]]:
+    with open(path) as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "turns": len(values),
+        "p50_ms": round(_percentile(values, 0.5) * 1000, 1),
+        "p95_ms": round(_percentile(values, 0.95) * 1000, 1),
+        "mean_ms": round(statistics.fmean(values) * 1000, 1) if values else 0.0,
+    }
+
+
+async def _replay(client: Any, turns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Send every turn in order; returns latency and the tier that served each one."""
+    from app.services.model_router import model_router
+
+    sessions: Dict[Any, str] = {}
+    timings: List[Dict[str, Any]] = []
+    for turn in turns:
+        if turn["conversation"] not in sessions:
+            created = await client.post("/api/assist/sessions")
+            sessions[turn["conversation"]] = created.json()["session_id"]
+        calls = {tier: stats.calls for tier, stats in model_router.stats.items()}
+        payload = {
+            "message": turn["message"],
+            "section": turn.get("section"),
+            "session_id": sessions[turn["conversation"]],
+            "audio_mode": "url",
+        }
+        started = time.perf_counter()
+        response = await client.post("/api/assist/chat", json=payload)
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/assist/chat answered {response.status_code}: {response.text}")
+        served = [tier for tier, stats in model_router.stats.items() if stats.calls > calls[tier]]
+        timings.append({"seconds": elapsed, "tier": served[0] if served else "local"})
+    return timings
+
+
+async def _run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    from app.main import create_app
+    from app.services.model_router import model_router
+
+    turns = _load_log(args.log)
+    app = create_app()
+    results: Dict[str, Any] = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for routing in (False, True):
+                model_router.enabled = routing
+                timings: List[Dict[str, Any]] = []
+                for _ in range(args.runs):
+                    timings.extend(await _replay(client, turns))
+                label = "routed" if routing else "heavy only"
+                results[label] = {
+                    "all": _summary([timing["seconds"] for timing in timings]),
+                    "by_tier": {
+                        tier: _summary([timing["seconds"] for timing in timings if timing["tier"] == tier])
+                        for tier in sorted({timing["tier"] for timing in timings})
+                    },
+                }
+            info = model_router.info()
+            results["routes"] = {route: count for route, count in info["routes"].items() if "disabled" not in route}
+            results["router"] = info["tiers"]
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=DEFAULT_LOG, help="JSONL conversation log to replay")
+    parser.add_argument("--heavy-ms", type=float, default=900.0, help="Fake heavy model latency")
+    parser.add_argument("--fast-ms", type=float, default=300.0, help="Fake fast model latency")
+    parser.add_argument("--runs", type=int, default=2)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.TemporaryDirectory()
+    config = FakeUpstreamConfig(
+        latency_ms=100,
+        jitter_ms=30,
+        reply_chars=240,
+        model_latency_ms={FAST_MODEL: args.fast_ms, HEAVY_MODEL: args.heavy_ms},
+    )
+    with FakeUpstreams(config) as fake:
+        os.environ.update(fake.environment())
+        os.environ.update(
+            OPENAI_FAST_MODEL=FAST_MODEL,
+            OPENAI_HEAVY_MODEL=HEAVY_MODEL,
+            TTS_CACHE_DIR=os.path.join(scratch.name, "tts-cache"),
+            PROPOSAL_DB_PATH=os.path.join(scratch.name, "proposals.sqlite3"),
+            UPSTREAM_HTTP2="false",
+            STARTUP_WARMUP="eager",
+        )
+        results = asyncio.run(_run(args))
+        upstream = fake.stats()
+
+    print(f"\n{'mode':<12} {'tier':<7} {'turns':>6} {'p50':>8} {'p95':>8} {'mean':>8}  (ms)")
+    for label in ("heavy only", "routed"):
+        rows = [("all", results[label]["all"]), *results[label]["by_tier"].items()]
+        for tier, summary in rows:
+            print(
+                f"{label:<12} {tier:<7} {summary['turns']:>6} {summary['p50_ms']:>8} "
+                f"{summary['p95_ms']:>8} {summary['mean_ms']:>8}"
+            )
+    before, after = results["heavy only"]["all"]["p50_ms"], results["routed"]["all"]["p50_ms"]
+    if before:
+        print(f"\np50 {before} ms -> {after} ms ({(before - after) / before:.0%} faster)")
+    print("routes:", ", ".join(f"{route}={count}" for route, count in results["routes"].items()))
+    print("upstream calls per model:", upstream.get("models"))
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Sustained-write benchmark for the proposal store.
+
+Simulates many editors autosaving proposals concurrently and compares the
+write-behind queue against committing every save synchronously (one transaction
+per save, as a naive per-request INSERT would). Reports accepted saves/sec, rows
+committed, batch count and p50/p99 latency seen by the caller.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_proposal_store
+"""
+
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from app.services.proposal_store import ProposalStore
+
+EDITORS = 64
+PROPOSALS = 200
+DURATION_SECONDS = 3.0
+
+
+def _document(index: int, revision: int) -> dict:
+    return {
+        "project_title": f"Project {index}",
+        "organization_name": f"Organization {index % 20}",
+        "submission_date": f"2026-{index % 12 + 1:02d}-01",
+        "executive_summary": "Draft text " * 40 + str(revision),
+        "objectives": ["Train youth", "Restore habitat"],
+        "milestones": [],
+    }
+
+
+async def _editor(store: ProposalStore, editor: int, latencies: List[float], write_through: bool) -> int:
+    saves = 0
+    deadline = time.perf_counter() + DURATION_SECONDS
+    while time.perf_counter() < deadline:
+        index = (editor * 7 + saves) % PROPOSALS
+        started = time.perf_counter()
+        await store.upsert(f"proposal-{index}", _document(index, saves))
+        if write_through:
+            await store.flush()
+        latencies.append(time.perf_counter() - started)
+        saves += 1
+        await asyncio.sleep(0)
+    return saves
+
+
+async def _run(label: str, write_through: bool, batch_size: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        store = ProposalStore(path=str(Path(directory) / "bench.sqlite3"), batch_size=batch_size)
+        await store.start()
+        latencies: List[float] = []
+        started = time.perf_counter()
+        saves = sum(await asyncio.gather(*(_editor(store, n, latencies, write_through) for n in range(EDITORS))))
+        await store.close()
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{label:<14} {saves / elapsed:>10.0f} saves/s  rows={store.committed_writes:<7} "
+        f"batches={store.committed_batches:<6} p50={statistics.median(latencies) * 1000:.2f}ms "
+        f"p99={p99 * 1000:.2f}ms"
+    )
+
+
+async def main() -> None:
+    print(f"{EDITORS} editors autosaving {PROPOSALS} proposals for {DURATION_SECONDS:.0f}s each run")
+    await _run("write-through", write_through=True, batch_size=1)
+    await _run("write-behind", write_through=False, batch_size=200)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,195 @@
+"""
+Cold-start benchmark: import time, time to ready and first-request latency.
+
+Each run is a fresh interpreter (so nothing is already imported or cached) pointed at
+the fake upstreams from `benchmarks.fake_upstreams`. The child measures importing
+`app.main`, building the app, the lifespan startup, how long `/ready` takes to answer
+200, and the latency of the first and second chat requests sent once it does (the
+first one builds the OpenAI client unless the warmup already did). Runs are repeated for each
+`STARTUP_WARMUP` mode and medians are reported.
+
+Use `--max-import-ms` / `--max-first-request-ms` in CI to fail on regressions, and
+`--profile` to list the slowest imports.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --modes background --max-import-ms 1500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+MODES = ("off", "background", "eager")
+_CHAT = {"message": "Our community has 1,200 members.", "section": 3, "audio_mode": "url"}
+
+
+async def _call(app: Any, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> int:
+    """Minimal ASGI client, so the harness itself does not import httpx before the app does."""
+    body = json.dumps(payload).encode() if payload is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _child_measure(started: float, imported: float) -> Dict[str, float]:
+    from app.main import create_app
+
+    timings = {"import_ms": (imported - started) * 1000}
+    mark = time.perf_counter()
+    app = create_app()
+    timings["create_app_ms"] = (time.perf_counter() - mark) * 1000
+
+    mark = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["lifespan_startup_ms"] = (time.perf_counter() - mark) * 1000
+        # Like a load balancer: wait for /ready, then send the first real request.
+        while await _call(app, "GET", "/ready") != 200:
+            await asyncio.sleep(0.005)
+        timings["ready_ms"] = (time.perf_counter() - started) * 1000
+        for label in ("first_request_ms", "second_request_ms"):
+            mark = time.perf_counter()
+            status = await _call(app, "POST", "/api/assist/chat", _CHAT)
+            if status != 200:
+                raise RuntimeError(f"chat request failed with {status}")
+            timings[label] = (time.perf_counter() - mark) * 1000
+        timings["first_response_since_start_ms"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def _child() -> None:
+    started = time.perf_counter()
+    import app.main  # noqa: F401  (the measured import)
+
+    imported = time.perf_counter()
+    print(json.dumps(asyncio.run(_child_measure(started, imported))))
+
+
+def _run_child(environment: Dict[str, str]) -> Dict[str, float]:
+    mark = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    timings["process_ms"] = (time.perf_counter() - mark) * 1000
+    return timings
+
+
+def _profile_imports(environment: Dict[str, str], top: int) -> None:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=environment,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            rows.append((int(match.group(2)), int(match.group(1)), match.group(4)))
+    print(f"\nslowest imports (cumulative ms, self ms) of {len(rows)}:")
+    for cumulative, own, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} {own / 1000:8.1f}  {name}")
+
+
+def _median(runs: List[Dict[str, float]], key: str) -> Optional[float]:
+    values = [run[key] for run in runs if key in run]
+    return round(statistics.median(values), 1) if values else None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per mode")
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated STARTUP_WARMUP modes")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake upstream latency")
+    parser.add_argument("--max-import-ms", type=float, help="Fail when the median import time is higher")
+    parser.add_argument("--max-first-request-ms", type=float, help="Fail when the median first request is slower")
+    parser.add_argument("--profile", type=int, nargs="?", const=15, help="Print the N slowest imports")
+    parser.add_argument("--output", help="Write the raw timings to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child()
+        return
+
+    from benchmarks.fake_upstreams import FakeUpstreamConfig, FakeUpstreams
+
+    scratch = tempfile.TemporaryDirectory()
+    results: Dict[str, Any] = {}
+    failures: List[str] = []
+    with FakeUpstreams(FakeUpstreamConfig(latency_ms=args.latency_ms, jitter_ms=0)) as fake:
+        environment = dict(os.environ, **fake.environment())
+        environment.update(
+            PROPOSAL_DB_PATH=os.path.join(scratch.name, "proposals.sqlite3"),
+            TTS_CACHE_DIR=os.path.join(scratch.name, "tts-cache"),
+            UPSTREAM_HTTP2="false",
+        )
+        if args.profile:
+            _profile_imports(environment, args.profile)
+        print(f"\n{'mode':<11} {'import':>8} {'startup':>8} {'ready':>8} {'1st req':>8} {'2nd req':>8} {'process':>8}  (ms, median of {args.runs})")
+        for mode in [name.strip() for name in args.modes.split(",") if name.strip()]:
+            runs = [_run_child(dict(environment, STARTUP_WARMUP=mode)) for _ in range(args.runs)]
+            results[mode] = runs
+            summary = {key: _median(runs, key) for key in runs[0]}
+            print(
+                f"{mode:<11} {summary['import_ms']:>8} {summary['lifespan_startup_ms']:>8} {summary.get('ready_ms')!s:>8} "
+                f"{summary['first_request_ms']:>8} {summary['second_request_ms']:>8} {summary['process_ms']:>8}"
+            )
+            if args.max_import_ms is not None and summary["import_ms"] > args.max_import_ms:
+                failures.append(f"{mode}: import {summary['import_ms']}ms > {args.max_import_ms}ms")
+            if args.max_first_request_ms is not None and summary["first_request_ms"] > args.max_first_request_ms:
+                failures.append(f"{mode}: first request {summary['first_request_ms']}ms > {args.max_first_request_ms}ms")
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+    scratch.cleanup()
+    if failures:
+        print("\nregressions:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
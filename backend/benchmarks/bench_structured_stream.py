@@ -0,0 +1,160 @@
+"""
+When section-mode field updates reach the client on `/api/assist/chat/stream`.
+
+Starts the fake OpenAI server from `benchmarks.fake_upstreams` with a structured reply
+carrying `--fields` field updates, streams `--turns` Cover Page turns through
+`/api/assist/chat/stream` and reports, median over the turns, the time to the first
+`field` event, to the last one and to `done` (which is when every field arrived before
+incremental parsing). Also reports the CPU cost of the incremental parser per reply.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_structured_stream
+    python -m benchmarks.bench_structured_stream --reply-chars 1200 --chunk-delay-ms 25
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_upstreams import FakeUpstreamConfig, FakeUpstreams
+
+_FIELDS = {
+    "projectTitle": "Land Guardians Youth Training",
+    "organizationName": "Waswanipi Cree Nation",
+    "contactName": "Mary Otter",
+    "contactEmail": "mary.otter@example.org",
+    "contactPhone": "(819) 555-0142",
+    "submissionDate": "2026-03-15",
+}
+
+
+async def _stream_turn(app: Any, turn: int) -> Dict[str, float]:
+    """POST through the ASGI app directly (httpx's ASGI transport buffers the body)."""
+    payload = {"message": f"Here are our cover page details, take {turn}", "section": 1, "audio_mode": "url"}
+    body = json.dumps(payload).encode()
+    path = "/api/assist/chat/stream"
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+    buffer = b""
+    marks: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal buffer
+        if message["type"] != "http.response.body":
+            return
+        buffer += message.get("body", b"")
+        *lines, buffer = buffer.split(b"\n")
+        elapsed = time.perf_counter() - started
+        for line in lines:
+            event = json.loads(line)
+            if event["type"] == "field":
+                marks.setdefault("first_field", elapsed)
+                marks["last_field"] = elapsed
+            elif event["type"] == "done":
+                marks["done"] = elapsed
+            elif event["type"] == "error":
+                raise RuntimeError(event.get("detail"))
+
+    await app(scope, receive, send)
+    return marks
+
+
+def _parser_cost(reply: str, runs: int = 2000) -> float:
+    from app.services.structured_stream import StructuredReplyParser
+
+    deltas = [reply[start:start + 4] for start in range(0, len(reply), 4)]
+    started = time.perf_counter()
+    for _ in range(runs):
+        parser = StructuredReplyParser(frozenset(_FIELDS))
+        for delta in deltas:
+            parser.feed(delta)
+    return (time.perf_counter() - started) / runs
+
+
+async def _run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.main import create_app
+
+    app = create_app()
+    turns: List[Dict[str, float]] = []
+    async with app.router.lifespan_context(app):
+        for turn in range(args.turns):
+            turns.append(await _stream_turn(app, turn))
+    fields = dict(list(_FIELDS.items())[: args.fields])
+    reply = json.dumps({"field_updates": fields, "chat_reply": "x" * args.reply_chars})
+    results: Dict[str, Any] = {
+        name: round(statistics.median(turn[name] for turn in turns) * 1000, 1)
+        for name in ("first_field", "last_field", "done")
+        if all(name in turn for turn in turns)
+    }
+    results["parser_us_per_reply"] = round(_parser_cost(reply) * 1e6, 1)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, default=4, help=f"Field updates per reply (max {len(_FIELDS)})")
+    parser.add_argument("--reply-chars", type=int, default=600, help="Length of chat_reply")
+    parser.add_argument("--chunks", type=int, default=40, help="Streamed deltas per completion")
+    parser.add_argument("--chunk-delay-ms", type=float, default=15.0, help="Delay between deltas")
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.TemporaryDirectory()
+    config = FakeUpstreamConfig(
+        latency_ms=150,
+        jitter_ms=0,
+        reply_chars=args.reply_chars,
+        stream_chunks=args.chunks,
+        stream_chunk_delay_ms=args.chunk_delay_ms,
+        field_updates=dict(list(_FIELDS.items())[: args.fields]),
+    )
+    with FakeUpstreams(config) as fake:
+        os.environ.update(fake.environment())
+        os.environ.update(
+            TTS_CACHE_DIR=os.path.join(scratch.name, "tts-cache"),
+            PROPOSAL_DB_PATH=os.path.join(scratch.name, "proposals.sqlite3"),
+            UPSTREAM_HTTP2="false",
+            STARTUP_WARMUP="eager",
+            FIELD_EXTRACTOR_ENABLED="false",
+        )
+        results = asyncio.run(_run(args))
+
+    print(f"\n{'first field':>12} {'last field':>11} {'done':>8}  (ms, median of {args.turns} turns)")
+    print(f"{results.get('first_field', '-'):>12} {results.get('last_field', '-'):>11} {results.get('done', '-'):>8}")
+    print(f"incremental parser: {results['parser_us_per_reply']} us per reply")
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
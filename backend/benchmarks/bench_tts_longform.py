@@ -0,0 +1,148 @@
+"""
+Long-form text-to-speech: one upstream call against concurrent segments.
+
+Starts the fake ElevenLabs server from `benchmarks.fake_upstreams` with a synthesis
+cost per character (`--ms-per-char`), then sends the same long text to `/api/assist/tts`
+and `/api/assist/tts/stream` with `long_form` off and on. For each it reports the time
+to the first audio byte and to the end of the clip, median over `--runs`. Every run
+uses fresh text so the TTS cache is never hit.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_tts_longform
+    python -m benchmarks.bench_tts_longform --chars 4000 --ms-per-char 1.5 --runs 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.fake_upstreams import FakeUpstreamConfig, FakeUpstreams
+
+_PARAGRAPHS = (
+    "Our community of twelve hundred members sits on the north shore of the lake. For generations the "
+    "fishery sustained families, but since the mill closed young people leave for the city to find work. ",
+    "The Land Guardians program will train twenty-five youth over two years. Participants learn water "
+    "monitoring, wetland restoration and small-engine repair from Elders and certified instructors. ",
+    "Each season ends with a community gathering where participants present their results. The band "
+    "office tracks employment outcomes for three years after each cohort finishes the program. ",
+)
+
+
+def _long_text(chars: int, tag: str) -> str:
+    paragraphs: List[str] = []
+    while sum(len(paragraph) + 2 for paragraph in paragraphs) < chars:
+        base = _PARAGRAPHS[len(paragraphs) % len(_PARAGRAPHS)]
+        paragraphs.append(f"Part {len(paragraphs) + 1} ({tag}). " + base * 2)
+    return "\n\n".join(paragraphs)
+
+
+async def _timed_post(app: Any, path: str, payload: Dict[str, Any]) -> Tuple[int, float, float, int]:
+    """POST through the ASGI app directly; returns status, first-byte and total seconds, bytes."""
+    body = json.dumps(payload).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+    status = 0
+    first_byte: Optional[float] = None
+    size = 0
+    started = time.perf_counter()
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status, first_byte, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            size += len(message["body"])
+
+    await app(scope, receive, send)
+    total = time.perf_counter() - started
+    return status, first_byte if first_byte is not None else total, total, size
+
+
+async def _run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    from app.main import create_app
+    from app.services.speech_segments import split_for_speech
+
+    app = create_app()
+    results: Dict[str, Dict[str, float]] = {}
+    async with app.router.lifespan_context(app):
+        print(f"{args.chars} characters -> {len(split_for_speech(_long_text(args.chars, 'sample')))} segments")
+        for path in ("/api/assist/tts", "/api/assist/tts/stream"):
+            for long_form in (False, True):
+                first_bytes, totals = [], []
+                for run in range(args.runs):
+                    text = _long_text(args.chars, f"{path} {long_form} {run}")
+                    status, first_byte, total, _ = await _timed_post(
+                        app, path, {"text": text, "long_form": long_form}
+                    )
+                    if status != 200:
+                        raise RuntimeError(f"{path} answered {status}")
+                    first_bytes.append(first_byte)
+                    totals.append(total)
+                label = f"{path.rsplit('/', 1)[-1]} {'long-form' if long_form else 'single'}"
+                results[label] = {
+                    "first_byte_ms": round(statistics.median(first_bytes) * 1000, 1),
+                    "total_ms": round(statistics.median(totals) * 1000, 1),
+                }
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chars", type=int, default=3000, help="Length of the narrated text")
+    parser.add_argument("--ms-per-char", type=float, default=1.0, help="Fake synthesis cost per character")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Fake upstream time to first byte")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.TemporaryDirectory()
+    config = FakeUpstreamConfig(latency_ms=args.latency_ms, jitter_ms=0, tts_ms_per_char=args.ms_per_char)
+    with FakeUpstreams(config) as fake:
+        os.environ.update(fake.environment())
+        os.environ.update(
+            TTS_CACHE_DIR=os.path.join(scratch.name, "tts-cache"),
+            PROPOSAL_DB_PATH=os.path.join(scratch.name, "proposals.sqlite3"),
+            UPSTREAM_HTTP2="false",
+            STARTUP_WARMUP="eager",
+        )
+        results = asyncio.run(_run(args))
+
+    print(f"\n{'request':<24} {'first byte':>11} {'total':>10}  (ms, median of {args.runs})")
+    for label, timings in results.items():
+        print(f"{label:<24} {timings['first_byte_ms']:>11} {timings['total_ms']:>10}")
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
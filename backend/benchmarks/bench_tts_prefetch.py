@@ -0,0 +1,169 @@
+"""
+Section intro latency in the guided interview with and without speculative TTS prefetch.
+
+Starts the fake upstreams from `benchmarks.fake_upstreams` (ElevenLabs synthesis costs
+`--ms-per-char` per character on top of `--latency-ms`), then walks `--sessions`
+concurrent users through sections 1 to 10. In each section the client sends the
+`/api/assist/tts/prefetch` hint when the user starts typing, followed by `--turns` chat
+turns `--think-ms` apart. Then the user moves on and the intro of the next section is
+requested from `/api/assist/tts`. With probability `--detour-rate` the user jumps to
+some other section instead, so that prediction misses. The walk runs once with
+prefetching disabled and once with it enabled.
+
+Each session uses its own voice id, so without prefetching every intro is a TTS cache
+miss, as after a deploy or for a voice not heard before. Once an intro is cached for
+a voice, prefetching it is skipped as `cached` and costs nothing.
+
+Reports p50/p95 intro latency, the prefetch hit rate, and the characters synthesized
+speculatively but never used. Clips still unused at the end of a run count as wasted.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_tts_prefetch
+    python -m benchmarks.bench_tts_prefetch --sessions 8 --detour-rate 0.4 --think-ms 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_upstreams import FakeUpstreamConfig, FakeUpstreams
+
+_SECTIONS = range(1, 11)
+_ANSWER = "We run a youth land-based training program with the band council and two school boards."
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def _walk(client: Any, args: argparse.Namespace, session: str, rng: random.Random) -> List[Dict[str, Any]]:
+    """One user through the interview; returns the latency of every section intro."""
+    from app.api.routes.assist import SECTION_INTROS
+
+    session_id = (await client.post("/api/assist/sessions")).json()["session_id"]
+    transitions: List[Dict[str, Any]] = []
+    for section in _SECTIONS:
+        hint = {"section": section, "session_id": session_id, "voice_id": session}
+        await client.post("/api/assist/tts/prefetch", json=hint)
+        for turn in range(args.turns):
+            await asyncio.sleep(args.think_ms / 1000)
+            response = await client.post(
+                "/api/assist/chat",
+                json={
+                    "message": f"{_ANSWER} ({turn})",
+                    "section": section,
+                    "session_id": session_id,
+                    "voice_id": session,
+                    "audio_mode": "url",
+                },
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f"/chat answered {response.status_code}: {response.text}")
+        following = section + 1
+        detour = rng.random() < args.detour_rate
+        if detour:
+            following = rng.choice([other for other in SECTION_INTROS if other != section + 1])
+        started = time.perf_counter()
+        response = await client.post("/api/assist/tts", json={"text": SECTION_INTROS[following], "voice_id": session})
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"/tts answered {response.status_code}: {response.text}")
+        transitions.append({"seconds": elapsed, "detour": detour})
+    return transitions
+
+
+async def _run(args: argparse.Namespace, fake: FakeUpstreams) -> Dict[str, Any]:
+    import httpx
+
+    from app.main import create_app
+    from app.services.speech_prefetch import speech_prefetcher
+
+    app = create_app()
+    results: Dict[str, Any] = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            for enabled in (False, True):
+                label = "prefetch" if enabled else "no prefetch"
+                speech_prefetcher.enabled = enabled
+                chars_before = fake.app.state.behaviour.tts_chars
+                walks = await asyncio.gather(
+                    *(
+                        _walk(client, args, f"{label.replace(' ', '-')}-{index}", random.Random(args.seed + index))
+                        for index in range(args.sessions)
+                    )
+                )
+                transitions = [transition for walk in walks for transition in walk]
+                seconds = [transition["seconds"] for transition in transitions]
+                on_path = [transition["seconds"] for transition in transitions if not transition["detour"]]
+                results[label] = {
+                    "intros": len(transitions),
+                    "detours": sum(transition["detour"] for transition in transitions),
+                    "p50_ms": round(_percentile(seconds, 0.5) * 1000, 1),
+                    "p95_ms": round(_percentile(seconds, 0.95) * 1000, 1),
+                    "predicted_p50_ms": round(_percentile(on_path, 0.5) * 1000, 1),
+                    "tts_chars": fake.app.state.behaviour.tts_chars - chars_before,
+                }
+            # Whatever was prefetched and not requested by now is never going to be.
+            speech_prefetcher.ttl_seconds = 0
+            results["prefetcher"] = speech_prefetcher.stats()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent users walking the interview")
+    parser.add_argument("--turns", type=int, default=2, help="Chat turns per section")
+    parser.add_argument("--think-ms", type=float, default=800.0, help="Typing/speaking time before each turn")
+    parser.add_argument("--detour-rate", type=float, default=0.2, help="Chance the user skips to another section")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Fake upstream base latency")
+    parser.add_argument("--ms-per-char", type=float, default=3.0, help="Fake ElevenLabs synthesis time per character")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.TemporaryDirectory()
+    config = FakeUpstreamConfig(
+        latency_ms=args.latency_ms, jitter_ms=0, reply_chars=200, tts_ms_per_char=args.ms_per_char
+    )
+    with FakeUpstreams(config) as fake:
+        os.environ.update(fake.environment())
+        os.environ.update(
+            TTS_CACHE_DIR=os.path.join(scratch.name, "tts-cache"),
+            PROPOSAL_DB_PATH=os.path.join(scratch.name, "proposals.sqlite3"),
+            UPSTREAM_HTTP2="false",
+            STARTUP_WARMUP="eager",
+        )
+        results = asyncio.run(_run(args, fake))
+
+    print(f"\n{'mode':<12} {'intros':>7} {'detours':>8} {'p50':>8} {'p95':>8} {'predicted p50':>14} {'TTS chars':>10}")
+    for label in ("no prefetch", "prefetch"):
+        run = results[label]
+        print(
+            f"{label:<12} {run['intros']:>7} {run['detours']:>8} {run['p50_ms']:>8} {run['p95_ms']:>8} "
+            f"{run['predicted_p50_ms']:>14} {run['tts_chars']:>10}"
+        )
+    stats = results["prefetcher"]
+    chars = stats["chars"]
+    print(
+        f"\nhit rate {stats['hit_rate']}, wasted {chars.get('wasted', 0)} of {chars.get('synthesized', 0)} "
+        f"characters synthesized ahead ({stats['wasted_char_ratio']})"
+    )
+    print("outcomes:", ", ".join(f"{outcome}={count}" for outcome, count in stats["outcomes"].items()))
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+In-process stand-ins for the OpenAI and ElevenLabs HTTP APIs used by the load benchmarks.
+
+`FakeUpstreams` serves a small Starlette app on a loopback port from a background
+thread, so the backend talks to it over real sockets through its normal pooled
+clients. Latency, payload sizes and error rates are set with `FakeUpstreamConfig`.
+
+Endpoints mimicked:
+
+- `POST /v1/chat/completions` (OpenAI; JSON or SSE when `stream` is true)
+- `POST /v1/text-to-speech/{voice}` and `/v1/text-to-speech/{voice}/stream` (ElevenLabs)
+- `POST /v1/speech-to-text` (ElevenLabs)
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+
+@dataclass
+class FakeUpstreamConfig:
+    latency_ms: float = 150.0  # time to first byte for every upstream call
+    jitter_ms: float = 50.0  # uniform +/- jitter added to the latency
+    error_rate: float = 0.0  # probability of answering with `error_status`
+    error_status: int = 500
+    reply_chars: int = 400  # assistant reply length
+    audio_bytes: int = 48_000  # synthesized MP3 size (~3 s at 128 kbps)
+    stream_chunks: int = 20  # deltas per streamed completion / audio chunks per stream
+    stream_chunk_delay_ms: float = 10.0
+    tts_ms_per_char: float = 0.0  # extra synthesis time per character of input text
+    model_latency_ms: Dict[str, float] = field(default_factory=dict)  # chat latency per model, else latency_ms
+    field_updates: Dict[str, str] = field(default_factory=dict)  # returned on section (JSON) chat turns
+    seed: int = 1234
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+_FILLER = (
+    "Thanks for sharing that detail. Let's capture who benefits from the project, what "
+    "changes for the community, and how you will know it worked. "
+)
+
+
+class _FakeBehaviour:
+    def __init__(self, config: FakeUpstreamConfig) -> None:
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.calls: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.models: Dict[str, int] = {}
+        self.prompt_chars = 0
+        self.tts_chars = 0
+
+    async def delay(self, latency_ms: Optional[float] = None) -> None:
+        latency_ms = self.config.latency_ms if latency_ms is None else latency_ms
+        jitter = self.random.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        await asyncio.sleep(max(0.0, latency_ms + jitter) / 1000)
+
+    def should_fail(self, name: str) -> bool:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.random.random() < self.config.error_rate:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return True
+        return False
+
+    def error_response(self) -> JSONResponse:
+        return JSONResponse({"error": {"message": "injected failure"}}, status_code=self.config.error_status)
+
+    def reply_text(self) -> str:
+        repeats = self.config.reply_chars // len(_FILLER) + 1
+        return (_FILLER * repeats)[: self.config.reply_chars]
+
+    def audio(self) -> bytes:
+        frame = b"\xff\xfb\x90\x64" + bytes(412)
+        return (frame * (self.config.audio_bytes // len(frame) + 1))[: self.config.audio_bytes]
+
+
+def _completion_content(body: Dict[str, Any], text: str, field_updates: Dict[str, str]) -> str:
+    messages = body.get("messages") or []
+    prompt = " ".join(str(message.get("content", "")) for message in messages)
+    if "grant reviewer" in prompt:
+        # One section per request, named after the first line of the draft text and scored
+        # from its content, so edited sections move and unchanged ones keep their score.
+        draft = str(messages[-1].get("content", "")).split("\n\n", 1)[-1] if messages else ""
+        heading = next((line.strip() for line in draft.splitlines() if line.strip()), "Proposal")
+        score = 40 + int(hashlib.sha256(draft.encode()).hexdigest(), 16) % 55
+        section = {
+            "section": heading[:60].rstrip(":"),
+            "summary": text[:160],
+            "recommendations": ["Add measurable outcomes."],
+            "score": score,
+        }
+        return json.dumps({"sections": [section]})
+    if "chat_reply" in prompt:
+        return json.dumps({"field_updates": field_updates, "chat_reply": text})
+    return text
+
+
+def build_fake_app(config: FakeUpstreamConfig) -> Starlette:
+    behaviour = _FakeBehaviour(config)
+
+    async def chat_completions(request: Request) -> Response:
+        body = await request.json()
+        model = body.get("model", "gpt-4o-mini")
+        behaviour.models[model] = behaviour.models.get(model, 0) + 1
+        behaviour.prompt_chars += sum(len(str(message.get("content", ""))) for message in body.get("messages") or [])
+        await behaviour.delay(config.model_latency_ms.get(model))
+        if behaviour.should_fail("openai"):
+            return behaviour.error_response()
+        content = _completion_content(body, behaviour.reply_text(), config.field_updates)
+        created = int(time.time())
+        usage = {"prompt_tokens": 200, "completion_tokens": len(content) // 4, "total_tokens": 200 + len(content) // 4}
+        if not body.get("stream"):
+            return JSONResponse(
+                {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                    ],
+                    "usage": usage,
+                }
+            )
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        async def events() -> AsyncIterator[bytes]:
+            size = max(1, len(content) // config.stream_chunks + 1)
+            for start in range(0, len(content), size):
+                chunk = {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": content[start : start + size]}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n".encode()
+                await asyncio.sleep(config.stream_chunk_delay_ms / 1000)
+            if include_usage:
+                tail = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created,
+                        "model": model, "choices": [], "usage": usage}
+                yield f"data: {json.dumps(tail)}\n\n".encode()
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def _synthesis_seconds(request: Request) -> float:
+        try:
+            text = json.loads(await request.body()).get("text") or ""
+        except (ValueError, AttributeError):
+            text = ""
+        behaviour.tts_chars += len(text)
+        return len(text) * config.tts_ms_per_char / 1000
+
+    async def text_to_speech(request: Request) -> Response:
+        generation = await _synthesis_seconds(request)
+        await behaviour.delay()
+        await asyncio.sleep(generation)
+        if behaviour.should_fail("elevenlabs_tts"):
+            return behaviour.error_response()
+        return Response(behaviour.audio(), media_type="audio/mpeg")
+
+    async def text_to_speech_stream(request: Request) -> Response:
+        generation = await _synthesis_seconds(request)
+        await behaviour.delay()
+        if behaviour.should_fail("elevenlabs_tts"):
+            return behaviour.error_response()
+        audio = behaviour.audio()
+
+        async def chunks() -> AsyncIterator[bytes]:
+            # Audio is produced as it is generated, so the synthesis time is spread over the chunks.
+            size = max(1, len(audio) // config.stream_chunks + 1)
+            pause = config.stream_chunk_delay_ms / 1000 + generation / max(config.stream_chunks, 1)
+            for start in range(0, len(audio), size):
+                yield audio[start : start + size]
+                await asyncio.sleep(pause)
+
+        return StreamingResponse(chunks(), media_type="audio/mpeg")
+
+    async def speech_to_text(request: Request) -> Response:
+        body = await request.body()
+        await behaviour.delay()
+        if behaviour.should_fail("elevenlabs_stt"):
+            return behaviour.error_response()
+        return JSONResponse({"text": f"We serve about {len(body) % 500} families in the region.", "language_code": "en"})
+
+    async def stats(request: Request) -> Response:
+        return JSONResponse({"calls": behaviour.calls, "errors": behaviour.errors, "models": behaviour.models})
+
+    app = Starlette(
+        routes=[
+            Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+            Route("/v1/text-to-speech/{voice}", text_to_speech, methods=["POST"]),
+            Route("/v1/text-to-speech/{voice}/stream", text_to_speech_stream, methods=["POST"]),
+            Route("/v1/speech-to-text", speech_to_text, methods=["POST"]),
+            Route("/_stats", stats, methods=["GET"]),
+        ]
+    )
+    app.state.behaviour = behaviour
+    return app
+
+
+class FakeUpstreams:
+    """Run the fake upstream app on a loopback port in a background thread."""
+
+    def __init__(self, config: FakeUpstreamConfig) -> None:
+        self.config = config
+        self.app = build_fake_app(config)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", 0))
+        self.port = self._socket.getsockname()[1]
+        self._server = uvicorn.Server(
+            uvicorn.Config(self.app, log_level="warning", lifespan="off", backlog=2048, timeout_keep_alive=30)
+        )
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [self._socket]}, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def environment(self) -> Dict[str, str]:
+        """Environment variables that point the backend at this server."""
+        return {
+            "OPENAI_API_KEY": "sk-fake",
+            "OPENAI_BASE_URL": f"{self.base_url}/v1",
+            "ELEVENLABS_API_KEY": "fake",
+            "ELEVENLABS_TTS_BASE_URL": f"{self.base_url}/v1/text-to-speech",
+            "ELEVENLABS_STT_ENDPOINT": f"{self.base_url}/v1/speech-to-text",
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        behaviour = self.app.state.behaviour
+        return {"calls": dict(behaviour.calls), "errors": dict(behaviour.errors), "models": dict(behaviour.models)}
+
+    def __enter__(self) -> "FakeUpstreams":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake upstream server did not start.")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
@@ -0,0 +1,58 @@
+from app.api.routes import proposals
+from app.api.routes.proposals import _analysis_units, _section_fingerprint
+
+
+def _draft(count: int, long_section: int = -1) -> str:
+    blocks = []
+    for index in range(count):
+        sentences = 40 if index == long_section else 8
+        body = " ".join(f"Section {index} sentence {n} describes the community work." for n in range(sentences))
+        blocks.append(f"{index + 1}. Heading {index}\n{body}")
+    return "\n\n".join(blocks)
+
+
+def _fingerprints(text: str) -> list:
+    return [_section_fingerprint(unit) for unit in _analysis_units(text)]
+
+
+def test_lengthening_one_section_keeps_the_other_fingerprints():
+    before = _fingerprints(_draft(30))
+    after = _fingerprints(_draft(30, long_section=7))
+    assert len(before) == len(after) == 30
+    changed = [index for index, (old, new) in enumerate(zip(before, after)) if old != new]
+    assert changed == [7]
+
+
+def test_short_blocks_join_the_previous_section():
+    text = "1. Summary\n" + "Long enough text. " * 40 + "\n\n2. Note\nShort."
+    units = _analysis_units(text)
+    assert len(units) == 1 and units[0].endswith("2. Note\nShort.")
+
+
+def test_sections_over_the_cap_are_grouped_with_neighbours(monkeypatch):
+    monkeypatch.setattr(proposals, "ANALYSIS_MAX_CHUNKS", 8)
+    before = _fingerprints(_draft(30))
+    after = _fingerprints(_draft(30, long_section=7))
+    assert 1 < len(before) <= 8 and len(after) <= 8
+    assert len(set(before) - set(after)) <= 2
+
+
+def test_inserting_a_section_over_the_cap_only_changes_its_neighbours(monkeypatch):
+    monkeypatch.setattr(proposals, "ANALYSIS_MAX_CHUNKS", 8)
+    text = _draft(40)
+    before = _fingerprints(text)
+    cut = text.index("21. Heading 20")
+    inserted = "Elders Circle:\n" + "An extra section about the elders' advisory circle. " * 12 + "\n\n"
+    after = _fingerprints(text[:cut] + inserted + text[cut:])
+    assert 1 < len(before) <= 8 and len(after) <= 8
+    assert len(set(before) - set(after)) <= 2
+    assert len(set(after) - set(before)) <= 2
+
+
+def test_removing_a_section_over_the_cap_only_changes_its_neighbours(monkeypatch):
+    monkeypatch.setattr(proposals, "ANALYSIS_MAX_CHUNKS", 8)
+    text = _draft(40)
+    start, end = text.index("11. Heading 10"), text.index("12. Heading 11")
+    before = _fingerprints(text)
+    after = _fingerprints(text[:start] + text[end:])
+    assert len(set(before) - set(after)) <= 2
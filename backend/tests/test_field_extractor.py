@@ -0,0 +1,24 @@
+from app.services.field_extractor import extract_fields
+
+CONTACT = {"contactEmail", "contactPhone", "submissionDate"}
+
+
+def test_plain_answer_is_handled_locally():
+    result = extract_fields("my email is jane@example.org", CONTACT)
+    assert result.field_updates == {"contactEmail": "jane@example.org"}
+    assert result.complete
+
+
+def test_negated_value_needs_the_model():
+    result = extract_fields("NOT x@y.com", CONTACT)
+    assert not result.complete
+
+
+def test_correction_needs_the_model():
+    for text in (
+        "my email is not a@b.com, it's c@d.com",
+        "actually it's c@d.com",
+        "use c@d.com instead",
+        "no, the date is March 3 2026",
+    ):
+        assert not extract_fields(text, CONTACT).complete, text
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, Job, JobQueue, QueueFull
+
+pytestmark = pytest.mark.anyio
+
+
+async def _finish(queue: JobQueue, jobs) -> None:
+    for _ in range(200):
+        if all(job.finished for job in jobs):
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("jobs did not finish")
+
+
+async def _echo(job: Job) -> str:
+    return f"done {job.payload}"
+
+
+async def test_submit_many_is_all_or_none():
+    gate = asyncio.Event()
+
+    async def blocked(job: Job) -> None:
+        await gate.wait()
+
+    queue = JobQueue("test", blocked, workers=1, max_queued=3)
+    queue.submit_many([("a", 1)])
+    await asyncio.sleep(0)  # the worker takes "a"; the queue is empty again
+    queue.submit_many([("b", 2), ("c", 3)])
+    with pytest.raises(QueueFull) as full:
+        queue.submit_many([("d", 4), ("e", 5)])
+    assert full.value.status_code == 503 and "Retry-After" in full.value.headers
+    assert queue.queued == 2 and len(queue._jobs) == 3
+    gate.set()
+    await queue.close()
+
+
+async def test_jobs_run_and_record_results_and_errors():
+    async def runner(job: Job) -> str:
+        if job.payload == "bad":
+            raise HTTPException(status_code=422, detail="Unreadable draft.")
+        if job.payload == "crash":
+            raise RuntimeError("boom")
+        return "ok"
+
+    cleaned = []
+    queue = JobQueue("test", runner, workers=2, cleanup=lambda job: cleaned.append(job.name))
+    good, bad, crash = queue.submit_many([("good", "fine"), ("bad", "bad"), ("crash", "crash")])
+    assert good.status == QUEUED
+    await _finish(queue, [good, bad, crash])
+    assert good.status == SUCCEEDED and good.info()["result"] == "ok"
+    assert bad.info()["error"] == {"status_code": 422, "detail": "Unreadable draft."}
+    assert crash.status == FAILED and crash.error_status == 500
+    assert sorted(cleaned) == ["bad", "crash", "good"] and good.payload is None
+    await queue.close()
+
+
+async def test_finished_jobs_expire_after_the_ttl():
+    queue = JobQueue("test", _echo, ttl_seconds=0.01)
+    (job,) = queue.submit_many([("a", 1)])
+    await _finish(queue, [job])
+    assert queue.get(job.job_id) is job
+    await asyncio.sleep(0.02)
+    assert queue.get(job.job_id) is None
+    await queue.close()
+
+
+async def test_oldest_finished_jobs_are_dropped_beyond_the_store_limit():
+    gate = asyncio.Event()
+
+    async def runner(job: Job) -> None:
+        if job.payload == "slow":
+            await gate.wait()
+
+    queue = JobQueue("test", runner, workers=2, max_stored=2)
+    running = queue.submit_many([("slow", "slow")])[0]
+    first = queue.submit_many([("first", 1)])[0]
+    await _finish(queue, [first])
+    second = queue.submit_many([("second", 2)])[0]
+    await _finish(queue, [second])
+    third = queue.submit_many([("third", 3)])[0]
+    # Eviction happens on submit: "first" is the oldest finished job; the running one stays.
+    assert queue.get(first.job_id) is None
+    assert queue.get(running.job_id) is running
+    assert queue.get(second.job_id) is second and queue.get(third.job_id) is third
+    gate.set()
+    await queue.close()
+
+
+async def test_close_fails_jobs_that_never_started():
+    gate = asyncio.Event()
+
+    async def blocked(job: Job) -> None:
+        await gate.wait()
+
+    cleaned = []
+    queue = JobQueue("test", blocked, workers=1, cleanup=lambda job: cleaned.append(job.name))
+    running, waiting = queue.submit_many([("running", 1), ("waiting", 2)])
+    await asyncio.sleep(0)
+    await queue.close()
+    assert running.status == FAILED and running.error_status == 503
+    assert waiting.status == FAILED and "before the job started" in waiting.error
+    assert sorted(cleaned) == ["running", "waiting"]
+
+
+async def test_follow_yields_each_change_until_the_job_finishes():
+    gate = asyncio.Event()
+
+    async def runner(job: Job) -> str:
+        job.report(stage="analyzing")
+        await gate.wait()
+        return "ok"
+
+    queue = JobQueue("test", runner)
+    (job,) = queue.submit_many([("a", 1)])
+    seen = []
+
+    async def follow() -> None:
+        async for update in queue.follow(job, heartbeat_seconds=0.01):
+            seen.append(None if update is None else update.status)
+            if update is not None and update.progress.get("stage") == "analyzing":
+                gate.set()
+
+    await asyncio.wait_for(follow(), 1)
+    assert seen[0] in (QUEUED, RUNNING) and seen[-1] == SUCCEEDED and seen.count(SUCCEEDED) == 1
+    await queue.close()
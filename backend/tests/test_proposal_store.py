@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from app.services.proposal_store import ProposalStore
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def store(tmp_path):
+    store = ProposalStore(path=str(tmp_path / "proposals.sqlite3"), batch_interval_ms=5, retry_max_ms=20)
+    await store.start()
+    yield store
+    await store.close()
+
+
+def _document(title: str, organization: str = "Cedar Lake") -> dict:
+    return {"project_title": title, "organization_name": organization}
+
+
+async def test_repeated_saves_are_coalesced_into_one_write(store):
+    for version in range(50):
+        await store.upsert("p1", _document(f"Draft {version}"))
+    await store.update("p1", {"submission_date": "2026-03-15"})
+    assert (await store.get("p1"))["project_title"] == "Draft 49"
+    assert await store.flush()
+    assert store.committed_writes == 1
+    record = await store._read_row("p1")
+    assert record["project_title"] == "Draft 49" and record["submission_date"] == "2026-03-15"
+
+
+async def test_update_of_unknown_proposal_is_refused(store):
+    assert not await store.update("missing", {"project_title": "x"})
+
+
+async def test_list_filters_committed_and_queued_saves(store):
+    await store.upsert("a", _document("Water", "North"))
+    await store.upsert("b", _document("Wind", "South"))
+    await store.upsert("c", _document("Wild rice", "North"))
+    listed = await store.list(organization="North", title_prefix="W")
+    assert sorted(record["proposal_id"] for record in listed) == ["a", "c"]
+
+
+async def test_list_does_not_wait_for_saves_made_after_it_started(store):
+    stop = asyncio.Event()
+
+    async def autosave() -> None:
+        version = 0
+        while not stop.is_set():
+            await store.upsert(f"p{version % 3}", _document(f"Draft {version}"))
+            version += 1
+            await asyncio.sleep(0)
+
+    saving = asyncio.create_task(autosave())
+    await asyncio.sleep(0.02)
+    try:
+        assert len(await asyncio.wait_for(store.list(), 1)) == 3
+    finally:
+        stop.set()
+        await saving
+
+
+async def test_failed_batch_is_kept_and_retried(store):
+    write_batch = store._write_batch
+    failures = 2
+
+    def flaky(batch):
+        nonlocal failures
+        if failures:
+            failures -= 1
+            raise OSError("disk full")
+        return write_batch(batch)
+
+    store._write_batch = flaky
+    await store.upsert("p1", _document("Draft"))
+    for _ in range(100):
+        if store.failed_batches:
+            break
+        await asyncio.sleep(0.005)
+    assert not store.healthy
+    # A save queued while the batch is failing lands on top of the retained one.
+    await store.update("p1", {"submission_date": "2026-03-15"})
+    assert (await store.get("p1"))["submission_date"] == "2026-03-15"
+    for _ in range(200):
+        if store.healthy and not store._pending and not store._inflight:
+            break
+        await asyncio.sleep(0.005)
+    assert store.healthy and store.failed_batches == 2
+    record = await store._read_row("p1")
+    assert record["project_title"] == "Draft" and record["submission_date"] == "2026-03-15"
+
+
+async def test_flush_reports_a_failing_database(store):
+    def failing(batch):
+        raise OSError("disk full")
+
+    store._write_batch = failing
+    await store.upsert("p1", _document("Draft"))
+    assert not await store.flush()
+    assert (await store.get("p1"))["project_title"] == "Draft"
+    del store._write_batch  # the database recovers; close() commits the retained write
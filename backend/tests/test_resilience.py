@@ -0,0 +1,142 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services import resilience
+from app.services.resilience import (
+    CircuitBreaker,
+    DeadlineExceeded,
+    UpstreamStatusError,
+    UpstreamUnavailable,
+    call_upstream,
+    get_circuit_breaker,
+    request_deadline,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(resilience, "UPSTREAM_RETRY_BASE_SECONDS", 0.001)
+    monkeypatch.setattr(resilience, "UPSTREAM_RETRY_MAX_SECONDS", 0.001)
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_the_threshold():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.available
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.available
+    with pytest.raises(UpstreamUnavailable) as refused:
+        breaker.before_call()
+    assert refused.value.status_code == 503
+    assert int(refused.value.headers["Retry-After"]) > 1
+
+
+def test_half_open_lets_one_probe_through_and_closes_on_success():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.01)
+    _open(breaker)
+    time.sleep(0.02)
+    assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.available
+    breaker.before_call()
+    assert not breaker.available
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.01)
+    _open(breaker)
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_released_probe_can_be_retried():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.01)
+    _open(breaker)
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.release_probe()
+    assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.available
+
+
+async def test_retryable_errors_are_retried_until_success():
+    calls = 0
+
+    async def attempt(timeout: float) -> str:
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise UpstreamStatusError(503, "busy")
+        return "ok"
+
+    assert await call_upstream("test-retry", attempt, attempts=3) == "ok"
+    assert calls == 3
+    assert get_circuit_breaker("test-retry").failures == 0
+
+
+async def test_client_errors_are_not_retried_or_counted():
+    calls = 0
+
+    async def attempt(timeout: float) -> str:
+        nonlocal calls
+        calls += 1
+        raise UpstreamStatusError(400, "bad request")
+
+    with pytest.raises(UpstreamStatusError):
+        await call_upstream("test-client-error", attempt, attempts=3)
+    assert calls == 1
+    assert get_circuit_breaker("test-client-error").failures == 0
+
+
+async def test_upstream_timeouts_count_toward_the_breaker(monkeypatch):
+    monkeypatch.setitem(resilience._POLICIES, "test-slow", resilience._Policy(0.01, 0.0))
+
+    async def attempt(timeout: float) -> None:
+        await asyncio.sleep(1)
+
+    with pytest.raises(DeadlineExceeded):
+        await call_upstream("test-slow", attempt, attempts=2)
+    assert get_circuit_breaker("test-slow").failures == 2
+
+
+async def test_timeouts_cut_short_by_the_callers_deadline_do_not_count(monkeypatch):
+    monkeypatch.setitem(resilience._POLICIES, "test-deadline", resilience._Policy(5.0, 0.0))
+    breaker = get_circuit_breaker("test-deadline")
+
+    async def attempt(timeout: float) -> None:
+        await asyncio.sleep(1)
+
+    for _ in range(breaker.failure_threshold + 1):
+        with request_deadline(0.01):
+            with pytest.raises(DeadlineExceeded):
+                await call_upstream("test-deadline", attempt, attempts=1)
+    assert breaker.failures == 0 and breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_open_breaker_fails_fast():
+    breaker = get_circuit_breaker("test-open")
+    _open(breaker)
+    calls = 0
+
+    async def attempt(timeout: float) -> str:
+        nonlocal calls
+        calls += 1
+        return "ok"
+
+    with pytest.raises(UpstreamUnavailable):
+        await call_upstream("test-open", attempt)
+    assert calls == 0
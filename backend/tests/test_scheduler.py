@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from app.services.scheduler import BULK, INTERACTIVE, AdmissionRejected, SingleFlight, UpstreamLimiter
+
+pytestmark = pytest.mark.anyio
+
+
+async def _queued(limiter: UpstreamLimiter, priority: int, order: list, label: str) -> None:
+    await limiter.acquire(priority)
+    order.append(label)
+
+
+async def test_interactive_waiters_are_served_before_bulk():
+    limiter = UpstreamLimiter("test", max_concurrency=1, max_waiting=10, bulk_share=1.0)
+    await limiter.acquire()
+    order: list = []
+    waiters = [
+        asyncio.create_task(_queued(limiter, BULK, order, "bulk-1")),
+        asyncio.create_task(_queued(limiter, BULK, order, "bulk-2")),
+        asyncio.create_task(_queued(limiter, INTERACTIVE, order, "interactive")),
+    ]
+    await asyncio.sleep(0)
+    assert limiter.waiting == 3
+    for _ in waiters:
+        limiter.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*waiters)
+    assert order == ["interactive", "bulk-1", "bulk-2"]
+    assert limiter.active == 1 and limiter.waiting == 0
+
+
+async def test_bulk_is_rejected_once_its_share_of_the_queue_is_full():
+    limiter = UpstreamLimiter("test", max_concurrency=1, max_waiting=2, bulk_share=0.5)
+    await limiter.acquire()
+    bulk = asyncio.create_task(limiter.acquire(BULK))
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limiter.acquire(BULK)
+    assert rejected.value.status_code == 503
+    assert int(rejected.value.headers["Retry-After"]) >= 1
+    # Interactive calls may still use the rest of the queue.
+    interactive = asyncio.create_task(limiter.acquire(INTERACTIVE))
+    await asyncio.sleep(0)
+    assert limiter.waiting == 2
+    with pytest.raises(AdmissionRejected):
+        await limiter.acquire(INTERACTIVE)
+    limiter.release()
+    limiter.release()
+    await asyncio.gather(bulk, interactive)
+
+
+async def test_waiting_past_the_limit_is_rejected_and_leaves_the_queue():
+    limiter = UpstreamLimiter("test", max_concurrency=1, max_waiting=4, max_wait_seconds=0.02)
+    await limiter.acquire()
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limiter.acquire()
+    assert "queue timeout" in rejected.value.detail
+    assert limiter.waiting == 0
+    limiter.release()
+    assert limiter.active == 0
+
+
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    limiter = UpstreamLimiter("test", max_concurrency=1, max_waiting=4)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    limiter.release()
+    assert limiter.active == 0 and limiter.waiting == 0
+
+
+async def test_single_flight_shares_one_call_between_callers():
+    flight = SingleFlight("test")
+    calls = 0
+    release = asyncio.Event()
+
+    async def call() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "audio"
+
+    callers = [asyncio.create_task(flight.run("clip", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    # One caller going away does not cancel the call the others are waiting for.
+    callers[0].cancel()
+    release.set()
+    results = await asyncio.gather(*callers[1:])
+    assert results == ["audio", "audio"] and calls == 1
+    assert await flight.run("clip", call) == "audio" and calls == 2
+
+
+async def test_single_flight_propagates_errors_and_forgets_the_key():
+    flight = SingleFlight("test")
+
+    async def failing() -> None:
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        await flight.run("clip", failing)
+    assert not flight._calls
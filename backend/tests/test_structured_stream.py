@@ -0,0 +1,119 @@
+import json
+import random
+from typing import Dict, List
+
+import pytest
+
+from app.services.structured_stream import StructuredReplyParser
+
+REPLY = (
+    '```json\n{"chat_reply": "Thanks! I noted \\"Cedar Lake\\" \\u2014 anything else?", '
+    '"field_updates": {"contactEmail": " jane@example.org ", "organizationName": "Caf\\u00e9 \\"North\\"", '
+    '"address": {"street": "1 Main St", "city": "Nain"}, "tags": ["a", {"b": "c"}], "budget": 1200.5, '
+    '"confirmed": true, "notes": "", "contactPhone": "(555) 123-4567"}, "next": null}\n```'
+)
+
+
+def _expected(text: str) -> Dict[str, str]:
+    body = text.strip().removeprefix("```json").removesuffix("```")
+    updates = json.loads(body)["field_updates"]
+    return {key: value.strip() for key, value in updates.items() if isinstance(value, str) and value.strip()}
+
+
+def _feed(chunks: List[str], allowed=None) -> StructuredReplyParser:
+    parser = StructuredReplyParser(allowed)
+    emitted = []
+    for chunk in chunks:
+        emitted.extend(parser.feed(chunk))
+    assert dict(emitted) == parser.fields
+    return parser
+
+
+def test_whole_reply():
+    parser = _feed([REPLY])
+    assert parser.complete and not parser.failed
+    assert parser.fields == _expected(REPLY)
+    assert parser.fields["organizationName"] == 'Café "North"'
+
+
+def test_every_two_way_split_matches_whole_reply():
+    expected = _expected(REPLY)
+    for split in range(1, len(REPLY)):
+        parser = _feed([REPLY[:split], REPLY[split:]])
+        assert parser.complete, split
+        assert parser.fields == expected, split
+
+
+def test_character_by_character_and_random_chunks():
+    expected = _expected(REPLY)
+    assert _feed(list(REPLY)).fields == expected
+    rng = random.Random(7)
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(REPLY)), rng.randint(1, 12)))
+        chunks = [REPLY[start:end] for start, end in zip([0] + cuts, cuts + [len(REPLY)])]
+        parser = _feed(chunks)
+        assert parser.complete and parser.fields == expected, cuts
+
+
+@pytest.mark.parametrize("split", range(1, 12))
+def test_unicode_escape_split_across_chunks(split):
+    text = '{"field_updates": {"organizationName": "\\u00c9cole \\ud83c\\udf32"}}'
+    start = text.index("\\u00c9")
+    parser = _feed([text[: start + split], text[start + split :]])
+    assert parser.fields == {"organizationName": "École 🌲"}
+
+
+def test_escaped_quotes_and_backslashes():
+    text = r'{"field_updates": {"projectTitle": "The \"Big\" C:\\ Drive \\"}}'
+    assert _feed([text[:34], text[34:]]).fields == {"projectTitle": 'The "Big" C:\\ Drive \\'}
+
+
+def test_values_are_emitted_as_soon_as_they_close():
+    parser = StructuredReplyParser()
+    assert parser.feed('{"field_updates": {"contactEmail": "jane@exa') == []
+    assert parser.feed('mple.org", "contactPhone": "555') == [("contactEmail", "jane@example.org")]
+    assert not parser.complete
+
+
+def test_nested_objects_inside_field_updates_are_skipped():
+    text = '{"field_updates": {"address": {"contactEmail": "inner@x.org"}, "contactEmail": "outer@x.org"}}'
+    assert _feed([text]).fields == {"contactEmail": "outer@x.org"}
+
+
+def test_keys_outside_the_allowlist_are_skipped():
+    parser = _feed([REPLY], allowed=frozenset({"contactEmail"}))
+    assert parser.fields == {"contactEmail": "jane@example.org"}
+
+
+def test_truncated_reply_keeps_closed_values():
+    cut = REPLY.index("contactPhone") + 20
+    parser = _feed([REPLY[:cut]])
+    assert not parser.complete and not parser.failed
+    assert "contactPhone" not in parser.fields
+    assert parser.fields["contactEmail"] == "jane@example.org"
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        'Sure! {"field_updates": {"contactEmail": "a@b.org"}}',
+        '{"field_updates": {"contactEmail" "a@b.org"}}',
+        '{"field_updates": {"contactEmail": "a@b.org",, "x": "y"}}',
+        '{"field_updates": {"contactEmail": "bad \\x escape"}}',
+    ],
+)
+def test_invalid_reply_stops_the_parser(text):
+    parser = _feed([text])
+    assert parser.failed and not parser.complete
+    assert "x" not in parser.fields
+
+
+def test_values_before_a_syntax_error_stay_valid():
+    parser = _feed(['{"field_updates": {"contactEmail": "a@b.org", ', '"contactPhone": oops}'])
+    assert parser.failed
+    assert parser.fields == {"contactEmail": "a@b.org"}
+
+
+def test_text_after_the_object_is_ignored():
+    parser = _feed(['{"field_updates": {"contactEmail": "a@b.org"}} trailing {"field_updates": {"x": "y"}}'])
+    assert parser.complete and parser.fields == {"contactEmail": "a@b.org"}
@@ -0,0 +1,74 @@
+import pytest
+
+from app.services.tts_cache import TTSAudioCache, tts_cache_key
+
+pytestmark = pytest.mark.anyio
+
+
+def _key(text: str) -> str:
+    return tts_cache_key("voice", "model", text)
+
+
+def test_key_ignores_whitespace_differences():
+    assert _key("Welcome  to\nthe  interview") == _key("Welcome to the interview")
+    assert _key("Welcome") != tts_cache_key("other-voice", "model", "Welcome")
+
+
+async def test_memory_tier_evicts_the_least_recently_used_entry():
+    cache = TTSAudioCache(memory_entries=2, directory=None)
+    await cache.put("a", b"1")
+    await cache.put("b", b"2")
+    assert await cache.get("a") == b"1"  # "b" is now the oldest
+    await cache.put("c", b"3")
+    assert await cache.get("b") is None
+    assert await cache.get("a") == b"1" and await cache.get("c") == b"3"
+    assert cache.stats()["memory_evictions"] == 1
+
+
+async def test_memory_tier_respects_its_byte_budget():
+    cache = TTSAudioCache(memory_bytes=10, memory_entries=100, directory=None)
+    await cache.put("a", b"x" * 6)
+    await cache.put("b", b"y" * 6)
+    stats = cache.stats()
+    assert stats["memory_entries"] == 1 and stats["memory_bytes"] == 6
+    assert await cache.get("a") is None
+
+
+async def test_oversized_and_empty_clips_are_not_stored(tmp_path):
+    cache = TTSAudioCache(directory=str(tmp_path), max_entry_bytes=4)
+    await cache.put("big", b"12345")
+    await cache.put("empty", b"")
+    assert not await cache.contains("big") and not await cache.contains("empty")
+    assert cache.stats()["stores"] == 0
+
+
+async def test_disk_hit_is_promoted_to_memory(tmp_path):
+    writer = TTSAudioCache(directory=str(tmp_path))
+    await writer.put(_key("hello"), b"mp3")
+    # A fresh instance, as after a restart, finds the clip on disk.
+    cache = TTSAudioCache(directory=str(tmp_path))
+    assert await cache.contains(_key("hello"))
+    assert await cache.get(_key("hello")) == b"mp3"
+    assert await cache.get(_key("hello")) == b"mp3"
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1 and stats["memory_entries"] == 1
+
+
+async def test_disk_tier_evicts_the_oldest_clips(tmp_path):
+    cache = TTSAudioCache(memory_entries=1, directory=str(tmp_path), disk_bytes=8)
+    for name in ("a", "b", "c"):
+        await cache.put(_key(name), b"x" * 4)
+    stats = cache.stats()
+    assert stats["disk_evictions"] == 1 and stats["disk_bytes"] == 8
+    assert not (tmp_path / _key("a")[:2] / f"{_key('a')}.mp3").exists()
+    assert await cache.get(_key("a")) is None
+    assert await cache.get(_key("b")) == b"xxxx"
+
+
+async def test_missing_disk_file_is_a_miss(tmp_path):
+    cache = TTSAudioCache(memory_entries=1, directory=str(tmp_path))
+    await cache.put(_key("a"), b"1")
+    await cache.put(_key("b"), b"2")  # pushes "a" out of memory
+    (tmp_path / _key("a")[:2] / f"{_key('a')}.mp3").unlink()
+    assert await cache.get(_key("a")) is None
+    assert cache.stats()["disk_entries"] == 1